@@ -1,6 +1,9 @@
 import sys
 import os
 import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
@@ -9,6 +12,30 @@ from backend.utils.logger import get_logger
 
 logger = get_logger("analysis_agent")
 
+_CJK_RE = re.compile(r"[\u3000-\u9fff\uff00-\uffef]")
+
+# Answer format shared by the single-call and map-reduce full-paper prompts
+_FULL_ANALYSIS_FORMAT = (
+    "以JSON格式返回详细的分析结果。每个字段都请详细展开（每个字段至少100字）：\n\n"
+    '{"abstract_summary": "论文核心内容概述（包括研究背景、问题和主要贡献）",\n'
+    ' "method": "详细的研究方法和技术路线（包括模型架构、算法设计、数据处理方法等）",\n'
+    ' "innovation": "主要创新点和贡献（与现有工作的区别和改进）",\n'
+    ' "results": "实验结果和性能分析（包括数据集、评估指标、对比实验结果等）",\n'
+    ' "conclusion": "结论、局限性和未来工作方向"}\n\n'
+)
+
+
+def estimate_tokens(text):
+    """
+    Rough token count for prompt budgeting.
+
+    CJK characters count as one token each; other text as ~4 characters per token.
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
 
 class AnalysisAgent:
     """Wraps LLM APIs (ZhipuAI/DeepSeek) for content analysis and translation."""
@@ -21,6 +48,12 @@ class AnalysisAgent:
         self.provider = provider or self.settings.get("provider", "zhipu")
         self.max_content_length = self.settings.get("max_content_length", 4000)
         self.temperature = self.settings.get("temperature", 0.7)
+        self.llm_concurrency = self.settings.get("llm_concurrency", 4)
+        self.relevance_token_budget = self.settings.get("relevance_token_budget", 3000)
+        self.relevance_max_batch = self.settings.get("relevance_max_batch", 25)
+        self.relevance_max_retries = self.settings.get("relevance_max_retries", 2)
+        # Caps in-flight relevance calls across all concurrent searches
+        self._relevance_slots = threading.BoundedSemaphore(self.llm_concurrency)
         
         # Set default model based on provider
         if self.provider == "deepseek":
@@ -42,7 +75,7 @@ class AnalysisAgent:
                 from openai import OpenAI
                 self.client = OpenAI(
                     api_key=api_key,
-                    base_url="https://api.deepseek.com"
+                    base_url=self.settings.get("api_base_url") or "https://api.deepseek.com"
                 )
                 logger.info(f"Initialized DeepSeek client with model: {self.model}")
             except Exception as e:
@@ -54,7 +87,7 @@ class AnalysisAgent:
                 return
             try:
                 from zhipuai import ZhipuAI
-                self.client = ZhipuAI(api_key=api_key)
+                self.client = ZhipuAI(api_key=api_key, base_url=self.settings.get("api_base_url") or None)
                 logger.info(f"Initialized ZhipuAI client with model: {self.model}")
             except Exception as e:
                 logger.error(f"Failed to initialize ZhipuAI client: {e}")
@@ -65,10 +98,18 @@ class AnalysisAgent:
             return content[:self.max_content_length] + "...(truncated)"
         return content
 
-    def _call_api(self, prompt, max_tokens=1500):
-        """Call LLM API and return text response."""
+    def _call_api(self, prompt, max_tokens=1500, on_delta=None):
+        """
+        Call LLM API and return (text, error).
+
+        With on_delta the completion is streamed and on_delta(piece) is called
+        for each piece of text as it arrives; the assembled text is still
+        returned at the end.
+        """
         if not self.client:
             return None, "API key not configured or client initialization failed"
+        if on_delta is not None:
+            return self._stream_api(prompt, max_tokens, on_delta)
 
         try:
             response = self.client.chat.completions.create(
@@ -83,10 +124,37 @@ class AnalysisAgent:
             logger.error(f"{self.provider} API call failed: {e}")
             return None, str(e)
 
-    def generate_summary(self, content):
+    def _stream_api(self, prompt, max_tokens, on_delta):
+        """Streaming variant of _call_api (ZhipuAI and OpenAI clients share the chunk format)."""
+        parts = []
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=self.temperature,
+                max_tokens=max_tokens,
+                stream=True,
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                piece = chunk.choices[0].delta.content
+                if piece:
+                    parts.append(piece)
+                    on_delta(piece)
+            return "".join(parts), None
+        except Exception as e:
+            logger.error(f"{self.provider} streaming API call failed after {len(parts)} chunks: {e}")
+            return None, str(e)
+
+    def generate_summary(self, content, on_delta=None):
         """
         Generate a summary and key points for the given content.
 
+        Args:
+            content: Text to summarize.
+            on_delta: Optional callback(piece) to stream the raw answer.
+
         Returns:
             {"summary": str, "key_points": [str], "error": str|None}
         """
@@ -98,7 +166,7 @@ class AnalysisAgent:
             f"内容：\n{content}"
         )
 
-        text, error = self._call_api(prompt)
+        text, error = self._call_api(prompt, on_delta=on_delta)
         if error:
             return {"summary": "", "key_points": [], "error": error}
 
@@ -113,10 +181,15 @@ class AnalysisAgent:
         except Exception:
             return {"summary": text, "key_points": [], "error": None}
 
-    def translate_content(self, content, target_lang="zh"):
+    def translate_content(self, content, target_lang="zh", on_delta=None):
         """
         Translate content to target language.
 
+        Args:
+            content: Text to translate.
+            target_lang: Target language code.
+            on_delta: Optional callback(piece) to stream the translation.
+
         Returns:
             {"translated_text": str, "source_lang": str, "error": str|None}
         """
@@ -128,7 +201,7 @@ class AnalysisAgent:
             f"内容：\n{content}"
         )
 
-        text, error = self._call_api(prompt)
+        text, error = self._call_api(prompt, on_delta=on_delta)
         if error:
             return {"translated_text": "", "source_lang": "unknown", "error": error}
 
@@ -138,12 +211,89 @@ class AnalysisAgent:
             "error": None,
         }
 
-    def analyze_paper(self, paper_data):
+    def translate_batch(self, texts, target_lang="zh", batch_size=8):
+        """
+        Translate many short texts using a few numbered-prompt LLM calls.
+
+        Texts are packed into chunks of ``batch_size``; chunks run in parallel
+        (up to ``llm_concurrency``). Any text missing from a chunk's answer is
+        retried on its own with translate_content, on the same workers.
+
+        Returns:
+            List of {"translated_text": str, "source_lang": str, "error": str|None},
+            aligned with ``texts``.
+        """
+        if not texts:
+            return []
+
+        chunks = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        # Sized for the per-text retries too; threads are only started as work arrives
+        with ThreadPoolExecutor(max_workers=min(len(texts), self.llm_concurrency)) as executor:
+            chunk_results = list(executor.map(
+                lambda chunk: self._translate_chunk(chunk, target_lang), chunks
+            ))
+
+            results = [None] * len(texts)
+            retries = []
+            for start, translations in zip(range(0, len(texts), batch_size), chunk_results):
+                for idx in range(min(batch_size, len(texts) - start)):
+                    translated = translations.get(str(idx))
+                    if translated:
+                        results[start + idx] = {"translated_text": translated, "source_lang": "en", "error": None}
+                    else:
+                        retries.append(start + idx)
+
+            if retries:
+                logger.info(f"Batch translation: retrying {len(retries)} of {len(texts)} texts individually")
+                for pos, result in zip(retries, executor.map(
+                    lambda pos: self.translate_content(texts[pos], target_lang), retries
+                )):
+                    results[pos] = result
+        return results
+
+    def _translate_chunk(self, chunk, target_lang):
+        """
+        Translate a chunk of texts in a single API call.
+
+        Returns:
+            dict mapping index (as string) to translated text.
+        """
+        if not self.client:
+            return {}
+
+        lang_name = "中文" if target_lang == "zh" else target_lang
+        items_text = "\n\n".join(
+            f"[{idx}] {self._truncate(text)}" for idx, text in enumerate(chunk)
+        )
+        prompt = (
+            f"请将以下编号的每段内容分别准确翻译为{lang_name}。"
+            "保持专业术语准确，对于关键术语可在翻译后用括号标注英文原文。\n"
+            "以JSON对象返回，键为编号，值为译文，例如：\n"
+            '{"0": "译文0", "1": "译文1"}\n'
+            "只返回JSON对象，不要任何解释。\n\n"
+            f"{items_text}"
+        )
+
+        text, error = self._call_api(prompt, max_tokens=4000)
+        if error:
+            return {}
+
+        try:
+            parsed = self._extract_json(text)
+        except ValueError:
+            logger.warning("Batch translation returned no valid JSON")
+            return {}
+        if not isinstance(parsed, dict):
+            return {}
+        return {str(k): v for k, v in parsed.items() if isinstance(v, str) and v.strip()}
+
+    def analyze_paper(self, paper_data, on_delta=None):
         """
         Analyze an academic paper in depth.
 
         Args:
             paper_data: dict with keys like title, abstract, snippet.
+            on_delta: Optional callback(piece) to stream the raw answer.
 
         Returns:
             {"abstract": str, "method": str, "innovation": str,
@@ -161,7 +311,7 @@ class AnalysisAgent:
             f"论文信息：\n{content}"
         )
 
-        text, error = self._call_api(prompt)
+        text, error = self._call_api(prompt, on_delta=on_delta)
         if error:
             return {
                 "abstract_summary": "", "method": "", "innovation": "",
@@ -184,13 +334,14 @@ class AnalysisAgent:
                 "results": "", "conclusion": "", "error": None,
             }
 
-    def analyze_paper_full(self, title, full_text):
+    def analyze_paper_full(self, title, full_text, on_delta=None):
         """
         Deep analysis of an academic paper using its full PDF text.
 
         Args:
             title: Paper title.
             full_text: Full text extracted from PDF.
+            on_delta: Optional callback(piece) to stream the raw answer.
 
         Returns:
             dict with detailed analysis sections and error field.
@@ -202,17 +353,81 @@ class AnalysisAgent:
 
         prompt = (
             "你是一位资深的学术论文审阅专家。请对以下论文全文进行深度分析，"
-            "以JSON格式返回详细的分析结果。每个字段都请详细展开（每个字段至少100字）：\n\n"
-            '{"abstract_summary": "论文核心内容概述（包括研究背景、问题和主要贡献）",\n'
-            ' "method": "详细的研究方法和技术路线（包括模型架构、算法设计、数据处理方法等）",\n'
-            ' "innovation": "主要创新点和贡献（与现有工作的区别和改进）",\n'
-            ' "results": "实验结果和性能分析（包括数据集、评估指标、对比实验结果等）",\n'
-            ' "conclusion": "结论、局限性和未来工作方向"}\n\n'
+            f"{_FULL_ANALYSIS_FORMAT}"
             f"论文标题：{title}\n\n"
             f"论文全文：\n{full_text}"
         )
 
-        text, error = self._call_api(prompt, max_tokens=4000)
+        text, error = self._call_api(prompt, max_tokens=4000, on_delta=on_delta)
+        return self._paper_analysis_result(text, error)
+
+    def summarize_paper_chunks(self, title, chunks):
+        """
+        Map step of full-paper analysis: take notes on each chunk in parallel.
+
+        Args:
+            title: Paper title.
+            chunks: List of {"sections": [str], "text": str}.
+
+        Returns:
+            List of note strings (None where the call failed), aligned with ``chunks``.
+        """
+        if not chunks:
+            return []
+        with ThreadPoolExecutor(max_workers=min(len(chunks), self.llm_concurrency)) as executor:
+            return list(executor.map(lambda chunk: self._summarize_paper_chunk(title, chunk), chunks))
+
+    def _summarize_paper_chunk(self, title, chunk):
+        sections = ", ".join(chunk["sections"])
+        prompt = (
+            f"以下是论文《{title}》的一部分（所属章节：{sections}）。"
+            "请用中文为这部分内容写要点笔记，供之后汇总全文分析使用。"
+            "重点记录研究问题、方法与模型细节、数据集与实验设置、具体数值结果、结论与局限性；"
+            "只记录这部分文本中出现的信息，不要推测，不超过400字。\n\n"
+            f"{chunk['text']}"
+        )
+        text, error = self._call_api(prompt, max_tokens=800)
+        if error or not text or not text.strip():
+            return None
+        return text.strip()
+
+    def reduce_paper_analysis(self, title, notes, missing_sections=None, on_delta=None):
+        """
+        Reduce step of full-paper analysis: combine per-chunk notes into the five-field analysis.
+
+        Args:
+            title: Paper title.
+            notes: List of (sections, note) pairs in document order.
+            missing_sections: Headings (or section names) of chunks whose
+                notes could not be produced; the prompt says they are missing.
+            on_delta: Optional callback(piece) to stream the raw answer.
+
+        Returns:
+            dict with detailed analysis sections and error field.
+        """
+        notes_text = "\n\n".join(
+            f"[{i + 1}]（{', '.join(sections)}）\n{note}" for i, (sections, note) in enumerate(notes)
+        )
+        if missing_sections:
+            coverage = (
+                f"其中以下部分的笔记缺失：{'、'.join(dict.fromkeys(missing_sections))}。"
+                "请勿推测缺失部分的内容，相关字段如信息不足请注明。"
+            )
+        else:
+            coverage = "覆盖了论文的全部章节。"
+        prompt = (
+            "你是一位资深的学术论文审阅专家。以下是按论文顺序逐段整理的全文笔记，"
+            f"{coverage}请据此对论文进行深度分析，"
+            f"{_FULL_ANALYSIS_FORMAT}"
+            f"论文标题：{title}\n\n"
+            f"全文笔记：\n{notes_text}"
+        )
+
+        text, error = self._call_api(prompt, max_tokens=4000, on_delta=on_delta)
+        return self._paper_analysis_result(text, error)
+
+    def _paper_analysis_result(self, text, error):
+        """Parse a five-field paper analysis answer."""
         if error:
             return {
                 "abstract_summary": "", "method": "", "innovation": "",
@@ -244,7 +459,6 @@ class AnalysisAgent:
             pass
 
         # Try to find JSON in code blocks
-        import re
         patterns = [
             r"```json\s*(.*?)\s*```",
             r"```\s*(.*?)\s*```",
@@ -260,55 +474,133 @@ class AnalysisAgent:
 
         raise ValueError("No valid JSON found in response")
 
-    def evaluate_relevance_batch(self, query, results, batch_size=10):
+    def evaluate_relevance_batch(self, query, results, batch_size=None):
         """
         Evaluate semantic relevance of search results to the query in batches.
 
         Args:
             query: The original search query string.
             results: List of search result dicts with 'title' and 'snippet'.
-            batch_size: Number of results to evaluate per API call.
+            batch_size: Optional cap on results per API call
+                (defaults to ``relevance_max_batch``).
 
         Returns:
-            List of dicts with original result data plus 'relevance_score' (0-100).
+            List of dicts with original result data plus 'relevance_score' (0-100),
+            in the same order as ``results``. Results the LLM could not score get 50.
         """
-        if not results:
-            return []
-
+        scores = self.score_relevance(query, results, batch_size)
         scored_results = []
-
-        # Process in batches to optimize API calls
-        for i in range(0, len(results), batch_size):
-            batch = results[i:i + batch_size]
-            batch_scores = self._evaluate_batch(query, batch)
-
-            for j, item in enumerate(batch):
-                score = batch_scores.get(str(j), 50)  # Default to 50 if not found
-                scored_item = dict(item)
-                scored_item["relevance_score"] = score
-                scored_results.append(scored_item)
-
+        for idx, item in enumerate(results):
+            scored_item = dict(item)
+            scored_item["relevance_score"] = scores.get(idx, 50)  # Default to 50 if not found
+            scored_results.append(scored_item)
         return scored_results
 
-    def _evaluate_batch(self, query, batch):
+    def score_relevance(self, query, results, batch_size=None):
         """
-        Evaluate relevance for a batch of results in a single API call.
+        Score semantic relevance of search results to the query.
+
+        Batches are sized to fit ``relevance_token_budget`` and run
+        concurrently, with at most ``llm_concurrency`` relevance calls in
+        flight per agent. A failed batch is retried on its own up to
+        ``relevance_max_retries`` times.
 
         Returns:
-            dict mapping index (as string) to relevance score (0-100).
+            dict mapping result index (int) to relevance score (0-100).
+            Results that could not be scored are absent.
         """
+        if not results:
+            return {}
+
         if not self.client:
             logger.warning("AI client not configured, skipping relevance evaluation")
             return {}
 
-        # Build the prompt with numbered results
-        results_text = []
-        for idx, item in enumerate(batch):
-            title = item.get("title", "")[:100]
-            snippet = item.get("snippet", "")[:200]
-            results_text.append(f"[{idx}] Title: {title}\nSnippet: {snippet}")
+        batches = self._plan_relevance_batches(query, results, batch_size or self.relevance_max_batch)
+        workers = min(len(batches), self.llm_concurrency)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="relevance") as executor:
+            batch_scores = list(executor.map(
+                lambda batch: self._score_batch(query, batch), batches
+            ))
+
+        scores = {}
+        offset = 0
+        for batch, batch_result in zip(batches, batch_scores):
+            for j, score in batch_result.items():
+                scores[offset + j] = score
+            offset += len(batch)
+
+        logger.info(
+            f"Relevance scored {len(scores)}/{len(results)} results in {len(batches)} batches "
+            f"({workers} concurrent)"
+        )
+        return scores
 
-        prompt = f"""Evaluate the semantic relevance of each search result to the query.
+    def estimate_relevance_calls(self, query, results):
+        """Number of LLM calls score_relevance would make for these results (no retries)."""
+        if not results:
+            return 0
+        return len(self._plan_relevance_batches(query, results, self.relevance_max_batch))
+
+    def _plan_relevance_batches(self, query, results, max_batch):
+        """
+        Split results into consecutive batches that fit the prompt token budget.
+
+        Every batch holds at least one result and at most ``max_batch``.
+        """
+        available = self.relevance_token_budget - estimate_tokens(self._relevance_prompt(query, []))
+        batches = []
+        current = []
+        used = 0
+        for item in results:
+            cost = estimate_tokens(self._format_relevance_item(len(current), item))
+            if current and (len(current) >= max_batch or used + cost > available):
+                batches.append(current)
+                current = []
+                used = 0
+            current.append(item)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    def _score_batch(self, query, batch):
+        """
+        Score one batch, retrying only the results the LLM failed to score.
+
+        Returns:
+            dict mapping batch index (int) to relevance score (0-100).
+        """
+        scores = {}
+        pending = list(range(len(batch)))
+        for attempt in range(self.relevance_max_retries + 1):
+            if attempt:
+                logger.info(f"Retrying relevance for {len(pending)} of {len(batch)} results (attempt {attempt + 1})")
+            with self._relevance_slots:
+                result = self._evaluate_batch(query, [batch[i] for i in pending])
+            if result is None:
+                continue
+            for j, i in enumerate(pending):
+                if str(j) in result:
+                    scores[i] = result[str(j)]
+            pending = [i for i in pending if i not in scores]
+            if not pending:
+                break
+        if pending:
+            logger.warning(f"No relevance score for {len(pending)} results after retries, using default")
+        return scores
+
+    @staticmethod
+    def _format_relevance_item(idx, item):
+        title = item.get("title", "")[:100]
+        snippet = item.get("snippet", "")[:200]
+        return f"[{idx}] Title: {title}\nSnippet: {snippet}"
+
+    def _relevance_prompt(self, query, batch):
+        """Build the relevance scoring prompt for a batch of results."""
+        results_text = [self._format_relevance_item(idx, item) for idx, item in enumerate(batch)]
+
+        return f"""Evaluate the semantic relevance of each search result to the query.
 
 Query: "{query}"
 
@@ -332,29 +624,44 @@ Example response format:
 
 Return ONLY the JSON object, no explanation."""
 
+    def _evaluate_batch(self, query, batch):
+        """
+        Evaluate relevance for a batch of results in a single API call.
+
+        Returns:
+            dict mapping index (as string) to relevance score (0-100), without
+            indices whose score could not be parsed, or None if the call or
+            response parsing failed.
+        """
+        prompt = self._relevance_prompt(query, batch)
+
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,  # Lower temperature for more consistent scoring
-                max_tokens=500,
+                max_tokens=max(500, 10 * len(batch)),
             )
             text = response.choices[0].message.content
 
             # Parse the JSON response
             scores = self._extract_json(text)
+            if not isinstance(scores, dict):
+                raise ValueError("Relevance response is not a JSON object")
 
-            # Validate and convert scores
+            # Validate and convert scores; unparseable values stay unscored so they
+            # are retried instead of being stored as a neutral score
             validated_scores = {}
             for key, value in scores.items():
                 try:
                     score = int(value)
-                    validated_scores[str(key)] = max(0, min(100, score))
                 except (ValueError, TypeError):
-                    validated_scores[str(key)] = 50
+                    logger.warning(f"Ignoring unparseable relevance score for [{key}]: {value!r}")
+                    continue
+                validated_scores[str(key)] = max(0, min(100, score))
 
             return validated_scores
 
         except Exception as e:
             logger.error(f"Relevance evaluation failed: {e}")
-            return {}
+            return None
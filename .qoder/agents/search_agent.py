@@ -1,18 +1,19 @@
 import sys
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from concurrent.futures import as_completed, TimeoutError as FuturesTimeoutError
 from urllib.parse import quote_plus
 from datetime import datetime, timedelta
 
 # Ensure project root is in path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
-import arxiv
-import requests
 from bs4 import BeautifulSoup
 from duckduckgo_search import DDGS
 
 from backend.services.rate_limiter import RateLimiter
+from backend.services.worker_pool import WorkerPools, PoolOverloadedError
+from backend.services.http_pool import HttpSessionPool
+from backend.services.arxiv_fetcher import get_arxiv_fetcher, SORT_RELEVANCE, SORT_SUBMITTED_DATE
 from backend.config import get_config
 from backend.utils.logger import get_logger
 
@@ -25,11 +26,13 @@ class SearchAgent:
     def __init__(self):
         config = get_config()
         self.rate_limiter = RateLimiter(config.RATE_LIMITS)
+        self.pools = WorkerPools(config.WORKER_POOLS)
         self.max_results = config.SEARCH_DEFAULTS.get("max_results_per_source", 15)
         self.timeout = config.SEARCH_DEFAULTS.get("timeout_seconds", 30)
         self.proxy = config.HTTP_PROXY if config.HTTP_PROXY else None
         if self.proxy:
             logger.info(f"Using proxy: {self.proxy}")
+        self.http = HttpSessionPool(config.HTTP_POOL, proxy=self.proxy)
 
     @staticmethod
     def _calculate_date_range(time_range):
@@ -83,58 +86,172 @@ class SearchAgent:
             {
                 "results": [...],
                 "total": int,
-                "sources_status": {"source_name": "success"|"failed"|"skipped"}
+                "sources_status": {"source_name": "success"|"failed"|"timeout"|"overloaded"|"skipped"}
             }
         """
         filters = filters or {}
         all_results = []
         sources_status = {}
 
-        source_methods = {
-            "duckduckgo": self._search_duckduckgo,
-            "arxiv": self._search_arxiv,
-            "scholar": self._search_scholar,
-            "zhihu": self._search_zhihu,
+        for src, status, results in self.iter_source_results(query, sources, filters):
+            sources_status[src] = status
+            all_results.extend(results)
+
+        unique_results = self.dedupe_and_filter(all_results, filters)
+
+        return {
+            "results": unique_results,
+            "total": len(unique_results),
+            "sources_status": sources_status,
         }
 
+    def iter_source_results(self, query, sources, filters=None):
+        """
+        Concurrently search multiple sources, yielding each as it finishes.
+
+        Args:
+            query: Search keyword string.
+            sources: List of source names.
+            filters: Optional filters dict.
+
+        Yields:
+            (source_name, status, results) tuples in completion order, where
+            status is "success", "failed", "timeout", "overloaded" or
+            "skipped" and results
+            is an empty list unless the source succeeded.
+        """
+        filters = filters or {}
+        source_methods = self._source_methods()
+
         # Filter to valid sources
         tasks = {}
         for src in sources:
             if src in source_methods:
                 tasks[src] = source_methods[src]
             else:
-                sources_status[src] = "skipped"
+                yield src, "skipped", []
 
         if not tasks:
-            return {"results": [], "total": 0, "sources_status": sources_status}
+            return
 
-        with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
-            futures = {
-                executor.submit(method, query, filters): src
-                for src, method in tasks.items()
-            }
+        futures = {}
+        for src, method in tasks.items():
+            try:
+                futures[self.pools.submit(src, method, query, filters)] = src
+            except PoolOverloadedError:
+                logger.warning(f"Source '{src}' overloaded, shedding request")
+                yield src, "overloaded", []
+
+        completed_sources = set()
+        try:
+            for future in as_completed(futures, timeout=self.timeout):
+                src = futures[future]
+                completed_sources.add(src)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logger.error(f"Source '{src}' failed: {e}")
+                    yield src, "failed", []
+                    continue
+                logger.info(f"Source '{src}' returned {len(results)} results")
+                yield src, "success", results
+        except FuturesTimeoutError:
+            # Mark uncompleted sources as timeout
+            for future, src in futures.items():
+                if src not in completed_sources:
+                    logger.warning(f"Source '{src}' timed out")
+                    future.cancel()
+                    yield src, "timeout", []
+        finally:
+            # Release queue slots held by sources the caller stopped waiting on
+            for future in futures:
+                future.cancel()
+
+    def search_queries(self, queries, sources, filters=None):
+        """
+        Concurrently search several queries across several sources.
+
+        Every (query, source) pair is submitted to the agent's long-lived
+        per-source worker pools and the whole fan-out shares a single deadline
+        (``timeout_seconds``). Per-source rate limits still apply because each
+        source method acquires its own token bucket. Results are collected as
+        they arrive but assembled in (query, source) input order, so the
+        output is stable regardless of completion order.
+
+        Args:
+            queries: List of search keyword strings.
+            sources: List of source names.
+            filters: Optional filters dict.
 
-            completed_sources = set()
+        Returns:
+            {query: {"results": [...], "total": int, "sources_status": {...}}}
+        """
+        filters = filters or {}
+        source_methods = self._source_methods()
+
+        valid_sources = [src for src in sources if src in source_methods]
+        pairs = [(query, src) for query in queries for src in valid_sources]
+        pair_results = {}
+        statuses = {query: {} for query in queries}
+
+        for query in queries:
+            for src in sources:
+                if src not in source_methods:
+                    statuses[query][src] = "skipped"
+
+        futures = {}
+        for query, src in pairs:
             try:
-                for future in as_completed(futures, timeout=self.timeout):
-                    src = futures[future]
-                    completed_sources.add(src)
-                    try:
-                        results = future.result()
-                        all_results.extend(results)
-                        sources_status[src] = "success"
-                        logger.info(f"Source '{src}' returned {len(results)} results")
-                    except Exception as e:
-                        sources_status[src] = "failed"
-                        logger.error(f"Source '{src}' failed: {e}")
-            except FuturesTimeoutError:
-                # Mark uncompleted sources as timeout
-                for future, src in futures.items():
-                    if src not in completed_sources:
-                        sources_status[src] = "timeout"
-                        logger.warning(f"Source '{src}' timed out")
-                        future.cancel()
+                future = self.pools.submit(src, source_methods[src], query, filters)
+                futures[future] = (query, src)
+            except PoolOverloadedError:
+                statuses[query][src] = "overloaded"
+                logger.warning(f"Source '{src}' overloaded, shedding query='{query}'")
 
+        try:
+            for future in as_completed(futures, timeout=self.timeout):
+                query, src = futures[future]
+                try:
+                    pair_results[(query, src)] = future.result()
+                    statuses[query][src] = "success"
+                    logger.info(
+                        f"Source '{src}' returned {len(pair_results[(query, src)])} "
+                        f"results for query='{query}'"
+                    )
+                except Exception as e:
+                    statuses[query][src] = "failed"
+                    logger.error(f"Source '{src}' failed for query='{query}': {e}")
+        except FuturesTimeoutError:
+            for future, (query, src) in futures.items():
+                if src not in statuses[query]:
+                    statuses[query][src] = "timeout"
+                    logger.warning(f"Source '{src}' timed out for query='{query}'")
+                    future.cancel()
+
+        output = {}
+        for query in queries:
+            merged = []
+            for src in valid_sources:
+                merged.extend(pair_results.get((query, src), []))
+            unique_results = self.dedupe_and_filter(merged, filters)
+            output[query] = {
+                "results": unique_results,
+                "total": len(unique_results),
+                "sources_status": statuses[query],
+            }
+        return output
+
+    def _source_methods(self):
+        """Map source names to their search methods."""
+        return {
+            "duckduckgo": self._search_duckduckgo,
+            "arxiv": self._search_arxiv,
+            "scholar": self._search_scholar,
+            "zhihu": self._search_zhihu,
+        }
+
+    def dedupe_and_filter(self, all_results, filters):
+        """Deduplicate results by URL and apply the time range post-filter."""
         # Deduplicate by URL
         seen_urls = set()
         unique_results = []
@@ -168,11 +285,7 @@ class SearchAgent:
             )
             unique_results = filtered
 
-        return {
-            "results": unique_results,
-            "total": len(unique_results),
-            "sources_status": sources_status,
-        }
+        return unique_results
 
     def _search_duckduckgo(self, query, filters):
         """Search using Bing as backend (DuckDuckGo inaccessible in some regions)."""
@@ -191,7 +304,7 @@ class SearchAgent:
                 "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             }
 
-            resp = requests.get(search_url, headers=headers, timeout=15)
+            resp = self.http.get(search_url, headers=headers, timeout=15)
             resp.raise_for_status()
 
             soup = BeautifulSoup(resp.text, "html.parser")
@@ -233,39 +346,35 @@ class SearchAgent:
             # When filtering by time, sort by date (newest first) and fetch extra
             # to compensate for post-filtering; arXiv API does NOT support
             # submittedDate as a query field, so we must filter locally.
-            sort_by = arxiv.SortCriterion.Relevance
+            sort_by = SORT_RELEVANCE
             fetch_limit = self.max_results
             if date_range:
-                sort_by = arxiv.SortCriterion.SubmittedDate
+                sort_by = SORT_SUBMITTED_DATE
                 fetch_limit = self.max_results * 5
                 logger.info(f"arXiv date filter active: {date_range[0].strftime('%Y-%m-%d')} to {date_range[1].strftime('%Y-%m-%d')}")
 
-            # Use smaller page_size and add delay to avoid 429 rate limiting
-            client = arxiv.Client(page_size=fetch_limit, delay_seconds=1.0, num_retries=2)
-            search = arxiv.Search(
-                query=query,
-                max_results=fetch_limit,
-                sort_by=sort_by,
-            )
-            for paper in client.results(search):
+            # Shared fetcher paces all arXiv requests process-wide and caches pages
+            fetcher = get_arxiv_fetcher()
+            for paper in fetcher.iter_results(query, sort_by=sort_by, max_results=fetch_limit):
+                published = paper["published"]
                 # Post-filter by date range using the actual published datetime
-                if date_range and paper.published:
-                    pub_naive = paper.published.replace(tzinfo=None) if paper.published.tzinfo else paper.published
+                if date_range and published:
+                    pub_naive = published.replace(tzinfo=None) if published.tzinfo else published
                     if pub_naive < date_range[0]:
                         continue
 
-                arxiv_id = paper.entry_id.split("/abs/")[-1]
+                arxiv_id = paper["entry_id"].split("/abs/")[-1]
                 results.append({
-                    "title": paper.title,
-                    "url": paper.entry_id,
-                    "snippet": paper.summary[:500] if paper.summary else "",
+                    "title": paper["title"],
+                    "url": paper["entry_id"],
+                    "snippet": paper["summary"][:500] if paper["summary"] else "",
                     "source": "arxiv",
-                    "authors": ", ".join(a.name for a in paper.authors[:5]),
-                    "published": paper.published.isoformat() if paper.published else "",
+                    "authors": ", ".join(paper["authors"][:5]),
+                    "published": published.isoformat() if published else "",
                     "extra": {
                         "arxiv_id": arxiv_id,
-                        "pdf_url": paper.pdf_url,
-                        "categories": [c for c in (paper.categories or [])],
+                        "pdf_url": paper["pdf_url"],
+                        "categories": list(paper["categories"]),
                     },
                 })
 
@@ -304,23 +413,11 @@ class SearchAgent:
                 "Accept": "application/json",
                 "User-Agent": "SearchIsAllYouNeed/1.0",
             }
-            
-            # Retry with backoff for rate limits
-            import time
-            max_retries = 2
-            for attempt in range(max_retries + 1):
-                resp = requests.get(api_url, params=params, headers=headers, timeout=15)
-                if resp.status_code == 429:
-                    if attempt < max_retries:
-                        wait_time = 2 ** attempt  # 1, 2 seconds
-                        logger.info(f"Semantic Scholar rate limited, retrying in {wait_time}s...")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        raise Exception("Rate limit exceeded after retries")
-                resp.raise_for_status()
-                break
-            
+
+            # 429/5xx are retried with backoff by the pooled session's adapter
+            resp = self.http.get(api_url, params=params, headers=headers, timeout=15)
+            resp.raise_for_status()
+
             data = resp.json()
             
             for paper in data.get("data", []):
@@ -373,7 +470,7 @@ class SearchAgent:
                 "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             }
             
-            resp = requests.get(search_url, headers=headers, timeout=15)
+            resp = self.http.get(search_url, headers=headers, timeout=15)
             resp.raise_for_status()
             
             soup = BeautifulSoup(resp.text, "html.parser")
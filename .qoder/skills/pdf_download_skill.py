@@ -1,26 +1,56 @@
+import base64
+import heapq
+import itertools
+import json
 import os
-import sqlite3
+import random
+import re
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import uuid
+from collections import OrderedDict
 from urllib.parse import urlparse
 
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from backend.models.database import pooled_connection
+from backend.models.db_writer import get_db_writer
+from backend.services.pdf_extractor import get_pdf_extractor
+from backend.services.pdf_text_store import schedule_extraction
+from backend.services.progress_bus import get_progress_bus
 from backend.utils.logger import get_logger
 
 logger = get_logger("pdf_download_skill")
 
 # Download configuration
 MAX_CONCURRENT_DOWNLOADS = int(os.getenv("MAX_CONCURRENT_DOWNLOADS", "5"))
+MAX_DOWNLOADS_PER_MIRROR = int(os.getenv("MAX_DOWNLOADS_PER_MIRROR", "2"))
+MAX_TRACKED_BATCHES = 100  # Batches kept in memory for progress queries
 CHUNK_SIZE = 512 * 1024  # 512KB chunks for better throughput
 CONNECTION_TIMEOUT = 30  # Connection timeout
 READ_TIMEOUT = 300  # Read timeout for large files
+PROGRESS_PUBLISH_INTERVAL = 0.25  # Min seconds between progress events per download
+ATTEMPTS_PER_MIRROR = 2  # Connection drops resume on the same mirror before moving on
 
-# Global download thread pool
-_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DOWNLOADS)
+# Mirror health scoring
+MIRROR_EWMA_ALPHA = 0.3  # Weight of the newest sample
+MIRROR_EXPLORE_RATE = 0.1  # Share of downloads sent to a random non-best mirror
+TYPICAL_PDF_BYTES = 2 * 1024 * 1024  # Transfer size mirrors are ranked for
+MIN_THROUGHPUT_SAMPLE_BYTES = 64 * 1024  # Smaller transfers only update TTFB
+
+DOWNLOAD_STATUSES = ("pending", "downloading", "completed", "failed")
+# In-flight states live on the progress bus; the database keeps these rows as 'pending'
+IN_PROGRESS_STATUSES = ("pending", "downloading")
+
+_RECORD_COLUMNS = "id, title, url, pdf_path, status, file_size, progress, timestamp"
+
+# Scheduling priorities (lower runs first). Full-analysis fetches use
+# PRIORITY_INTERACTIVE: a request is blocked waiting for them.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+PRIORITIES = {"interactive": PRIORITY_INTERACTIVE, "bulk": PRIORITY_BULK}
 
 # Connection pool with retry strategy
 _session = None
@@ -32,10 +62,16 @@ ARXIV_MIRRORS = [
     "https://export.arxiv.org/pdf/",  # Export mirror
 ]
 
-# Cache for best mirror (per session)
-_best_mirror = None
-_mirror_test_lock = threading.Lock()
-_mirror_selected_time = 0
+# How long get_or_download_pdf waits for a download: every attempt on every mirror timing out
+DOWNLOAD_WAIT_TIMEOUT = len(ARXIV_MIRRORS) * ATTEMPTS_PER_MIRROR * (CONNECTION_TIMEOUT + READ_TIMEOUT)
+
+# In-flight downloads by arXiv ID, so concurrent requests share one transfer
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+# Recent batches: batch_id -> [(arxiv_id, record_id)]
+_batches = OrderedDict()
+_batches_lock = threading.Lock()
 
 
 def _get_session():
@@ -67,187 +103,736 @@ def _get_session():
     return _session
 
 
-def _test_mirror_speed(mirror_url, test_id="2301.00001"):
-    """Test mirror response time."""
+class _MirrorHealth:
+    """
+    Per-mirror health from real transfers.
+
+    Tracks exponentially-weighted throughput, time-to-first-byte and error
+    rate for each mirror, and ranks mirrors by the expected time to fetch a
+    typical PDF. Mirrors without samples rank first so each gets tried, and
+    a small share of downloads go to a random non-best mirror so a mirror
+    that recovers (or slows down) is noticed.
+    """
+
+    def __init__(self, alpha=MIRROR_EWMA_ALPHA, explore_rate=MIRROR_EXPLORE_RATE):
+        self.alpha = alpha
+        self.explore_rate = explore_rate
+        self.entries = {}
+        self.explorations = 0
+        self.lock = threading.Lock()
+
+    def _entry(self, mirror):
+        """Get or create a mirror's entry. Must be called within lock."""
+        entry = self.entries.get(mirror)
+        if entry is None:
+            entry = {
+                "throughput": None, "ttfb": None, "error_rate": 0.0,
+                "transfers": 0, "errors": 0, "bytes": 0,
+            }
+            self.entries[mirror] = entry
+        return entry
+
+    def _ewma(self, old, value):
+        return value if old is None else old + self.alpha * (value - old)
+
+    def record_success(self, mirror, ttfb, nbytes, seconds):
+        """Record a completed transfer of nbytes taking seconds after the first byte."""
+        with self.lock:
+            entry = self._entry(mirror)
+            entry["transfers"] += 1
+            entry["bytes"] += nbytes
+            entry["error_rate"] = self._ewma(entry["error_rate"], 0.0)
+            entry["ttfb"] = self._ewma(entry["ttfb"], ttfb)
+            if nbytes >= MIN_THROUGHPUT_SAMPLE_BYTES and seconds > 0:
+                entry["throughput"] = self._ewma(entry["throughput"], nbytes / seconds)
+
+    def record_error(self, mirror):
+        """Record a failed or interrupted transfer."""
+        with self.lock:
+            entry = self._entry(mirror)
+            entry["transfers"] += 1
+            entry["errors"] += 1
+            entry["error_rate"] = self._ewma(entry["error_rate"], 1.0)
+
+    def _expected_seconds(self, entry):
+        """Expected seconds to fetch a typical PDF, including retries; None if unmeasured."""
+        if entry is None or entry["throughput"] is None:
+            return None
+        seconds = (entry["ttfb"] or 0.0) + TYPICAL_PDF_BYTES / entry["throughput"]
+        return seconds / max(1.0 - entry["error_rate"], 0.05)
+
+    def _sort_key(self, entry):
+        if entry is None or entry["transfers"] == 0:
+            return 0.0  # Unexplored: try it
+        expected = self._expected_seconds(entry)
+        # Only failures (or only tiny files) so far: after every measured mirror
+        return float("inf") if expected is None else expected
+
+    def rank(self, mirrors):
+        """
+        Order mirrors best first, occasionally promoting another one to explore it.
+
+        Returns:
+            A new list with the same mirrors.
+        """
+        with self.lock:
+            ranked = sorted(mirrors, key=lambda m: self._sort_key(self.entries.get(m)))
+            if len(ranked) > 1 and random.random() < self.explore_rate:
+                explore = random.choice(ranked[1:])
+                ranked.remove(explore)
+                ranked.insert(0, explore)
+                self.explorations += 1
+            return ranked
+
+    def reset(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """Per-mirror health, best first."""
+        with self.lock:
+            mirrors = []
+            for mirror, entry in self.entries.items():
+                expected = self._expected_seconds(entry)
+                mirrors.append({
+                    "mirror": mirror,
+                    "bytes_per_second": round(entry["throughput"]) if entry["throughput"] else None,
+                    "ttfb_ms": round(entry["ttfb"] * 1000) if entry["ttfb"] is not None else None,
+                    "error_rate": round(entry["error_rate"], 3),
+                    "expected_seconds": round(expected, 2) if expected is not None else None,
+                    "transfers": entry["transfers"],
+                    "errors": entry["errors"],
+                    "bytes": entry["bytes"],
+                })
+            mirrors.sort(key=lambda m: self._sort_key(self.entries[m["mirror"]]))
+            return {
+                "mirrors": mirrors,
+                "explore_rate": self.explore_rate,
+                "explorations": self.explorations,
+            }
+
+
+class _MirrorLimiter:
+    """Caps concurrent transfers per mirror."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = {}
+        self.cond = threading.Condition()
+
+    def acquire(self, mirrors):
+        """
+        Take a transfer slot on one of the given mirrors.
+
+        Prefers mirrors earlier in the list and blocks only while every
+        one of them is at its limit.
+
+        Returns:
+            The mirror that was acquired.
+        """
+        with self.cond:
+            while True:
+                for mirror in mirrors:
+                    if self.active.get(mirror, 0) < self.limit:
+                        self.active[mirror] = self.active.get(mirror, 0) + 1
+                        return mirror
+                self.cond.wait()
+
+    def release(self, mirror):
+        with self.cond:
+            self.active[mirror] -= 1
+            self.cond.notify_all()
+
+    def stats(self):
+        with self.cond:
+            return {"limit": self.limit, "active": dict(self.active)}
+
+
+class _DownloadJob:
+    """One in-flight download that later callers for the same arXiv ID attach to."""
+
+    def __init__(self, arxiv_id, priority, save_dir, db_path):
+        self.arxiv_id = arxiv_id
+        self.priority = priority
+        self.save_dir = save_dir
+        self.db_path = db_path
+        self.record_id = None
+        self.ready = threading.Event()  # record_id is set
+        self.done = threading.Event()
+        self.queued = False  # submitted to the scheduler (record_id is set)
+        self.started = False
+        self.path = None
+        self.attached = 0
+
+
+class _DownloadScheduler:
+    """
+    Priority queue of download jobs served by MAX_CONCURRENT_DOWNLOADS workers.
+
+    Jobs run lowest priority value first, FIFO within a priority. Promoting a
+    queued job pushes a second heap entry; whichever entry is popped first
+    runs the job and the other is skipped. Promoting a job that is not yet
+    submitted only raises the priority it will be queued with.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.heap = []
+        self.seq = itertools.count()
+        self.cond = threading.Condition()
+        self.threads = []
+        self.running = 0
+
+    def _ensure_workers(self):
+        """Start worker threads on first use. Must be called within cond."""
+        while len(self.threads) < self.workers:
+            thread = threading.Thread(
+                target=self._run, name=f"pdf-download-{len(self.threads)}", daemon=True
+            )
+            self.threads.append(thread)
+            thread.start()
+
+    def submit(self, job):
+        with self.cond:
+            self._ensure_workers()
+            job.queued = True
+            heapq.heappush(self.heap, (job.priority, next(self.seq), job))
+            self.cond.notify()
+
+    def promote(self, job, priority):
+        """Raise a queued job to a more urgent priority."""
+        with self.cond:
+            if job.started or priority >= job.priority:
+                return
+            job.priority = priority
+            if not job.queued:
+                # Its leader is still creating the record; submit() will use the new priority
+                return
+            heapq.heappush(self.heap, (priority, next(self.seq), job))
+            self.cond.notify()
+
+    def _next_job(self):
+        with self.cond:
+            while True:
+                while self.heap:
+                    _, _, job = heapq.heappop(self.heap)
+                    if not job.started:
+                        job.started = True
+                        self.running += 1
+                        return job
+                self.cond.wait()
+
+    def _run(self):
+        while True:
+            job = self._next_job()
+            try:
+                _download_worker(job)
+            except Exception as e:
+                logger.error(f"Download worker error for {job.arxiv_id}: {e}", exc_info=True)
+            finally:
+                with self.cond:
+                    self.running -= 1
+
+    def stats(self):
+        with self.cond:
+            queued = {}
+            for _, _, job in self.heap:
+                if not job.started:
+                    queued[job.arxiv_id] = job.priority
+            by_priority = {name: 0 for name in PRIORITIES}
+            names = {value: name for name, value in PRIORITIES.items()}
+            for priority in queued.values():
+                by_priority[names[priority]] += 1
+            return {"workers": self.workers, "running": self.running, "queued": by_priority}
+
+
+_scheduler = _DownloadScheduler(MAX_CONCURRENT_DOWNLOADS)
+_mirror_limiter = _MirrorLimiter(MAX_DOWNLOADS_PER_MIRROR)
+_mirror_health = _MirrorHealth()
+
+
+def _save_path_for(arxiv_id, save_dir):
+    return os.path.join(save_dir, f"{arxiv_id.replace('/', '_')}.pdf")
+
+
+def _join_or_start(arxiv_id, title, db_path, save_dir, priority=PRIORITY_INTERACTIVE):
+    """
+    Attach to the in-flight download of arxiv_id, or start one.
+
+    Attaching with a more urgent priority promotes the job if it is still queued.
+
+    Returns:
+        (job, started) where job is None if the PDF is already on disk.
+    """
+    save_path = _save_path_for(arxiv_id, save_dir)
+    with _inflight_lock:
+        job = _inflight.get(arxiv_id)
+        if job is not None:
+            job.attached += 1
+            started = False
+        elif os.path.exists(save_path) and validate_pdf(save_path):
+            # Checked under the lock: a finished job is unregistered only after its file is in place
+            return None, False
+        else:
+            job = _DownloadJob(arxiv_id, priority, save_dir, str(db_path))
+            _inflight[arxiv_id] = job
+            started = True
+
+    if not started:
+        job.ready.wait()
+        if job.record_id is None:
+            # The leader could not create the download record and has given up
+            raise RuntimeError(f"In-flight download of {arxiv_id} failed to start")
+        _scheduler.promote(job, priority)
+        logger.info(f"Attached to in-flight download: id={job.record_id}, arxiv_id={arxiv_id}")
+        return job, False
+
     try:
-        url = f"{mirror_url}{test_id}.pdf"
-        start = time.time()
-        resp = _get_session().head(url, timeout=5, allow_redirects=True)
-        if resp.status_code < 400:
-            return time.time() - start
+        url = f"https://arxiv.org/pdf/{arxiv_id}.pdf"
+        job.record_id = get_db_writer(db_path).execute(
+            "INSERT INTO download_records (title, url, status) VALUES (?, ?, 'pending')",
+            (title, url),
+            wait=True,
+        ).lastrowid
+        get_progress_bus().publish(job.record_id, "pending", progress=0, file_size=0)
+        _scheduler.submit(job)
     except Exception:
-        pass
-    return float('inf')
-
-
-def _get_best_mirror():
-    """Find the fastest available mirror using parallel testing."""
-    global _best_mirror, _mirror_selected_time
-    if _best_mirror is not None and (time.time() - _mirror_selected_time) < 600:
-        return _best_mirror
-    
-    with _mirror_test_lock:
-        if _best_mirror is not None and (time.time() - _mirror_selected_time) < 600:
-            return _best_mirror
-        
-        logger.info("Testing arXiv mirrors for best speed (parallel)...")
-        results = []
-        
-        with ThreadPoolExecutor(max_workers=len(ARXIV_MIRRORS)) as test_executor:
-            futures = {test_executor.submit(_test_mirror_speed, m): m for m in ARXIV_MIRRORS}
-            for future in as_completed(futures, timeout=6):
-                mirror = futures[future]
-                try:
-                    latency = future.result()
-                    logger.info(f"Mirror {mirror}: {latency:.2f}s")
-                    results.append((latency, mirror))
-                except Exception:
-                    logger.info(f"Mirror {mirror}: failed")
-        
-        if results:
-            results.sort(key=lambda x: x[0])
-            _best_mirror = results[0][1]
-        else:
-            _best_mirror = ARXIV_MIRRORS[0]
-        
-        _mirror_selected_time = time.time()
-        logger.info(f"Selected best mirror: {_best_mirror}")
-        return _best_mirror
+        with _inflight_lock:
+            _inflight.pop(arxiv_id, None)
+        job.done.set()
+        raise
+    finally:
+        job.ready.set()
+    logger.info(f"Download started: id={job.record_id}, arxiv_id={arxiv_id}")
+    return job, True
 
 
-def start_download(arxiv_id, title, db_path, save_dir):
+def start_download(arxiv_id, title, db_path, save_dir, priority=PRIORITY_INTERACTIVE):
     """
     Start a background PDF download for an arXiv paper.
 
+    If the same paper is already downloading, the caller is attached to
+    that download and gets its record ID instead of starting a second one.
+
     Args:
         arxiv_id: arXiv paper ID (e.g., "2301.00001").
         title: Paper title for record keeping.
         db_path: Path to SQLite database.
         save_dir: Directory to save downloaded PDFs.
+        priority: PRIORITY_INTERACTIVE or PRIORITY_BULK.
 
     Returns:
-        Download record ID.
+        (record_id, status).
     """
     os.makedirs(save_dir, exist_ok=True)
-    
-    # Check if file already exists (cache hit)
-    save_path = os.path.join(save_dir, f"{arxiv_id.replace('/', '_')}.pdf")
-    if os.path.exists(save_path) and validate_pdf(save_path):
-        file_size = os.path.getsize(save_path)
-        url = f"https://arxiv.org/pdf/{arxiv_id}.pdf"
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.execute(
-            "INSERT INTO download_records (title, url, status, pdf_path, file_size) VALUES (?, ?, 'completed', ?, ?)",
-            (title, url, save_path, file_size),
-        )
-        record_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        logger.info(f"Cache hit: id={record_id}, arxiv_id={arxiv_id}")
-        return record_id, "completed"
-    
+
+    job, started = _join_or_start(arxiv_id, title, db_path, save_dir, priority)
+    if job is not None:
+        if started:
+            return job.record_id, "pending"
+        state = get_progress_bus().get_state(job.record_id)
+        return job.record_id, state["status"] if state else "downloading"
+
+    # File already exists (cache hit)
+    save_path = _save_path_for(arxiv_id, save_dir)
+    file_size = os.path.getsize(save_path)
     url = f"https://arxiv.org/pdf/{arxiv_id}.pdf"
-    conn = sqlite3.connect(str(db_path))
-    cursor = conn.execute(
-        "INSERT INTO download_records (title, url, status) VALUES (?, ?, 'pending')",
-        (title, url),
+    record_id = get_db_writer(db_path).execute(
+        "INSERT INTO download_records (title, url, status, pdf_path, file_size) VALUES (?, ?, 'completed', ?, ?)",
+        (title, url, save_path, file_size),
+        wait=True,
+    ).lastrowid
+    get_progress_bus().publish(
+        record_id, "completed", progress=100, file_size=file_size, pdf_path=save_path
     )
-    record_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    logger.info(f"Cache hit: id={record_id}, arxiv_id={arxiv_id}")
+    return record_id, "completed"
+
+
+def start_batch_download(papers, db_path, save_dir, priority=PRIORITY_BULK):
+    """
+    Queue downloads for several papers and track them as one batch.
+
+    Duplicate IDs within the batch, and papers already downloading, share
+    a single download record.
+
+    Args:
+        papers: List of {"arxiv_id": str, "title": str} dicts.
+        db_path: Path to SQLite database.
+        save_dir: Directory to save downloaded PDFs.
+        priority: PRIORITY_BULK (default) or PRIORITY_INTERACTIVE.
+
+    Returns:
+        {"batch_id": str, "downloads": [{"arxiv_id", "download_id", "status"}]}
+    """
+    downloads = []
+    seen = set()
+    for paper in papers:
+        arxiv_id = paper["arxiv_id"]
+        if arxiv_id in seen:
+            continue
+        seen.add(arxiv_id)
+        record_id, status = start_download(
+            arxiv_id, paper.get("title") or arxiv_id, db_path, save_dir, priority
+        )
+        downloads.append({"arxiv_id": arxiv_id, "download_id": record_id, "status": status})
+
+    batch_id = uuid.uuid4().hex
+    with _batches_lock:
+        _batches[batch_id] = [(d["arxiv_id"], d["download_id"]) for d in downloads]
+        while len(_batches) > MAX_TRACKED_BATCHES:
+            _batches.popitem(last=False)
+    logger.info(f"Batch download queued: batch={batch_id}, papers={len(downloads)}")
+    return {"batch_id": batch_id, "downloads": downloads}
 
-    _executor.submit(_download_worker, record_id, arxiv_id, save_dir, str(db_path))
-    logger.info(f"Download started: id={record_id}, arxiv_id={arxiv_id}")
-    return record_id, "pending"
 
+def get_batch_status(batch_id, db_path):
+    """
+    Aggregate progress for a batch started by start_batch_download.
+
+    Returns:
+        {"batch_id", "total", "by_status": {status: count}, "progress" (0-100),
+        "downloaded_bytes", "done", "downloads": [...]}, or None if the batch
+        is unknown (never created, or evicted after MAX_TRACKED_BATCHES newer ones).
+    """
+    with _batches_lock:
+        members = _batches.get(batch_id)
+    if members is None:
+        return None
+
+    bus = get_progress_bus()
+    states = {}
+    missing = []
+    for _, record_id in members:
+        state = bus.get_state(record_id)
+        if state:
+            states[record_id] = state
+        else:
+            missing.append(record_id)
+    if missing:
+        with pooled_connection(db_path) as conn:
+            rows = conn.execute(
+                f"SELECT {_RECORD_COLUMNS} FROM download_records "
+                f"WHERE id IN ({','.join('?' * len(missing))})",
+                missing,
+            ).fetchall()
+        for row in rows:
+            states[row["id"]] = _with_live_state(dict(row))
+
+    by_status = {status: 0 for status in DOWNLOAD_STATUSES}
+    downloads = []
+    progress_sum = 0
+    downloaded_bytes = 0
+    for arxiv_id, record_id in members:
+        state = states.get(record_id, {"status": "failed"})
+        status = state["status"]
+        finished = status in ("completed", "failed")
+        by_status[status] = by_status.get(status, 0) + 1
+        progress_sum += 100 if finished else (state.get("progress") or 0)
+        downloaded_bytes += state.get("file_size") or 0
+        downloads.append({
+            "arxiv_id": arxiv_id,
+            "download_id": record_id,
+            "status": status,
+            "progress": state.get("progress") or 0,
+        })
+
+    total = len(members)
+    return {
+        "batch_id": batch_id,
+        "total": total,
+        "by_status": by_status,
+        "progress": int(progress_sum / total) if total else 100,
+        "downloaded_bytes": downloaded_bytes,
+        "done": by_status["completed"] + by_status["failed"] == total,
+        "downloads": downloads,
+    }
+
+
+def get_scheduler_stats():
+    """Queue depth by priority, running workers and per-mirror transfer slots."""
+    return {"scheduler": _scheduler.stats(), "mirrors": _mirror_limiter.stats()}
+
+
+def get_mirror_stats():
+    """Per-mirror health scores (best first) and current transfer slots."""
+    return dict(_mirror_health.stats(), slots=_mirror_limiter.stats())
+
+
+def _download_worker(job):
+    """
+    Background worker: download PDF with mirror fallback.
+
+    Progress goes to the in-process progress bus as it happens; only the
+    final state (completed/failed) is written to the database. Callers
+    waiting on the job are released when it finishes.
+    """
+    try:
+        job.path = _run_download(job.record_id, job.arxiv_id, job.save_dir, job.db_path)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(job.arxiv_id, None)
+        job.done.set()
+
+
+def _run_download(record_id, arxiv_id, save_dir, db_path):
+    """Download one PDF for a record. Returns the saved path, or None on failure."""
+    bus = get_progress_bus()
+    bus.publish(record_id, "downloading", progress=0, file_size=0)
+    save_path = _save_path_for(arxiv_id, save_dir)
+
+    mirrors_to_try = _mirror_health.rank(ARXIV_MIRRORS)
+
+    last_publish = {"time": 0.0, "progress": -1}
+
+    def on_progress(downloaded, total_size):
+        # Publish progress on change, at most every PROGRESS_PUBLISH_INTERVAL
+        progress = int((downloaded / total_size) * 100) if total_size > 0 else 0
+        now = time.monotonic()
+        if now - last_publish["time"] >= PROGRESS_PUBLISH_INTERVAL and (progress > last_publish["progress"] or total_size == 0):
+            bus.publish(
+                record_id, "downloading", progress=min(progress, 99),
+                file_size=downloaded, total_size=total_size,
+            )
+            last_publish.update(time=now, progress=progress)
+
+    size = _fetch_pdf(arxiv_id, save_path, mirrors_to_try, on_progress=on_progress)
+    if size is not None:
+        _update_status(db_path, record_id, "completed", save_path, size, progress=100)
+        logger.info(f"Download completed: id={record_id}, size={size}")
+        # Have the text ready before anyone asks for a full-paper analysis
+        schedule_extraction(save_path, db_path)
+        return save_path
+
+    _update_status(db_path, record_id, "failed")
+    logger.error(f"Download failed for all mirrors: id={record_id}")
+    return None
+
+
+def _meta_path(temp_path):
+    return temp_path + ".json"
+
+
+def _load_partial(temp_path):
+    """
+    Load a kept partial download.
 
-def _download_worker(record_id, arxiv_id, save_dir, db_path):
-    """Background worker: download PDF with mirror fallback and progress tracking."""
-    _update_status(db_path, record_id, "downloading", progress=0)
-    save_path = os.path.join(save_dir, f"{arxiv_id.replace('/', '_')}.pdf")
+    Returns:
+        (bytes_on_disk, meta) or (0, {}) when there is no usable partial file.
+    """
+    meta_path = _meta_path(temp_path)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        size = os.path.getsize(temp_path)
+    except (OSError, ValueError):
+        _discard_partial(temp_path)
+        return 0, {}
+    if meta.get("total_size") and size > meta["total_size"]:
+        _discard_partial(temp_path)
+        return 0, {}
+    return size, meta
+
+
+def _save_partial_meta(temp_path, meta):
+    with open(_meta_path(temp_path), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def _discard_partial(temp_path):
+    for path in (temp_path, _meta_path(temp_path)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _total_from_content_range(value):
+    """Parse 'bytes start-end/total' into (start, total); total is None if '*'."""
+    match = re.match(r"bytes (\d+)-\d+/(\d+|\*)", value or "")
+    if not match:
+        return None, None
+    total = match.group(2)
+    return int(match.group(1)), (int(total) if total != "*" else None)
+
+
+def _fetch_pdf(arxiv_id, save_path, mirrors, on_progress=None):
+    """
+    Download an arXiv PDF to save_path, resuming partial downloads.
+
+    A partial ``.tmp`` file is kept when a connection drops, together with a
+    ``.tmp.json`` sidecar holding the source URL, ETag, Last-Modified and
+    expected length. The next attempt requests only the missing bytes with a
+    Range header. On the same mirror the request carries If-Range, so a
+    changed file comes back whole; on another mirror the partial file is
+    only reused if the reported total length matches.
+
+    Args:
+        arxiv_id: arXiv paper ID.
+        save_path: Final PDF path.
+        mirrors: Mirror base URLs in preference order. A mirror already
+            serving MAX_DOWNLOADS_PER_MIRROR transfers is skipped in favour
+            of the next one with a free slot.
+        on_progress: Optional callback(downloaded_bytes, total_bytes).
+
+    Returns:
+        Final file size in bytes, or None if every mirror failed.
+    """
     temp_path = save_path + ".tmp"
-    
-    # Get best mirror first, then fallback to others
-    best_mirror = _get_best_mirror()
-    mirrors_to_try = [best_mirror] + [m for m in ARXIV_MIRRORS if m != best_mirror]
-    
-    session = _get_session()
+    remaining = list(mirrors)
+
+    while remaining:
+        mirror = _mirror_limiter.acquire(remaining)
+        remaining.remove(mirror)
+        try:
+            size = _fetch_from_mirror(arxiv_id, save_path, temp_path, mirror, on_progress)
+        finally:
+            _mirror_limiter.release(mirror)
+        if size is not None:
+            return size
 
-    for mirror in mirrors_to_try:
-        url = f"{mirror}{arxiv_id}.pdf"
+    return None
+
+
+def _fetch_from_mirror(arxiv_id, save_path, temp_path, mirror, on_progress):
+    """
+    Try one mirror, resuming after dropped connections.
+
+    Returns:
+        Final file size in bytes, or None if the mirror failed.
+    """
+    session = _get_session()
+    url = f"{mirror}{arxiv_id}.pdf"
+    for attempt in range(ATTEMPTS_PER_MIRROR):
+        existing, meta = _load_partial(temp_path)
+        headers = {"Accept-Encoding": "identity"}
+        if existing:
+            headers["Range"] = f"bytes={existing}-"
+            validator = meta.get("etag") or meta.get("last_modified")
+            if meta.get("url") == url and validator:
+                headers["If-Range"] = validator
         try:
-            logger.info(f"Downloading from {url}")
+            logger.info(
+                f"Downloading from {url}" + (f" (resuming at {existing} bytes)" if existing else "")
+            )
+            started = time.monotonic()
             resp = session.get(
                 url,
                 stream=True,
+                headers=headers,
                 timeout=(CONNECTION_TIMEOUT, READ_TIMEOUT),
             )
-            resp.raise_for_status()
-            
-            # Get content length for progress tracking
-            content_length = resp.headers.get('content-length')
-            total_size = int(content_length) if content_length else 0
-
-            downloaded = 0
-            last_progress_update = 0
-            last_update_time = time.time()
-            
-            with open(temp_path, "wb") as f:
-                for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        
-                        # Update progress every 25% or every 2 seconds
-                        if total_size > 0:
-                            progress = int((downloaded / total_size) * 100)
-                            now = time.time()
-                            if (progress >= last_progress_update + 25 or now - last_update_time >= 2) and progress > last_progress_update:
-                                _update_status(db_path, record_id, "downloading", progress=progress)
-                                last_progress_update = progress
-                                last_update_time = now
-
-            # Validate and move to final path
+            ttfb = time.monotonic() - started
+
+            if resp.status_code == 416 and existing:
+                resp.close()
+                if existing != meta.get("total_size"):
+                    # Partial file no longer matches the remote one
+                    _discard_partial(temp_path)
+                    continue
+                # Already have every byte
+                downloaded = existing
+                transferred = 0
+            else:
+                resp.raise_for_status()
+                downloaded = _write_response(resp, temp_path, existing, meta, url, on_progress)
+                if downloaded is None:
+                    continue
+                transferred = downloaded - existing if resp.status_code == 206 else downloaded
+
             if validate_pdf(temp_path):
                 os.replace(temp_path, save_path)
-                _update_status(db_path, record_id, "completed", save_path, downloaded, progress=100)
-                logger.info(f"Download completed: id={record_id}, size={downloaded}")
-                return
-            else:
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                logger.warning(f"Invalid PDF from {url}")
-                
-        except requests.RequestException as e:
+                _discard_partial(temp_path)
+                _mirror_health.record_success(
+                    mirror, ttfb, transferred, time.monotonic() - started - ttfb
+                )
+                return downloaded
+            _discard_partial(temp_path)
+            _mirror_health.record_error(mirror)
+            logger.warning(f"Invalid PDF from {url}")
+            return None
+
+        except requests.HTTPError as e:
+            _mirror_health.record_error(mirror)
             logger.warning(f"Download failed from {url}: {e}")
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            return None
+        except requests.RequestException as e:
+            _mirror_health.record_error(mirror)
+            kept = os.path.getsize(temp_path) if os.path.exists(temp_path) else 0
+            logger.warning(f"Download interrupted from {url} (kept {kept} bytes): {e}")
             continue
 
-    _update_status(db_path, record_id, "failed")
-    logger.error(f"Download failed for all mirrors: id={record_id}")
+    return None
+
+
+def _write_response(resp, temp_path, existing, meta, url, on_progress):
+    """
+    Stream a (possibly partial) response into temp_path.
+
+    Returns:
+        Total bytes on disk when the body was fully received, or None when
+        the range response did not match the partial file (which is then
+        discarded so the next attempt starts over).
+
+    Raises:
+        requests.RequestException: If the connection drops mid-body; the
+            partial file and its metadata are kept for resuming.
+    """
+    if resp.status_code == 206:
+        start, total_size = _total_from_content_range(resp.headers.get("content-range"))
+        expected = meta.get("total_size")
+        if start != existing or (expected and total_size and total_size != expected):
+            logger.warning(f"Range response from {url} does not match partial file, restarting")
+            resp.close()
+            _discard_partial(temp_path)
+            return None
+        mode = "ab"
+        downloaded = existing
+    else:
+        # Full body: server ignored the range or the file changed
+        content_length = resp.headers.get("content-length")
+        total_size = int(content_length) if content_length else 0
+        mode = "wb"
+        downloaded = 0
+
+    _save_partial_meta(temp_path, {
+        "url": url,
+        "etag": resp.headers.get("etag"),
+        "last_modified": resp.headers.get("last-modified"),
+        "total_size": total_size or meta.get("total_size") or 0,
+    })
+
+    with open(temp_path, mode) as f:
+        for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+            if chunk:
+                f.write(chunk)
+                downloaded += len(chunk)
+                if on_progress:
+                    on_progress(downloaded, total_size)
+
+    if total_size and downloaded < total_size:
+        raise requests.exceptions.ChunkedEncodingError(
+            f"Connection closed at {downloaded} of {total_size} bytes"
+        )
+    return downloaded
 
 
 def _update_status(db_path, record_id, status, pdf_path=None, file_size=0, progress=None):
-    """Update download record status in database."""
-    conn = sqlite3.connect(db_path)
+    """Publish a download state to the progress bus and queue it for the database."""
+    if progress is None:
+        progress = 100 if status == "completed" else 0
+    get_progress_bus().publish(
+        record_id, status, progress=progress, file_size=file_size, pdf_path=pdf_path,
+    )
+    writer = get_db_writer(db_path)
     if pdf_path:
-        conn.execute(
+        writer.execute(
             "UPDATE download_records SET status=?, pdf_path=?, file_size=?, progress=? WHERE id=?",
-            (status, pdf_path, file_size, progress or 100, record_id),
+            (status, pdf_path, file_size, progress, record_id),
         )
-    elif progress is not None:
-        conn.execute(
+    else:
+        writer.execute(
             "UPDATE download_records SET status=?, progress=? WHERE id=?",
             (status, progress, record_id),
         )
-    else:
-        conn.execute(
-            "UPDATE download_records SET status=? WHERE id=?",
-            (status, record_id),
-        )
-    conn.commit()
-    conn.close()
 
 
 def validate_pdf(path):
@@ -266,54 +851,142 @@ def validate_pdf(path):
 
 def get_download_status(record_id, db_path):
     """Query download status from database."""
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
-    row = conn.execute(
-        "SELECT id, title, url, pdf_path, status, file_size, progress, timestamp FROM download_records WHERE id=?",
-        (record_id,),
-    ).fetchone()
-    conn.close()
+    with pooled_connection(db_path) as conn:
+        row = conn.execute(
+            f"SELECT {_RECORD_COLUMNS} FROM download_records WHERE id=?",
+            (record_id,),
+        ).fetchone()
 
     if row:
-        result = dict(row)
-        # Ensure progress field exists
-        if result.get('progress') is None:
-            result['progress'] = 100 if result['status'] == 'completed' else 0
-        return result
+        return _with_live_state(dict(row))
     return None
 
 
-def get_all_downloads(db_path):
-    """Get all download records."""
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        "SELECT id, title, url, pdf_path, status, file_size, progress, timestamp FROM download_records ORDER BY timestamp DESC"
-    ).fetchall()
-    conn.close()
-    
-    results = []
-    for r in rows:
-        item = dict(r)
-        if item.get('progress') is None:
-            item['progress'] = 100 if item['status'] == 'completed' else 0
-        results.append(item)
-    return results
+def _with_live_state(record):
+    """Overlay in-flight progress from the progress bus (the database only holds final states)."""
+    if record["status"] not in ("completed", "failed"):
+        live = get_progress_bus().get_state(record["id"])
+        if live:
+            record.update(
+                status=live["status"],
+                progress=live.get("progress", 0),
+                file_size=live.get("file_size", record["file_size"]),
+                pdf_path=live.get("pdf_path") or record["pdf_path"],
+            )
+    # Ensure progress field exists
+    if record.get('progress') is None:
+        record['progress'] = 100 if record['status'] == 'completed' else 0
+    return record
+
+
+def _encode_cursor(timestamp, record_id):
+    return base64.urlsafe_b64encode(f"{timestamp}|{record_id}".encode()).decode()
+
+
+def _decode_cursor(cursor):
+    """Decode a history cursor into (timestamp, id). Raises ValueError if malformed."""
+    try:
+        timestamp, record_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        return timestamp, int(record_id)
+    except Exception:
+        raise ValueError("Invalid cursor") from None
+
+
+def get_downloads_page(db_path, limit=50, cursor=None, statuses=None):
+    """
+    Get one page of download records, newest first, using keyset pagination.
+
+    Args:
+        db_path: Path to SQLite database.
+        limit: Maximum records per page.
+        cursor: Opaque cursor from a previous page's next_cursor.
+        statuses: Optional list of statuses to include.
+
+    Returns:
+        {"downloads": [...], "next_cursor": str|None}. Pages filtered by
+        pending/downloading may hold fewer than ``limit`` records, since those
+        states are resolved from the progress bus after the query.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    clauses = []
+    params = []
+    if cursor:
+        timestamp, record_id = _decode_cursor(cursor)
+        clauses.append("(timestamp, id) < (?, ?)")
+        params.extend([timestamp, record_id])
+
+    db_statuses = set(statuses or ())
+    if db_statuses & set(IN_PROGRESS_STATUSES):
+        db_statuses |= set(IN_PROGRESS_STATUSES)
+    if statuses:
+        clauses.append(f"status IN ({','.join('?' * len(db_statuses))})")
+        params.extend(sorted(db_statuses))
+
+    where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+    with pooled_connection(db_path) as conn:
+        rows = conn.execute(
+            f"SELECT {_RECORD_COLUMNS} FROM download_records {where}"
+            "ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    downloads = [_with_live_state(dict(r)) for r in rows]
+    if statuses:
+        downloads = [d for d in downloads if d["status"] in statuses]
+
+    next_cursor = _encode_cursor(rows[-1]["timestamp"], rows[-1]["id"]) if has_more else None
+    return {"downloads": downloads, "next_cursor": next_cursor}
+
+
+def get_download_summary(db_path):
+    """
+    Count download records by status and sum their bytes without loading rows.
+
+    Returns:
+        {"total": int, "total_bytes": int, "by_status": {status: {"count", "bytes"}}}
+    """
+    with pooled_connection(db_path) as conn:
+        rows = conn.execute(
+            "SELECT status, COUNT(*) AS count, COALESCE(SUM(file_size), 0) AS bytes "
+            "FROM download_records GROUP BY status"
+        ).fetchall()
+
+    by_status = {status: {"count": 0, "bytes": 0} for status in DOWNLOAD_STATUSES}
+    for row in rows:
+        entry = by_status.setdefault(row["status"], {"count": 0, "bytes": 0})
+        entry["count"] += row["count"]
+        entry["bytes"] += row["bytes"]
+
+    # Rows still 'pending' in the database may already be downloading
+    downloading = get_progress_bus().stats()["downloading"]
+    moved = min(downloading, by_status["pending"]["count"])
+    by_status["pending"]["count"] -= moved
+    by_status["downloading"]["count"] += moved
+
+    return {
+        "total": sum(entry["count"] for entry in by_status.values()),
+        "total_bytes": sum(entry["bytes"] for entry in by_status.values()),
+        "by_status": by_status,
+    }
 
 
 def clear_mirror_cache():
-    """Clear cached best mirror to force re-testing."""
-    global _best_mirror, _mirror_selected_time
-    with _mirror_test_lock:
-        _best_mirror = None
-        _mirror_selected_time = 0
-    logger.info("Mirror cache cleared")
+    """Forget mirror health scores so every mirror is explored again."""
+    _mirror_health.reset()
+    logger.info("Mirror health scores cleared")
 
 
 def extract_pdf_text(pdf_path, max_chars=30000):
     """
     Extract text content from a PDF file using PyMuPDF.
 
+    Pages are parsed on the extraction process pool and streamed back, so
+    extraction stops once max_chars is reached.
+
     Args:
         pdf_path: Path to the PDF file.
         max_chars: Maximum characters to extract.
@@ -322,27 +995,24 @@ def extract_pdf_text(pdf_path, max_chars=30000):
         Extracted text string, or None on failure.
     """
     try:
-        import fitz  # PyMuPDF
-
         if not os.path.exists(pdf_path):
             logger.error(f"PDF file not found: {pdf_path}")
             return None
 
-        doc = fitz.open(pdf_path)
         text_parts = []
         total_chars = 0
-
-        for page in doc:
-            page_text = page.get_text()
-            if total_chars + len(page_text) > max_chars:
-                remaining = max_chars - total_chars
-                if remaining > 0:
-                    text_parts.append(page_text[:remaining])
-                break
-            text_parts.append(page_text)
-            total_chars += len(page_text)
-
-        doc.close()
+        pages = get_pdf_extractor().iter_pages(pdf_path)
+        try:
+            for _, page_text in pages:
+                if total_chars + len(page_text) > max_chars:
+                    remaining = max_chars - total_chars
+                    if remaining > 0:
+                        text_parts.append(page_text[:remaining])
+                    break
+                text_parts.append(page_text)
+                total_chars += len(page_text)
+        finally:
+            pages.close()
 
         full_text = "\n".join(text_parts).strip()
         if not full_text:
@@ -356,54 +1026,45 @@ def extract_pdf_text(pdf_path, max_chars=30000):
         return None
 
 
-def get_or_download_pdf(arxiv_id, db_path, save_dir):
+def get_or_download_pdf(arxiv_id, db_path, save_dir, title=None):
     """
     Get the local path of a PDF, downloading it if necessary.
     Blocks until the download completes.
 
+    The download goes through the same in-flight registry as start_download,
+    so an analysis and a manual download of the same paper share one
+    transfer and one download record.
+
     Args:
         arxiv_id: arXiv paper ID.
         db_path: Path to SQLite database.
         save_dir: Directory to save downloaded PDFs.
+        title: Paper title for the download record; defaults to the arXiv ID.
 
     Returns:
-        Local file path if available, or None.
+        Local file path if available, or None if the download failed, could
+        not be started, or did not finish within DOWNLOAD_WAIT_TIMEOUT.
     """
     os.makedirs(save_dir, exist_ok=True)
-    save_path = os.path.join(save_dir, f"{arxiv_id.replace('/', '_')}.pdf")
-
-    # Check if already downloaded and valid
-    if os.path.exists(save_path) and validate_pdf(save_path):
-        return save_path
-
-    # Download synchronously
-    logger.info(f"Downloading PDF for full analysis: {arxiv_id}")
-    best_mirror = _get_best_mirror()
-    mirrors_to_try = [best_mirror] + [m for m in ARXIV_MIRRORS if m != best_mirror]
-    session = _get_session()
-    temp_path = save_path + ".tmp"
 
-    for mirror in mirrors_to_try:
-        url = f"{mirror}{arxiv_id}.pdf"
-        try:
-            resp = session.get(url, stream=True, timeout=(CONNECTION_TIMEOUT, READ_TIMEOUT))
-            resp.raise_for_status()
-            with open(temp_path, "wb") as f:
-                for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
-                    if chunk:
-                        f.write(chunk)
-            if validate_pdf(temp_path):
-                os.replace(temp_path, save_path)
-                logger.info(f"PDF downloaded for analysis: {arxiv_id}")
-                return save_path
-            else:
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-        except requests.RequestException as e:
-            logger.warning(f"Download failed from {url}: {e}")
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            continue
+    try:
+        job, started = _join_or_start(arxiv_id, title or arxiv_id, db_path, save_dir)
+    except Exception as e:
+        logger.error(f"Failed to start PDF download for analysis: {arxiv_id}: {e}")
+        return None
+    if job is None:
+        return _save_path_for(arxiv_id, save_dir)
 
-    logger.error(f"Failed to download PDF for analysis: {arxiv_id}")
-    return None
+    logger.info(
+        f"{'Downloading' if started else 'Waiting for in-flight download of'} "
+        f"PDF for full analysis: {arxiv_id}"
+    )
+    if not job.done.wait(DOWNLOAD_WAIT_TIMEOUT):
+        # The download keeps running; this caller just stops waiting for it
+        logger.error(f"Timed out after {DOWNLOAD_WAIT_TIMEOUT}s waiting for PDF download: {arxiv_id}")
+        return None
+    if job.path:
+        logger.info(f"PDF downloaded for analysis: {arxiv_id}")
+    else:
+        logger.error(f"Failed to download PDF for analysis: {arxiv_id}")
+    return job.path
@@ -0,0 +1,94 @@
+"""
+Opt-in benchmark: download status polling throughput.
+
+Compares get_download_status with a fresh sqlite3 connection per call (the
+previous behaviour) against the pooled connections now used by
+pdf_download_skill. Runs against a temporary database, not data/.
+
+Usage:
+    python backend/benchmark_download_polling.py [--threads 8] [--seconds 3] [--records 50]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".qoder"))
+
+from backend.config import get_config
+from backend.models.database import init_db, get_pool
+from skills.pdf_download_skill import get_download_status
+
+
+def _status_unpooled(record_id, db_path):
+    """Previous implementation: open and close a connection per poll."""
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    row = conn.execute(
+        "SELECT id, title, url, pdf_path, status, file_size, progress, timestamp FROM download_records WHERE id=?",
+        (record_id,),
+    ).fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+def _run(label, fn, db_path, record_ids, threads, seconds):
+    counts = [0] * threads
+    stop = threading.Event()
+
+    def worker(slot):
+        i = slot
+        while not stop.is_set():
+            fn(record_ids[i % len(record_ids)], db_path)
+            counts[slot] += 1
+            i += threads
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    total = sum(counts)
+    print(f"{label:<10} {total:>9} polls  {total / elapsed:>10.0f} polls/s  "
+          f"{elapsed / total * 1e6 * threads:>8.1f} us/poll per thread")
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--records", type=int, default=50)
+    args = parser.parse_args()
+
+    config = get_config()
+    config.DATABASE_PATH = Path(tempfile.mkdtemp()) / "bench.db"
+    init_db()
+    db_path = str(config.DATABASE_PATH)
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO download_records (title, url, status, progress) VALUES (?, ?, 'downloading', 50)",
+        [(f"paper {i}", f"https://arxiv.org/pdf/2401.{i:05d}.pdf") for i in range(args.records)],
+    )
+    conn.commit()
+    record_ids = [row[0] for row in conn.execute("SELECT id FROM download_records")]
+    conn.close()
+
+    print(f"threads={args.threads} seconds={args.seconds} records={args.records} db={db_path}")
+    before = _run("unpooled", _status_unpooled, db_path, record_ids, args.threads, args.seconds)
+    after = _run("pooled", get_download_status, db_path, record_ids, args.threads, args.seconds)
+    print(f"speedup: {after / before:.1f}x  pool={get_pool(db_path).stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -58,12 +58,65 @@ class Config:
             "default_sources": ["duckduckgo", "arxiv"],
         })
 
+        # Local lexical relevance pre-filter ahead of LLM scoring
+        self.RELEVANCE_PREFILTER = self._qoder_config.get("relevance_prefilter", {
+            "enabled": True,
+            "accept_similarity": 0.45,
+            "reject_similarity": 0.05,
+            "accept_score": 80,
+            "reject_score": 10,
+            "min_query_coverage": 0.5,
+            "hash_dim": 16384,
+        })
+
+        # Single SQLite writer thread (write-behind queue)
+        self.DATABASE_SETTINGS = self._qoder_config.get("database_settings", {
+            "write_batch_size": 200,
+            "write_flush_ms": 20,
+            "write_queue_size": 10000,
+            "read_pool_size": 4,
+        })
+
+        # In-process cache tier in front of the SQLite caches
+        self.CACHE_SETTINGS = self._qoder_config.get("cache_settings", {
+            "memory_max_entries": 1024,
+            "memory_max_bytes": 67108864,
+        })
+
+        # Per-source search worker pools
+        self.WORKER_POOLS = self._qoder_config.get("worker_pools", {
+            "default": {"max_workers": 4, "queue_size": 16},
+        })
+
+        # Pooled HTTP sessions for search sources
+        self.HTTP_POOL = self._qoder_config.get("http_pool", {
+            "pool_maxsize": 10,
+            "max_retries": 2,
+            "backoff_factor": 1.0,
+        })
+
+        # Shared arXiv fetch layer (pacing and page cache)
+        self.ARXIV_SETTINGS = self._qoder_config.get("arxiv_settings", {
+            "page_size": 25,
+            "delay_seconds": 1.0,
+            "cache_ttl_seconds": 900,
+            "cache_max_pages": 256,
+        })
+
         # Download settings
         self.DOWNLOAD_SETTINGS = self._qoder_config.get("download_settings", {
             "max_concurrent_downloads": 3,
             "arxiv_mirrors": ["https://arxiv.org/pdf/", "https://cn.arxiv.org/pdf/"],
         })
 
+        # Process-pool PDF text extraction
+        self.PDF_EXTRACTION = self._qoder_config.get("pdf_extraction", {
+            "processes": 0,
+            "pages_per_task": 8,
+            "document_timeout_seconds": 60,
+            "background_workers": 2,
+        })
+
         # Analysis settings
         self.ANALYSIS_SETTINGS = self._qoder_config.get("analysis_settings", {
             "model": "glm-4-flash",
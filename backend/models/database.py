@@ -1,26 +1,132 @@
+import queue
 import sqlite3
 import threading
 from contextlib import contextmanager
 
 from backend.config import get_config
-from backend.models.schemas import SCHEMA_SQL
+from backend.models.schemas import SCHEMA_SQL, RESULT_INDEX_SQL
+from backend.utils.logger import get_logger
+
+logger = get_logger("database")
 
 _local = threading.local()
 
+# Per-connection prepared statement cache size
+STATEMENT_CACHE_SIZE = 128
+
+
+def _open_connection(db_path, check_same_thread=True):
+    """Open a SQLite connection with the shared WAL-mode PRAGMAs."""
+    conn = sqlite3.connect(
+        str(db_path),
+        timeout=10,
+        check_same_thread=check_same_thread,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
 
 def _get_raw_connection():
     """Get a thread-local SQLite connection."""
     if not hasattr(_local, "connection") or _local.connection is None:
         config = get_config()
-        conn = sqlite3.connect(str(config.DATABASE_PATH), timeout=10)
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA journal_mode=WAL")
-        conn.execute("PRAGMA busy_timeout=5000")
-        conn.execute("PRAGMA foreign_keys=ON")
-        _local.connection = conn
+        _local.connection = _open_connection(config.DATABASE_PATH)
     return _local.connection
 
 
+class ConnectionPool:
+    """
+    Small bounded pool of reusable SQLite connections for one database file.
+
+    Connections are opened lazily up to ``size`` and handed out most recently
+    used first, so their prepared statement caches stay warm. Callers block
+    for up to ``timeout`` seconds when every connection is in use.
+    """
+
+    def __init__(self, db_path, size=4, timeout=10):
+        self.db_path = str(db_path)
+        self.size = size
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+        self.created = 0
+        self.checkouts = 0
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commits on success, rolls back on error."""
+        if not self.slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No free SQLite connection for {self.db_path}")
+        try:
+            try:
+                conn = self.idle.get_nowait()
+            except queue.Empty:
+                conn = _open_connection(self.db_path, check_same_thread=False)
+                with self.lock:
+                    self.created += 1
+            with self.lock:
+                self.checkouts += 1
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                self.idle.put(conn)
+        finally:
+            self.slots.release()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "size": self.size,
+                "created": self.created,
+                "idle": self.idle.qsize(),
+                "checkouts": self.checkouts,
+            }
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path=None):
+    """
+    Get the process-wide connection pool for a database file.
+
+    Args:
+        db_path: Database path; defaults to config.DATABASE_PATH.
+    """
+    config = get_config()
+    key = str(db_path or config.DATABASE_PATH)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(key, size=config.DATABASE_SETTINGS.get("read_pool_size", 4))
+                _pools[key] = pool
+    return pool
+
+
+def pooled_connection(db_path=None):
+    """Context manager borrowing a connection from the pool for db_path."""
+    return get_pool(db_path).connection()
+
+
 @contextmanager
 def get_connection():
     """Context manager for database connections with auto-commit."""
@@ -50,6 +156,17 @@ def init_db():
             conn.commit()
     except Exception:
         pass
+
+    # Local full-text result index (requires SQLite built with FTS5)
+    try:
+        conn.executescript(RESULT_INDEX_SQL)
+        # Migrate: add extra column (source-specific fields such as arxiv_id) if not exists
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(result_index)").fetchall()]
+        if "extra" not in columns:
+            conn.execute("ALTER TABLE result_index ADD COLUMN extra TEXT DEFAULT '{}'")
+            conn.commit()
+    except sqlite3.OperationalError as e:
+        logger.warning(f"FTS5 not available, local result index disabled: {e}")
     
     conn.close()
 
@@ -0,0 +1,242 @@
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from backend.config import get_config
+from backend.utils.logger import get_logger
+
+logger = get_logger("db_writer")
+
+WriteResult = namedtuple("WriteResult", ["lastrowid", "rowcount"])
+
+
+class _Write:
+    """One queued write; waiters block on its event."""
+
+    __slots__ = ("sql", "params", "many", "event", "result", "error")
+
+    def __init__(self, sql, params, many):
+        self.sql = sql
+        self.params = params
+        self.many = many
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class DbWriter:
+    """
+    Single-connection write-behind queue for one SQLite database.
+
+    All writes are executed by one background thread. Queued writes are
+    grouped into one transaction of at most ``batch_size`` statements; a
+    batch is committed no later than ``flush_ms`` after its first write was
+    picked up. Each statement runs under its own savepoint, so a failing
+    write is rolled back and reported without discarding the rest of the
+    batch. Readers keep using their own connections.
+    """
+
+    DEFAULT_SETTINGS = {
+        "write_batch_size": 200,
+        "write_flush_ms": 20,
+        "write_queue_size": 10000,
+    }
+
+    def __init__(self, db_path, settings=None):
+        self.db_path = str(db_path)
+        self.settings = dict(self.DEFAULT_SETTINGS, **(settings or {}))
+        self.batch_size = self.settings["write_batch_size"]
+        self.flush_seconds = self.settings["write_flush_ms"] / 1000.0
+        self.queue = queue.Queue(maxsize=self.settings["write_queue_size"])
+
+        self.lock = threading.Lock()
+        self.counters = {"writes": 0, "batches": 0, "errors": 0, "largest_batch": 0}
+        # Orders submissions against close(), so nothing is queued behind the stop sentinel
+        self.submit_lock = threading.Lock()
+        self.closed = False
+
+        self.thread = threading.Thread(
+            target=self._run, name="db-writer", daemon=True
+        )
+        self.thread.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def _submit(self, sql, params, many, wait):
+        write = _Write(sql, params, many)
+        with self.submit_lock:
+            if self.closed:
+                raise RuntimeError("Database writer is closed")
+            self.queue.put(write)
+        if not wait:
+            return None
+        write.event.wait()
+        if write.error is not None:
+            raise write.error
+        return write.result
+
+    def execute(self, sql, params=(), wait=False):
+        """
+        Queue one write statement.
+
+        Args:
+            sql: INSERT/UPDATE/DELETE statement.
+            params: Statement parameters.
+            wait: Block until the write is committed.
+
+        Returns:
+            WriteResult(lastrowid, rowcount) when wait is True, else None.
+
+        Raises:
+            sqlite3.Error: If wait is True and the statement failed.
+        """
+        return self._submit(sql, params, False, wait)
+
+    def executemany(self, sql, rows, wait=False):
+        """Queue one statement executed for every row in ``rows`` (see execute)."""
+        return self._submit(sql, list(rows), True, wait)
+
+    def flush(self):
+        """Block until every write queued so far is committed."""
+        if not self.closed:
+            self._submit(None, None, False, True)
+
+    def _collect_batch(self, first):
+        """
+        Gather writes behind ``first`` until the batch is full or flush_ms elapses.
+
+        Returns:
+            (batch, stop) where stop is True if the close sentinel was
+            dequeued; the sentinel itself is not part of the batch.
+        """
+        batch = [first]
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            try:
+                write = self.queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    write = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if write is None:
+                return batch, True
+            batch.append(write)
+        return batch, False
+
+    def _run(self):
+        conn = None
+        while True:
+            first = self.queue.get()
+            if first is None:
+                break
+            batch, stop = self._collect_batch(first)
+            try:
+                if conn is None:
+                    conn = self._connect()
+                self._write_batch(conn, batch)
+            except Exception as e:
+                logger.error(f"Write batch of {len(batch)} failed: {e}")
+                for write in batch:
+                    if not write.event.is_set():
+                        write.error = e
+                        write.event.set()
+            if stop:
+                break
+        if conn is not None:
+            conn.close()
+
+    def _write_batch(self, conn, batch):
+        errors = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for write in batch:
+                if write.sql is None:
+                    continue
+                conn.execute("SAVEPOINT write")
+                try:
+                    if write.many:
+                        cursor = conn.executemany(write.sql, write.params)
+                    else:
+                        cursor = conn.execute(write.sql, write.params)
+                    write.result = WriteResult(cursor.lastrowid, cursor.rowcount)
+                    conn.execute("RELEASE write")
+                except sqlite3.Error as e:
+                    conn.execute("ROLLBACK TO write")
+                    conn.execute("RELEASE write")
+                    write.error = e
+                    errors += 1
+                    logger.error(f"Queued write failed: {e} (sql={write.sql[:80]})")
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+        for write in batch:
+            write.event.set()
+        with self.lock:
+            self.counters["writes"] += sum(1 for w in batch if w.sql is not None)
+            self.counters["batches"] += 1
+            self.counters["errors"] += errors
+            self.counters["largest_batch"] = max(self.counters["largest_batch"], len(batch))
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, queued=self.queue.qsize())
+
+    def close(self):
+        """Commit everything queued and stop the writer thread."""
+        with self.submit_lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.queue.put(None)
+        self.thread.join(timeout=10)
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_db_writer(db_path=None):
+    """
+    Get the process-wide writer for a database file.
+
+    Args:
+        db_path: Database path; defaults to config.DATABASE_PATH.
+    """
+    config = get_config()
+    key = str(db_path or config.DATABASE_PATH)
+    writer = _writers.get(key)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.get(key)
+            if writer is None:
+                writer = DbWriter(key, config.DATABASE_SETTINGS)
+                _writers[key] = writer
+    return writer
+
+
+def close_db_writers():
+    """Flush and stop all writers (registered to run at interpreter exit)."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+
+
+atexit.register(close_db_writers)
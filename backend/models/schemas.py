@@ -25,6 +25,15 @@ CREATE TABLE IF NOT EXISTS analysis_cache (
 );
 CREATE INDEX IF NOT EXISTS idx_analysis_cache_hash ON analysis_cache(content_hash);
 
+CREATE TABLE IF NOT EXISTS relevance_scores (
+    query_norm TEXT NOT NULL,
+    url TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (query_norm, url, content_hash)
+);
+
 CREATE TABLE IF NOT EXISTS download_records (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     title TEXT NOT NULL,
@@ -35,4 +44,59 @@ CREATE TABLE IF NOT EXISTS download_records (
     progress INTEGER DEFAULT 0,
     timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
 );
+CREATE INDEX IF NOT EXISTS idx_download_records_timestamp ON download_records(timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_download_records_status ON download_records(status, timestamp, id);
+
+CREATE TABLE IF NOT EXISTS pdf_documents (
+    pdf_hash TEXT PRIMARY KEY,
+    page_count INTEGER NOT NULL,
+    char_count INTEGER NOT NULL,
+    sections TEXT NOT NULL DEFAULT '[]',
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS pdf_pages (
+    pdf_hash TEXT NOT NULL,
+    page_no INTEGER NOT NULL,
+    char_offset INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (pdf_hash, page_no)
+);
+"""
+
+RESULT_INDEX_SQL = """
+CREATE TABLE IF NOT EXISTS result_index (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT UNIQUE NOT NULL,
+    title TEXT DEFAULT '',
+    snippet TEXT DEFAULT '',
+    authors TEXT DEFAULT '',
+    category TEXT DEFAULT '',
+    source TEXT DEFAULT '',
+    published TEXT DEFAULT '',
+    extra TEXT DEFAULT '{}',
+    fetched_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS result_fts USING fts5(
+    title, snippet, authors,
+    content='result_index', content_rowid='id'
+);
+
+CREATE TRIGGER IF NOT EXISTS result_index_ai AFTER INSERT ON result_index BEGIN
+    INSERT INTO result_fts(rowid, title, snippet, authors)
+    VALUES (new.id, new.title, new.snippet, new.authors);
+END;
+
+CREATE TRIGGER IF NOT EXISTS result_index_ad AFTER DELETE ON result_index BEGIN
+    INSERT INTO result_fts(result_fts, rowid, title, snippet, authors)
+    VALUES ('delete', old.id, old.title, old.snippet, old.authors);
+END;
+
+CREATE TRIGGER IF NOT EXISTS result_index_au AFTER UPDATE ON result_index BEGIN
+    INSERT INTO result_fts(result_fts, rowid, title, snippet, authors)
+    VALUES ('delete', old.id, old.title, old.snippet, old.authors);
+    INSERT INTO result_fts(rowid, title, snippet, authors)
+    VALUES (new.id, new.title, new.snippet, new.authors);
+END;
 """
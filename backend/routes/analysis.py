@@ -1,11 +1,19 @@
 from flask import Blueprint, request, jsonify
 
-from backend.services import analysis_service
+from backend.services import analysis_jobs, analysis_service
+from backend.services.progress_bus import FINAL_STATUSES
+from backend.services.worker_pool import PoolOverloadedError
 from backend.utils.logger import get_logger
+from backend.utils.sse import sse_response
 
 logger = get_logger("routes.analysis")
 analysis_bp = Blueprint("analysis", __name__)
 
+MAX_BATCH_TEXTS = 100
+
+# Seconds between keep-alive events on idle job streams
+JOB_EVENTS_KEEPALIVE_SECONDS = 15
+
 
 @analysis_bp.route("/api/analysis/summarize", methods=["POST"])
 def summarize():
@@ -24,6 +32,24 @@ def summarize():
         return jsonify({"error": "Summarize failed", "detail": str(e)}), 500
 
 
+@analysis_bp.route("/api/analysis/summarize/stream", methods=["POST"])
+def summarize_stream():
+    """
+    Summarize with the answer streamed as it is generated (SSE).
+
+    Emits "delta" events ({"text"}) with pieces of the raw answer, "ping"
+    while idle, and a final "result" event with the same body as
+    /api/analysis/summarize. A cached summary is sent as the result alone.
+    """
+    data = request.get_json(silent=True) or {}
+
+    content = (data.get("content") or "").strip()
+    if not content:
+        return jsonify({"error": "content is required"}), 400
+
+    return sse_response(analysis_service.stream_summarize(content))
+
+
 @analysis_bp.route("/api/analysis/translate", methods=["POST"])
 def translate():
     """Translate content to target language."""
@@ -43,6 +69,20 @@ def translate():
         return jsonify({"error": "Translation failed", "detail": str(e)}), 500
 
 
+@analysis_bp.route("/api/analysis/translate/stream", methods=["POST"])
+def translate_stream():
+    """Translate with the translation streamed as it is generated (SSE, events as in summarize/stream)."""
+    data = request.get_json(silent=True) or {}
+
+    content = (data.get("content") or "").strip()
+    if not content:
+        return jsonify({"error": "content is required"}), 400
+
+    target_lang = data.get("target_lang", "zh")
+
+    return sse_response(analysis_service.stream_translate(content, target_lang))
+
+
 @analysis_bp.route("/api/translate", methods=["POST"])
 def translate_simple():
     """Simple translate endpoint for batch export."""
@@ -65,6 +105,43 @@ def translate_simple():
         return jsonify({"error": "Translation failed", "translated": text}), 200
 
 
+@analysis_bp.route("/api/translate/batch", methods=["POST"])
+def translate_batch():
+    """Translate many snippets in one request (result list and CSV export)."""
+    data = request.get_json(silent=True) or {}
+
+    texts = data.get("texts")
+    if not isinstance(texts, list) or not texts:
+        return jsonify({"error": "texts is required"}), 400
+    if len(texts) > MAX_BATCH_TEXTS:
+        return jsonify({"error": f"Maximum {MAX_BATCH_TEXTS} texts allowed"}), 400
+    texts = [(t if isinstance(t, str) else "").strip() for t in texts]
+
+    target_lang = data.get("target_lang", "zh")
+
+    # Empty texts pass through untranslated
+    non_empty = [t for t in texts if t]
+    try:
+        results = iter(analysis_service.translate_batch(non_empty, target_lang))
+        translations = []
+        for text in texts:
+            if not text:
+                translations.append({"translated": "", "source_lang": ""})
+                continue
+            result = next(results)
+            translations.append({
+                "translated": result.get("translated_text") or text,
+                "source_lang": result.get("source_lang", ""),
+            })
+        return jsonify({"translations": translations}), 200
+    except Exception as e:
+        logger.error(f"Batch translate error: {e}", exc_info=True)
+        return jsonify({
+            "error": "Translation failed",
+            "translations": [{"translated": t, "source_lang": ""} for t in texts],
+        }), 200
+
+
 @analysis_bp.route("/api/analysis/paper", methods=["POST"])
 def analyze_paper():
     """Deep analysis of academic paper."""
@@ -87,6 +164,23 @@ def analyze_paper():
         return jsonify({"error": "Paper analysis failed", "detail": str(e)}), 500
 
 
+@analysis_bp.route("/api/analysis/paper/stream", methods=["POST"])
+def analyze_paper_stream():
+    """Paper analysis with the answer streamed as it is generated (SSE, events as in summarize/stream)."""
+    data = request.get_json(silent=True) or {}
+
+    paper_data = {
+        "title": data.get("title", ""),
+        "abstract": data.get("abstract", ""),
+        "snippet": data.get("snippet", ""),
+    }
+
+    if not paper_data["title"] and not paper_data["abstract"] and not paper_data["snippet"]:
+        return jsonify({"error": "title or abstract/snippet is required"}), 400
+
+    return sse_response(analysis_service.stream_analyze_paper(paper_data))
+
+
 @analysis_bp.route("/api/analysis/paper-full", methods=["POST"])
 def analyze_paper_full():
     """Deep analysis of full paper PDF content."""
@@ -104,3 +198,89 @@ def analyze_paper_full():
     except Exception as e:
         logger.error(f"Full paper analysis error: {e}", exc_info=True)
         return jsonify({"error": "Full paper analysis failed", "detail": str(e)}), 500
+
+
+@analysis_bp.route("/api/analysis/paper-full/stream", methods=["POST"])
+def analyze_paper_full_stream():
+    """
+    Full-paper analysis streamed over SSE.
+
+    Emits "stage" events ({"stage"}) for downloading/extracting/analyzing,
+    "delta" events for the final analysis answer, "ping" while idle, and a
+    final "result" event with the same body as /api/analysis/paper-full.
+    """
+    data = request.get_json(silent=True) or {}
+
+    arxiv_id = (data.get("arxiv_id") or "").strip()
+    title = data.get("title", "untitled")
+
+    if not arxiv_id:
+        return jsonify({"error": "arxiv_id is required"}), 400
+
+    return sse_response(analysis_service.stream_analyze_paper_full(arxiv_id, title))
+
+
+@analysis_bp.route("/api/analysis/paper-full/jobs", methods=["POST"])
+def submit_paper_full_job():
+    """
+    Start a full-paper analysis in the background and return its job ID.
+
+    A second submission for an arXiv ID whose job is still running returns
+    that job instead of starting another one.
+    """
+    data = request.get_json(silent=True) or {}
+
+    arxiv_id = (data.get("arxiv_id") or "").strip()
+    title = data.get("title", "untitled")
+
+    if not arxiv_id:
+        return jsonify({"error": "arxiv_id is required"}), 400
+
+    try:
+        job, created = analysis_jobs.submit_paper_full(arxiv_id, title)
+        return jsonify(dict(job, created=created)), 202
+    except PoolOverloadedError:
+        return jsonify({"error": "Too many analyses in progress, please retry later"}), 503
+    except Exception as e:
+        logger.error(f"Full paper analysis job error: {e}", exc_info=True)
+        return jsonify({"error": "Full paper analysis failed to start", "detail": str(e)}), 500
+
+
+@analysis_bp.route("/api/analysis/paper-full/jobs/<job_id>", methods=["GET"])
+def get_paper_full_job(job_id):
+    """Poll a full-paper analysis job (status is one of analysis_jobs.JOB_STAGES)."""
+    job = analysis_jobs.get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job), 200
+
+
+@analysis_bp.route("/api/analysis/paper-full/jobs/<job_id>/events", methods=["GET"])
+def paper_full_job_events(job_id):
+    """
+    Full-paper analysis job stream (SSE).
+
+    Emits a "progress" event with the job state on every stage change
+    (starting with the current one) and "ping" while idle; the stream ends
+    after the completed or failed state.
+    """
+    bus = analysis_jobs.get_job_bus()
+    sub, snapshot = bus.subscribe([job_id])
+    if not snapshot:
+        bus.unsubscribe(sub)
+        return jsonify({"error": "Job not found"}), 404
+
+    def events():
+        try:
+            state = snapshot[0]
+            yield "progress", state
+            while state["status"] not in FINAL_STATUSES:
+                updates = sub.get(timeout=JOB_EVENTS_KEEPALIVE_SECONDS)
+                if not updates:
+                    yield "ping", {}
+                for state in updates:
+                    yield "progress", state
+        finally:
+            bus.unsubscribe(sub)
+
+    return sse_response(events())
@@ -5,11 +5,21 @@ from flask import Blueprint, request, jsonify, send_file
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
 from backend.config import get_config
+from backend.services.progress_bus import get_progress_bus
 from backend.utils.logger import get_logger
+from backend.utils.sse import sse_response
 
 logger = get_logger("routes.download")
 download_bp = Blueprint("download", __name__)
 
+# Seconds between keep-alive events on idle progress streams
+EVENTS_KEEPALIVE_SECONDS = 15
+
+MAX_BATCH_DOWNLOADS = 100
+
+DEFAULT_HISTORY_LIMIT = 50
+MAX_HISTORY_LIMIT = 200
+
 
 @download_bp.route("/api/download/arxiv", methods=["POST"])
 def download_arxiv():
@@ -39,6 +49,94 @@ def download_arxiv():
         return jsonify({"error": "Download failed to start", "detail": str(e)}), 500
 
 
+@download_bp.route("/api/download/batch", methods=["POST"])
+def download_batch():
+    """
+    Queue arXiv PDF downloads for a list of papers.
+
+    Body:
+        papers: [{"arxiv_id": str, "title": str}, ...] (at most 100).
+        priority: "bulk" (default) or "interactive".
+    """
+    data = request.get_json(silent=True) or {}
+    papers = data.get("papers")
+    if not isinstance(papers, list) or not papers:
+        return jsonify({"error": "papers must be a non-empty list"}), 400
+    if len(papers) > MAX_BATCH_DOWNLOADS:
+        return jsonify({"error": f"At most {MAX_BATCH_DOWNLOADS} papers per batch"}), 400
+
+    cleaned = []
+    for paper in papers:
+        arxiv_id = (paper.get("arxiv_id") or "").strip() if isinstance(paper, dict) else ""
+        if not arxiv_id:
+            return jsonify({"error": "Each paper needs an arxiv_id"}), 400
+        cleaned.append({"arxiv_id": arxiv_id, "title": paper.get("title") or arxiv_id})
+
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", ".qoder"))
+    from skills.pdf_download_skill import start_batch_download, PRIORITIES
+
+    priority = data.get("priority", "bulk")
+    if priority not in PRIORITIES:
+        return jsonify({"error": f"priority must be one of: {', '.join(PRIORITIES)}"}), 400
+
+    try:
+        config = get_config()
+        batch = start_batch_download(
+            cleaned,
+            str(config.DATABASE_PATH),
+            str(config.DOWNLOAD_DIR),
+            priority=PRIORITIES[priority],
+        )
+        return jsonify(batch), 200
+    except Exception as e:
+        logger.error(f"Batch download start error: {e}", exc_info=True)
+        return jsonify({"error": "Batch download failed to start", "detail": str(e)}), 500
+
+
+@download_bp.route("/api/download/batch/<batch_id>", methods=["GET"])
+def download_batch_status(batch_id):
+    """Aggregate progress of a download batch."""
+    try:
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", ".qoder"))
+        from skills.pdf_download_skill import get_batch_status
+
+        config = get_config()
+        status = get_batch_status(batch_id, str(config.DATABASE_PATH))
+        if status:
+            return jsonify(status), 200
+        return jsonify({"error": "Batch not found"}), 404
+    except Exception as e:
+        logger.error(f"Batch status query error: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+
+@download_bp.route("/api/download/mirrors", methods=["GET"])
+def download_mirrors():
+    """Mirror health (EWMA throughput, TTFB, error rate) and download scheduler load."""
+    try:
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", ".qoder"))
+        from skills.pdf_download_skill import get_mirror_stats, get_scheduler_stats
+
+        return jsonify(dict(get_mirror_stats(), scheduler=get_scheduler_stats()["scheduler"])), 200
+    except Exception as e:
+        logger.error(f"Mirror stats error: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+
+@download_bp.route("/api/download/clear-mirror-cache", methods=["POST"])
+def download_clear_mirror_cache():
+    """Forget mirror health scores."""
+    try:
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", ".qoder"))
+        from skills.pdf_download_skill import clear_mirror_cache
+
+        clear_mirror_cache()
+        return jsonify({"success": True}), 200
+    except Exception as e:
+        logger.error(f"Clear mirror cache error: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+
 @download_bp.route("/api/download/status/<int:download_id>", methods=["GET"])
 def download_status(download_id):
     """Query download status."""
@@ -56,6 +154,53 @@ def download_status(download_id):
         return jsonify({"error": str(e)}), 500
 
 
+@download_bp.route("/api/download/events", methods=["GET"])
+def download_events():
+    """
+    Download progress stream (SSE).
+
+    Query:
+        ids: Optional comma-separated download IDs; all downloads if omitted.
+
+    Emits a "progress" event per state change, starting with the current
+    state of each requested download, and "ping" while idle.
+    """
+    raw_ids = request.args.get("ids", "")
+    try:
+        ids = [int(i) for i in raw_ids.split(",") if i.strip()]
+    except ValueError:
+        return jsonify({"error": "ids must be comma-separated integers"}), 400
+
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", ".qoder"))
+    from skills.pdf_download_skill import get_download_status
+
+    bus = get_progress_bus()
+    sub, snapshot = bus.subscribe(ids or None)
+    db_path = str(get_config().DATABASE_PATH)
+
+    def events():
+        try:
+            known = {state["id"] for state in snapshot}
+            for state in snapshot:
+                yield "progress", state
+            # Downloads the bus no longer tracks (finished earlier, or before a restart)
+            for record_id in ids:
+                if record_id not in known:
+                    record = get_download_status(record_id, db_path)
+                    if record:
+                        yield "progress", record
+            while True:
+                updates = sub.get(timeout=EVENTS_KEEPALIVE_SECONDS)
+                if not updates:
+                    yield "ping", {}
+                for state in updates:
+                    yield "progress", state
+        finally:
+            bus.unsubscribe(sub)
+
+    return sse_response(events())
+
+
 @download_bp.route("/api/download/file/<int:download_id>", methods=["GET"])
 def download_file(download_id):
     """Serve downloaded PDF file."""
@@ -84,14 +229,54 @@ def download_file(download_id):
 
 @download_bp.route("/api/download/history", methods=["GET"])
 def download_history():
-    """Get all download records."""
+    """
+    Get download records, newest first, one page at a time.
+
+    Query:
+        limit: Page size (default 50, max 200).
+        cursor: next_cursor from the previous page.
+        status: Optional comma-separated statuses (pending, downloading, completed, failed).
+    """
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", ".qoder"))
+    from skills.pdf_download_skill import get_downloads_page, DOWNLOAD_STATUSES
+
     try:
-        sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", ".qoder"))
-        from skills.pdf_download_skill import get_all_downloads
+        limit = int(request.args.get("limit", DEFAULT_HISTORY_LIMIT))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if not 1 <= limit <= MAX_HISTORY_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {MAX_HISTORY_LIMIT}"}), 400
 
+    statuses = [s.strip() for s in request.args.get("status", "").split(",") if s.strip()]
+    invalid = [s for s in statuses if s not in DOWNLOAD_STATUSES]
+    if invalid:
+        return jsonify({"error": f"Invalid status: {', '.join(invalid)}"}), 400
+
+    try:
         config = get_config()
-        downloads = get_all_downloads(str(config.DATABASE_PATH))
-        return jsonify({"downloads": downloads}), 200
+        page = get_downloads_page(
+            str(config.DATABASE_PATH),
+            limit=limit,
+            cursor=request.args.get("cursor") or None,
+            statuses=statuses or None,
+        )
+        return jsonify(page), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Download history error: {e}", exc_info=True)
         return jsonify({"error": str(e)}), 500
+
+
+@download_bp.route("/api/download/summary", methods=["GET"])
+def download_summary():
+    """Download counts and bytes by status."""
+    try:
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", ".qoder"))
+        from skills.pdf_download_skill import get_download_summary
+
+        config = get_config()
+        return jsonify(get_download_summary(str(config.DATABASE_PATH))), 200
+    except Exception as e:
+        logger.error(f"Download summary error: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
@@ -2,19 +2,23 @@ from flask import Blueprint, request, jsonify
 
 from backend.services import search_service
 from backend.utils.logger import get_logger
+from backend.utils.sse import sse_response
 
 logger = get_logger("routes.search")
 search_bp = Blueprint("search", __name__)
 
 VALID_TIME_RANGES = {"week", "month", "year", "3years", None}
 MAX_QUERIES = 5
+VALID_SEARCH_MODES = {"online", "local_first", "offline", None}
 
 
-@search_bp.route("/api/search", methods=["POST"])
-def do_search():
-    """Multi-source search endpoint supporting multiple keywords."""
-    data = request.get_json(silent=True) or {}
+def _parse_search_request(data):
+    """
+    Validate a search request body.
 
+    Returns:
+        (queries, sources, filters, error) where error is None when valid.
+    """
     # Support both 'queries' (array) and 'query' (string) for backwards compatibility
     queries = data.get("queries")
     if queries is None:
@@ -24,9 +28,9 @@ def do_search():
     # Validate and clean queries
     queries = [q.strip() for q in queries if isinstance(q, str) and q.strip()]
     if not queries:
-        return jsonify({"error": "At least one query is required"}), 400
+        return None, None, None, "At least one query is required"
     if len(queries) > MAX_QUERIES:
-        return jsonify({"error": f"Maximum {MAX_QUERIES} queries allowed"}), 400
+        return None, None, None, f"Maximum {MAX_QUERIES} queries allowed"
 
     sources = data.get("sources") or None
     filters = data.get("filters") or {}
@@ -34,11 +38,60 @@ def do_search():
     # Validate time_range
     time_range = filters.get("time_range")
     if time_range not in VALID_TIME_RANGES:
-        return jsonify({"error": f"Invalid time_range: {time_range}"}), 400
+        return None, None, None, f"Invalid time_range: {time_range}"
+
+    return queries, sources, filters, None
+
+
+@search_bp.route("/api/search", methods=["POST"])
+def do_search():
+    """Multi-source search endpoint supporting multiple keywords."""
+    data = request.get_json(silent=True) or {}
+
+    queries, sources, filters, error = _parse_search_request(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    mode = data.get("mode")
+    if mode not in VALID_SEARCH_MODES:
+        return jsonify({"error": f"Invalid mode: {mode}"}), 400
 
     try:
-        result = search_service.search_multiple(queries, sources, filters)
+        result = search_service.search_multiple(queries, sources, filters, mode=mode)
         return jsonify(result), 200
     except Exception as e:
         logger.error(f"Search error: {e}", exc_info=True)
         return jsonify({"error": "Search failed", "detail": str(e)}), 500
+
+
+@search_bp.route("/api/search/stream", methods=["POST"])
+def do_search_stream():
+    """Streaming search endpoint (SSE): emits each source's results as it finishes."""
+    data = request.get_json(silent=True) or {}
+
+    queries, sources, filters, error = _parse_search_request(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    mode = data.get("mode")
+    if mode not in VALID_SEARCH_MODES:
+        return jsonify({"error": f"Invalid mode: {mode}"}), 400
+
+    def events():
+        try:
+            yield from search_service.search_stream(queries, sources, filters, mode=mode)
+        except Exception as e:
+            logger.error(f"Search stream error: {e}", exc_info=True)
+            yield "error", {"error": "Search failed", "detail": str(e)}
+
+    return sse_response(events())
+
+
+@search_bp.route("/api/search/stats", methods=["GET"])
+def search_stats():
+    """Search agent metrics: per-source pool occupancy and per-host connection reuse."""
+    try:
+        return jsonify(search_service.get_agent_stats()), 200
+    except Exception as e:
+        logger.error(f"Search stats error: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
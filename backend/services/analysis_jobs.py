@@ -0,0 +1,102 @@
+import threading
+import uuid
+
+from backend.config import get_config
+from backend.services import analysis_service
+from backend.services.progress_bus import FINAL_STATUSES, ProgressBus
+from backend.services.worker_pool import BoundedExecutor
+from backend.utils.logger import get_logger
+
+logger = get_logger("analysis_jobs")
+
+# queued -> downloading -> extracting -> analyzing -> completed | failed
+JOB_STAGES = ("queued", "downloading", "extracting", "analyzing", "completed", "failed")
+
+# Job states live on their own bus (the download bus streams every download to its subscribers)
+_bus = ProgressBus(max_retained=500)
+
+# arXiv ID -> job_id of the unfinished job for that paper
+_active = {}
+_active_lock = threading.Lock()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                settings = get_config().ANALYSIS_SETTINGS
+                _executor = BoundedExecutor(
+                    max_workers=settings.get("full_analysis_workers", 2),
+                    queue_size=settings.get("full_analysis_queue_size", 16),
+                    name="paper-analysis",
+                )
+    return _executor
+
+
+def get_job_bus():
+    """Get the bus carrying full-paper analysis job states."""
+    return _bus
+
+
+def submit_paper_full(arxiv_id, title):
+    """
+    Start a background full-paper analysis, or attach to the one already running.
+
+    Args:
+        arxiv_id: arXiv paper ID.
+        title: Paper title.
+
+    Returns:
+        (job_state, created) where job_state is the current state dict
+        ({"id", "status", "arxiv_id", "title", ...}).
+
+    Raises:
+        PoolOverloadedError: If the analysis queue is full.
+    """
+    with _active_lock:
+        job_id = _active.get(arxiv_id)
+        if job_id is not None:
+            state = _bus.get_state(job_id)
+            if state and state["status"] not in FINAL_STATUSES:
+                return state, False
+
+        job_id = uuid.uuid4().hex
+        _bus.publish(job_id, "queued", arxiv_id=arxiv_id, title=title)
+        try:
+            _get_executor().submit(_run_job, job_id, arxiv_id, title)
+        except Exception as e:
+            _bus.publish(job_id, "failed", arxiv_id=arxiv_id, title=title, error=str(e))
+            raise
+        _active[arxiv_id] = job_id
+
+    logger.info(f"Full-paper analysis job queued: job={job_id}, arxiv_id={arxiv_id}")
+    return _bus.get_state(job_id), True
+
+
+def _run_job(job_id, arxiv_id, title):
+    """Executor task: run the pipeline, publishing each stage."""
+    def on_stage(stage):
+        _bus.publish(job_id, stage, arxiv_id=arxiv_id, title=title)
+
+    try:
+        result = analysis_service.analyze_paper_full(arxiv_id, title, on_stage=on_stage)
+        if result.get("error"):
+            _bus.publish(job_id, "failed", arxiv_id=arxiv_id, title=title, result=result, error=result["error"])
+        else:
+            _bus.publish(job_id, "completed", arxiv_id=arxiv_id, title=title, result=result)
+    except Exception as e:
+        logger.error(f"Full-paper analysis job failed: job={job_id}: {e}", exc_info=True)
+        _bus.publish(job_id, "failed", arxiv_id=arxiv_id, title=title, error=str(e))
+    finally:
+        with _active_lock:
+            if _active.get(arxiv_id) == job_id:
+                del _active[arxiv_id]
+
+
+def get_job(job_id):
+    """Latest state of a job, or None if unknown (or evicted after 500 newer finished jobs)."""
+    return _bus.get_state(job_id)
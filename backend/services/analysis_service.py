@@ -1,9 +1,12 @@
 import sys
 import os
+import queue
+import threading
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
-from backend.services import cache_service
+from backend.services import cache_service, pdf_text_store
+from backend.services.single_flight import SingleFlight
 from backend.config import get_config
 from backend.utils.logger import get_logger
 
@@ -12,6 +15,12 @@ logger = get_logger("analysis_service")
 # Lazy-initialized analysis agent
 _analysis_agent = None
 
+# Coalesces identical concurrent LLM calls, keyed by (cache key, analysis type)
+_flights = SingleFlight()
+
+# Seconds between keep-alive events while a stream has nothing new to send
+STREAM_KEEPALIVE_SECONDS = 15
+
 
 def _get_agent():
     global _analysis_agent
@@ -22,6 +31,84 @@ def _get_agent():
     return _analysis_agent
 
 
+def _cached_analysis(cache_key, analysis_type, compute):
+    """
+    Return a cached analysis result, or compute it exactly once.
+
+    Concurrent callers for the same key wait on the single in-flight
+    computation instead of issuing duplicate LLM calls. Successful results
+    are written to the analysis cache.
+    """
+    cached = cache_service.get_analysis_cache(cache_key, analysis_type)
+    if cached:
+        return cached
+    return _flights.do(
+        (cache_key, analysis_type), _compute_analysis, cache_key, analysis_type, compute
+    )
+
+
+def _compute_analysis(cache_key, analysis_type, compute):
+    """Run compute() and cache its result (single-flight leader only)."""
+    # A flight for the same key may have completed since the caller's cache check
+    cached = cache_service.get_analysis_cache(cache_key, analysis_type)
+    if cached:
+        return cached
+
+    result = compute()
+
+    if not result.get("error"):
+        cache_service.set_analysis_cache(cache_key, analysis_type, result)
+
+    return result
+
+
+def _stream_cached_analysis(cache_key, analysis_type, compute):
+    """
+    Streaming counterpart of _cached_analysis.
+
+    compute(emit) runs on a worker thread and calls emit(event, data) as the
+    answer arrives (see the stream_* functions for the events). Yields those
+    (event, data) pairs, "ping" while idle, and finally ("result", result).
+    A cache hit yields only the result. A caller that joins an identical
+    in-flight call (streaming or not) receives no deltas, only the shared
+    result. The computation runs to completion and is cached even if the
+    client disconnects.
+    """
+    cached = cache_service.get_analysis_cache(cache_key, analysis_type)
+    if cached:
+        yield "result", cached
+        return
+
+    events = queue.Queue()
+
+    def run():
+        try:
+            result = _flights.do(
+                (cache_key, analysis_type), _compute_analysis,
+                cache_key, analysis_type, lambda: compute(lambda event, data: events.put((event, data))),
+            )
+        except Exception as e:
+            logger.error(f"Streaming {analysis_type} failed: {e}", exc_info=True)
+            result = {"error": str(e)}
+        events.put(("result", result))
+
+    threading.Thread(target=run, name=f"stream-{analysis_type}", daemon=True).start()
+    while True:
+        try:
+            event, data = events.get(timeout=STREAM_KEEPALIVE_SECONDS)
+        except queue.Empty:
+            yield "ping", {}
+            continue
+        yield event, data
+        if event == "result":
+            return
+
+
+def _delta_emitter(emit):
+    """on_delta callback publishing each piece of text as a "delta" event."""
+    return lambda piece: emit("delta", {"text": piece})
+
+
 def summarize(content):
     """
     Generate content summary with caching.
@@ -30,17 +117,24 @@ def summarize(content):
         {"summary": str, "key_points": [str], "error": str|None}
     """
     cache_key = cache_service.make_analysis_cache_key(content, "summary")
-    cached = cache_service.get_analysis_cache(cache_key, "summary")
-    if cached:
-        return cached
+    return _cached_analysis(
+        cache_key, "summary", lambda: _get_agent().generate_summary(content)
+    )
 
-    agent = _get_agent()
-    result = agent.generate_summary(content)
 
-    if not result.get("error"):
-        cache_service.set_analysis_cache(cache_key, "summary", result)
+def stream_summarize(content):
+    """
+    Streaming summarize.
 
-    return result
+    Yields:
+        ("delta", {"text": str}) for each piece of the raw answer, "ping"
+        while idle, then ("result", {"summary", "key_points", "error"}).
+    """
+    cache_key = cache_service.make_analysis_cache_key(content, "summary")
+    return _stream_cached_analysis(
+        cache_key, "summary",
+        lambda emit: _get_agent().generate_summary(content, on_delta=_delta_emitter(emit)),
+    )
 
 
 def translate(content, target_lang="zh"):
@@ -50,18 +144,61 @@ def translate(content, target_lang="zh"):
     Returns:
         {"translated_text": str, "source_lang": str, "error": str|None}
     """
-    cache_key = cache_service.make_analysis_cache_key(content, f"translate_{target_lang}")
-    cached = cache_service.get_analysis_cache(cache_key, f"translate_{target_lang}")
-    if cached:
-        return cached
+    analysis_type = f"translate_{target_lang}"
+    cache_key = cache_service.make_analysis_cache_key(content, analysis_type)
+    return _cached_analysis(
+        cache_key, analysis_type, lambda: _get_agent().translate_content(content, target_lang)
+    )
 
-    agent = _get_agent()
-    result = agent.translate_content(content, target_lang)
 
-    if not result.get("error"):
-        cache_service.set_analysis_cache(cache_key, f"translate_{target_lang}", result)
+def stream_translate(content, target_lang="zh"):
+    """
+    Streaming translate; events as in stream_summarize, ending with
+    ("result", {"translated_text", "source_lang", "error"}).
+    """
+    analysis_type = f"translate_{target_lang}"
+    cache_key = cache_service.make_analysis_cache_key(content, analysis_type)
+    return _stream_cached_analysis(
+        cache_key, analysis_type,
+        lambda emit: _get_agent().translate_content(content, target_lang, on_delta=_delta_emitter(emit)),
+    )
 
-    return result
+
+def translate_batch(texts, target_lang="zh"):
+    """
+    Translate many texts, serving each from the analysis cache when possible.
+
+    Uncached texts are deduplicated and sent to the LLM in packed batches;
+    translations share cache entries with :func:`translate`.
+
+    Returns:
+        List of {"translated_text": str, "source_lang": str, "error": str|None},
+        aligned with ``texts``.
+    """
+    analysis_type = f"translate_{target_lang}"
+    keys = [cache_service.make_analysis_cache_key(text, analysis_type) for text in texts]
+
+    resolved = {}
+    pending = {}
+    for key, text in zip(keys, texts):
+        if key in resolved or key in pending:
+            continue
+        cached = cache_service.get_analysis_cache(key, analysis_type)
+        if cached:
+            resolved[key] = cached
+        else:
+            pending[key] = text
+
+    if pending:
+        agent = _get_agent()
+        translations = agent.translate_batch(list(pending.values()), target_lang)
+        for key, result in zip(pending.keys(), translations):
+            if not result.get("error"):
+                cache_service.set_analysis_cache(key, analysis_type, result)
+            resolved[key] = result
+
+    logger.info(f"Batch translate: {len(texts)} texts, {len(pending)} sent to LLM")
+    return [resolved[key] for key in keys]
 
 
 def analyze_paper(paper_data):
@@ -75,46 +212,81 @@ def analyze_paper(paper_data):
         {"abstract_summary": str, "method": str, "innovation": str,
          "results": str, "conclusion": str, "error": str|None}
     """
-    content_for_key = f"{paper_data.get('title', '')}:{paper_data.get('abstract', paper_data.get('snippet', ''))}"
-    cache_key = cache_service.make_analysis_cache_key(content_for_key, "paper_analysis")
-    cached = cache_service.get_analysis_cache(cache_key, "paper_analysis")
-    if cached:
-        return cached
+    return _cached_analysis(
+        _paper_cache_key(paper_data), "paper_analysis", lambda: _get_agent().analyze_paper(paper_data)
+    )
 
-    agent = _get_agent()
-    result = agent.analyze_paper(paper_data)
 
-    if not result.get("error"):
-        cache_service.set_analysis_cache(cache_key, "paper_analysis", result)
+def stream_analyze_paper(paper_data):
+    """
+    Streaming analyze_paper; events as in stream_summarize, ending with the
+    five-field analysis as ("result", {...}).
+    """
+    return _stream_cached_analysis(
+        _paper_cache_key(paper_data), "paper_analysis",
+        lambda emit: _get_agent().analyze_paper(paper_data, on_delta=_delta_emitter(emit)),
+    )
 
-    return result
 
+def _paper_cache_key(paper_data):
+    content_for_key = f"{paper_data.get('title', '')}:{paper_data.get('abstract', paper_data.get('snippet', ''))}"
+    return cache_service.make_analysis_cache_key(content_for_key, "paper_analysis")
 
-def analyze_paper_full(arxiv_id, title):
+
+def analyze_paper_full(arxiv_id, title, on_stage=None):
     """
     Deep analysis of a full paper by downloading and extracting its PDF.
 
     Args:
         arxiv_id: arXiv paper ID.
         title: Paper title.
+        on_stage: Optional callback(stage) called with "downloading",
+            "extracting" and "analyzing" as the pipeline advances (not
+            called on a cache hit).
 
     Returns:
         {"abstract_summary": str, "method": str, "innovation": str,
          "results": str, "conclusion": str, "error": str|None}
     """
-    # Check cache first
     cache_key = cache_service.make_analysis_cache_key(f"full:{arxiv_id}", "paper_full_analysis")
-    cached = cache_service.get_analysis_cache(cache_key, "paper_full_analysis")
-    if cached:
-        return cached
+    return _cached_analysis(
+        cache_key, "paper_full_analysis", lambda: _run_paper_full(arxiv_id, title, on_stage)
+    )
 
+
+def stream_analyze_paper_full(arxiv_id, title):
+    """
+    Streaming analyze_paper_full.
+
+    Yields ("stage", {"stage": str}) as the pipeline advances (downloading,
+    extracting, analyzing) and ("delta", {"text": str}) for the final
+    analysis call; for long papers that is the reduce step, after the
+    per-section notes are done. Ends with ("result", {...}).
+    """
+    cache_key = cache_service.make_analysis_cache_key(f"full:{arxiv_id}", "paper_full_analysis")
+    return _stream_cached_analysis(
+        cache_key, "paper_full_analysis",
+        lambda emit: _run_paper_full(
+            arxiv_id, title,
+            on_stage=lambda stage: emit("stage", {"stage": stage}),
+            on_delta=_delta_emitter(emit),
+        ),
+    )
+
+
+def _run_paper_full(arxiv_id, title, on_stage=None, on_delta=None):
+    """Download, extract and analyze a full paper (uncached)."""
     config = get_config()
+    on_stage = on_stage or (lambda stage: None)
 
     # Download PDF if needed
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", ".qoder"))
-    from skills.pdf_download_skill import get_or_download_pdf, extract_pdf_text
+    from skills.pdf_download_skill import get_or_download_pdf
 
-    pdf_path = get_or_download_pdf(arxiv_id, str(config.DATABASE_PATH), str(config.DOWNLOAD_DIR))
+    on_stage("downloading")
+    pdf_path = get_or_download_pdf(
+        arxiv_id, str(config.DATABASE_PATH), str(config.DOWNLOAD_DIR), title=title
+    )
     if not pdf_path:
         return {
             "abstract_summary": "", "method": "", "innovation": "",
@@ -122,8 +294,10 @@ def analyze_paper_full(arxiv_id, title):
             "error": "Failed to download PDF",
         }
 
-    # Extract text from PDF
-    full_text = extract_pdf_text(pdf_path)
+    # Stored page text (usually extracted right after the download finished)
+    on_stage("extracting")
+    document = pdf_text_store.get_document(pdf_path)
+    full_text = pdf_text_store.document_text(document).strip() if document else ""
     if not full_text:
         return {
             "abstract_summary": "", "method": "", "innovation": "",
@@ -131,11 +305,58 @@ def analyze_paper_full(arxiv_id, title):
             "error": "Failed to extract text from PDF",
         }
 
-    # Analyze with LLM
+    on_stage("analyzing")
     agent = _get_agent()
-    result = agent.analyze_paper_full(title, full_text)
+    settings = config.ANALYSIS_SETTINGS
+    if len(full_text) <= settings.get("full_analysis_direct_chars", 12000):
+        # Short paper: one call already sees all of it
+        return agent.analyze_paper_full(title, full_text, on_delta=on_delta)
+    return _map_reduce_paper(agent, title, document, settings, on_delta)
 
-    if not result.get("error"):
-        cache_service.set_analysis_cache(cache_key, "paper_full_analysis", result)
 
-    return result
+def _map_reduce_paper(agent, title, document, settings, on_delta=None):
+    """
+    Analyze a long paper from per-section chunk notes.
+
+    Chunks follow the detected sections (references are skipped) and are
+    summarized in parallel; each chunk's notes are cached by chunk hash, so
+    re-analysing a paper only pays for the final reduce call.
+    """
+    text_chars = document["char_count"]
+    max_chunks = settings.get("full_analysis_max_chunks", 24)
+    chunk_chars = max(settings.get("full_analysis_chunk_chars", 8000), -(-text_chars // max_chunks))
+    chunks = pdf_text_store.section_chunks(document, chunk_chars, max_chunks=max_chunks)
+
+    keys = [cache_service.make_chunk_cache_key(c["text"], c["sections"]) for c in chunks]
+    notes = {}
+    pending = []
+    for idx, key in enumerate(keys):
+        cached = cache_service.get_analysis_cache(key, "paper_chunk_notes")
+        if cached:
+            notes[idx] = cached["notes"]
+        else:
+            pending.append(idx)
+
+    if pending:
+        summaries = agent.summarize_paper_chunks(title, [chunks[idx] for idx in pending])
+        for idx, summary in zip(pending, summaries):
+            if summary:
+                notes[idx] = summary
+                cache_service.set_analysis_cache(keys[idx], "paper_chunk_notes", {"notes": summary})
+
+    logger.info(
+        f"Full-paper map-reduce: {text_chars} chars, {len(chunks)} chunks, "
+        f"{len(chunks) - len(pending)} cached, {len(notes)} with notes"
+    )
+    if not notes:
+        return {
+            "abstract_summary": "", "method": "", "innovation": "",
+            "results": "", "conclusion": "",
+            "error": "Failed to summarize paper sections",
+        }
+    ordered = [(chunks[idx]["sections"], notes[idx]) for idx in sorted(notes)]
+    missing = [
+        name for idx, chunk in enumerate(chunks) if idx not in notes
+        for name in chunk["headings"] or chunk["sections"]
+    ]
+    return agent.reduce_paper_analysis(title, ordered, missing_sections=missing, on_delta=on_delta)
@@ -0,0 +1,253 @@
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from datetime import datetime
+
+from backend.config import get_config
+from backend.services.http_pool import HttpSessionPool
+from backend.services.single_flight import SingleFlight
+from backend.utils.logger import get_logger
+
+logger = get_logger("arxiv_fetcher")
+
+ARXIV_API_URL = "https://export.arxiv.org/api/query"
+
+_NS = {
+    "atom": "http://www.w3.org/2005/Atom",
+    "arxiv": "http://arxiv.org/schemas/atom",
+    "opensearch": "http://a9.com/-/spec/opensearch/1.1/",
+}
+
+SORT_RELEVANCE = "relevance"
+SORT_SUBMITTED_DATE = "submittedDate"
+
+# Extra attempts for a page that comes back empty although results should be there
+EMPTY_PAGE_RETRIES = 3
+
+
+class ArxivFetcher:
+    """
+    Process-wide arXiv API fetch layer.
+
+    All requests share one pacing clock so concurrent searches never hit the
+    API closer together than ``delay_seconds``. Raw Atom pages are cached by
+    (query, sort, page) with a fixed page size, so any two searches with the
+    same query and sort order reuse each other's pages regardless of how many
+    results they ask for. Identical in-flight page requests are merged.
+
+    Pages are not shared across sort orders, because each order returns a
+    different sequence of results. In particular, a time-filtered search
+    (sorted by submission date) and an unfiltered search (sorted by
+    relevance) for the same query fetch their pages separately.
+    """
+
+    DEFAULT_SETTINGS = {
+        "page_size": 25,
+        "delay_seconds": 1.0,
+        "cache_ttl_seconds": 900,
+        "cache_max_pages": 256,
+    }
+
+    def __init__(self, settings=None, proxy=None):
+        self.settings = dict(self.DEFAULT_SETTINGS, **(settings or {}))
+        self.page_size = self.settings["page_size"]
+        self.delay_seconds = self.settings["delay_seconds"]
+        self.cache_ttl = self.settings["cache_ttl_seconds"]
+        self.cache_max_pages = self.settings["cache_max_pages"]
+
+        self.http = HttpSessionPool(proxy=proxy)
+        self.flights = SingleFlight()
+
+        self.pace_lock = threading.Lock()
+        self.last_request = 0.0
+
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    # --- Page cache ---
+
+    def _cache_get(self, key):
+        with self.cache_lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                self.cache_misses += 1
+                return None
+            stored_at, xml_text = entry
+            if time.monotonic() - stored_at > self.cache_ttl:
+                del self.cache[key]
+                self.cache_misses += 1
+                return None
+            self.cache.move_to_end(key)
+            self.cache_hits += 1
+            return xml_text
+
+    def _cache_set(self, key, xml_text):
+        with self.cache_lock:
+            self.cache[key] = (time.monotonic(), xml_text)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_max_pages:
+                self.cache.popitem(last=False)
+
+    # --- Fetching ---
+
+    def _wait_for_slot(self):
+        """Reserve the next request slot on the shared pacing clock."""
+        with self.pace_lock:
+            now = time.monotonic()
+            start_at = max(now, self.last_request + self.delay_seconds)
+            self.last_request = start_at
+        wait = start_at - now
+        if wait > 0:
+            time.sleep(wait)
+
+    def _download_page(self, query, sort_by, page):
+        """
+        Fetch one page upstream and cache it unless it is empty.
+
+        The arXiv API sometimes answers with an empty page in the middle of
+        a result set; such pages are retried up to EMPTY_PAGE_RETRIES times.
+        Only an empty first page reporting no results at all is taken as
+        final, and empty pages are never cached.
+        """
+        params = {
+            "search_query": query,
+            "sortBy": sort_by,
+            "sortOrder": "descending",
+            "start": page * self.page_size,
+            "max_results": self.page_size,
+        }
+        for attempt in range(EMPTY_PAGE_RETRIES + 1):
+            self._wait_for_slot()
+            logger.info(f"Fetching arXiv page: query='{query}' sort={sort_by} page={page}")
+            resp = self.http.get(
+                ARXIV_API_URL,
+                params=params,
+                headers={"User-Agent": "SearchIsAllYouNeed/1.0"},
+                timeout=15,
+            )
+            resp.raise_for_status()
+            xml_text = resp.text
+            entries, total = parse_feed(xml_text)
+            if entries:
+                self._cache_set((query, sort_by, page), xml_text)
+                return xml_text
+            if page == 0 and total == 0:
+                break
+            logger.warning(
+                f"Unexpected empty arXiv page (attempt {attempt + 1}/{EMPTY_PAGE_RETRIES + 1}): "
+                f"query='{query}' page={page} total={total}"
+            )
+        return xml_text
+
+    def fetch_page(self, query, sort_by, page):
+        """
+        Get one raw Atom page, from cache or upstream.
+
+        Returns:
+            Atom XML string.
+        """
+        key = (query, sort_by, page)
+        xml_text = self._cache_get(key)
+        if xml_text is not None:
+            return xml_text
+        return self.flights.do(key, self._download_page, query, sort_by, page)
+
+    def iter_results(self, query, sort_by=SORT_RELEVANCE, max_results=None):
+        """
+        Yield parsed entries page by page until max_results or the result set ends.
+
+        Pages are only fetched when the caller keeps iterating, so stopping
+        early avoids unnecessary API requests.
+        """
+        yielded = 0
+        page = 0
+        while max_results is None or yielded < max_results:
+            entries, total = parse_feed(self.fetch_page(query, sort_by, page))
+            for entry in entries:
+                yield entry
+                yielded += 1
+                if max_results is not None and yielded >= max_results:
+                    return
+            page += 1
+            if len(entries) < self.page_size or page * self.page_size >= total:
+                return
+
+    def stats(self):
+        with self.cache_lock:
+            cache_stats = {
+                "pages": len(self.cache),
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+            }
+        return {"cache": cache_stats, "requests": self.flights.stats()}
+
+
+def _text(elem, path):
+    found = elem.find(path, _NS)
+    return found.text.strip() if found is not None and found.text else ""
+
+
+def parse_feed(xml_text):
+    """
+    Parse an arXiv Atom feed.
+
+    Returns:
+        (entries, total_results) where each entry is a dict with entry_id,
+        title, summary, authors, published (UTC datetime or None),
+        pdf_url and categories.
+    """
+    root = ET.fromstring(xml_text)
+    total_text = _text(root, "opensearch:totalResults")
+    total = int(total_text) if total_text.isdigit() else 0
+
+    entries = []
+    for entry in root.findall("atom:entry", _NS):
+        entry_id = _text(entry, "atom:id")
+        if not entry_id:
+            continue
+
+        published = None
+        published_text = _text(entry, "atom:published")
+        if published_text:
+            try:
+                published = datetime.fromisoformat(published_text.replace("Z", "+00:00"))
+            except ValueError:
+                published = None
+
+        pdf_url = ""
+        for link in entry.findall("atom:link", _NS):
+            if link.get("title") == "pdf":
+                pdf_url = link.get("href", "")
+                break
+        if not pdf_url:
+            pdf_url = entry_id.replace("/abs/", "/pdf/")
+
+        entries.append({
+            "entry_id": entry_id,
+            "title": re.sub(r"\s+", " ", _text(entry, "atom:title")),
+            "summary": _text(entry, "atom:summary"),
+            "authors": [_text(a, "atom:name") for a in entry.findall("atom:author", _NS)],
+            "published": published,
+            "pdf_url": pdf_url,
+            "categories": [c.get("term") for c in entry.findall("atom:category", _NS) if c.get("term")],
+        })
+    return entries, total
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_arxiv_fetcher():
+    """Get the process-wide ArxivFetcher instance."""
+    global _fetcher
+    if _fetcher is None:
+        with _fetcher_lock:
+            if _fetcher is None:
+                config = get_config()
+                _fetcher = ArxivFetcher(config.ARXIV_SETTINGS, proxy=config.HTTP_PROXY or None)
+    return _fetcher
@@ -1,12 +1,58 @@
 import json
 import hashlib
+import threading
 from datetime import datetime, timedelta
 
+from backend.config import get_config
 from backend.models.database import get_connection
+from backend.models.db_writer import get_db_writer
+from backend.services.memory_cache import MemoryCache
 from backend.utils.logger import get_logger
 
 logger = get_logger("cache_service")
 
+# Analysis results expire this long after being written
+ANALYSIS_CACHE_TTL = timedelta(days=7)
+
+# Stored relevance scores expire this long after being written
+RELEVANCE_CACHE_TTL = timedelta(days=30)
+
+# Max URLs per relevance lookup query (SQLite host parameter limit)
+_RELEVANCE_LOOKUP_CHUNK = 500
+
+# In-process tier in front of SQLite (lazy-initialized from config)
+_memory_cache = None
+_memory_cache_lock = threading.Lock()
+
+# SQLite tier hit/miss counters
+_sqlite_stats = {"hits": 0, "misses": 0}
+_sqlite_stats_lock = threading.Lock()
+
+
+def _get_memory_cache():
+    global _memory_cache
+    if _memory_cache is None:
+        with _memory_cache_lock:
+            if _memory_cache is None:
+                settings = get_config().CACHE_SETTINGS
+                _memory_cache = MemoryCache(
+                    max_entries=settings.get("memory_max_entries", 1024),
+                    max_bytes=settings.get("memory_max_bytes", 64 * 1024 * 1024),
+                )
+    return _memory_cache
+
+
+def _record_sqlite(hit):
+    with _sqlite_stats_lock:
+        _sqlite_stats["hits" if hit else "misses"] += 1
+
+
+def get_cache_stats():
+    """Hit/miss counts for the memory and SQLite cache tiers."""
+    with _sqlite_stats_lock:
+        sqlite_stats = dict(_sqlite_stats)
+    return {"memory": _get_memory_cache().stats(), "sqlite": sqlite_stats}
+
 
 def _hash(text):
     """Generate MD5 hash for cache key."""
@@ -25,30 +71,58 @@ def make_analysis_cache_key(content, analysis_type):
     return _hash(f"{truncated}:{analysis_type}")
 
 
+def make_chunk_cache_key(text, sections):
+    """Hash a full-paper chunk (its whole text, unlike make_analysis_cache_key)."""
+    return _hash(f"{','.join(sections)}\n{text}:paper_chunk_notes")
+
+
+def normalize_query(query):
+    """Normalize a query for relevance-score lookups (case and whitespace insensitive)."""
+    return " ".join(query.lower().split())
+
+
+def make_relevance_content_hash(item):
+    """Hash the result fields the relevance prompt sees (title and snippet)."""
+    return _hash(f"{item.get('title', '')}\n{item.get('snippet', '')}")
+
+
 # --- Search Cache ---
+# Values returned from the cache are shared objects; treat them as read-only.
 
 def get_search_cache(query_hash):
     """Get cached search results if not expired."""
+    memory = _get_memory_cache()
+    cached = memory.get(("search", query_hash))
+    if cached is not None:
+        return cached
+
     with get_connection() as conn:
         row = conn.execute(
-            "SELECT results FROM search_cache WHERE query_hash = ? AND expire_at > ?",
+            "SELECT results, expire_at FROM search_cache WHERE query_hash = ? AND expire_at > ?",
             (query_hash, datetime.utcnow().isoformat()),
         ).fetchone()
         if row:
+            _record_sqlite(True)
             logger.debug(f"Search cache hit: {query_hash[:8]}...")
-            return json.loads(row["results"])
+            results = json.loads(row["results"])
+            memory.set(
+                ("search", query_hash), results,
+                datetime.fromisoformat(row["expire_at"]), len(row["results"]),
+            )
+            return results
+    _record_sqlite(False)
     return None
 
 
 def set_search_cache(query_hash, results, ttl_hours=24):
     """Store search results in cache."""
-    expire_at = (datetime.utcnow() + timedelta(hours=ttl_hours)).isoformat()
+    expire_at = datetime.utcnow() + timedelta(hours=ttl_hours)
     results_json = json.dumps(results, ensure_ascii=False)
-    with get_connection() as conn:
-        conn.execute(
-            "INSERT OR REPLACE INTO search_cache (query_hash, results, expire_at) VALUES (?, ?, ?)",
-            (query_hash, results_json, expire_at),
-        )
+    get_db_writer().execute(
+        "INSERT OR REPLACE INTO search_cache (query_hash, results, expire_at) VALUES (?, ?, ?)",
+        (query_hash, results_json, expire_at.isoformat()),
+    )
+    _get_memory_cache().set(("search", query_hash), results, expire_at, len(results_json))
     logger.debug(f"Search cache set: {query_hash[:8]}..., ttl={ttl_hours}h")
 
 
@@ -56,6 +130,11 @@ def set_search_cache(query_hash, results, ttl_hours=24):
 
 def get_analysis_cache(content_hash, analysis_type):
     """Get cached analysis result."""
+    memory = _get_memory_cache()
+    cached = memory.get(("analysis", content_hash, analysis_type))
+    if cached is not None:
+        return cached
+
     with get_connection() as conn:
         row = conn.execute(
             "SELECT result, timestamp FROM analysis_cache WHERE content_hash = ? AND analysis_type = ?",
@@ -64,40 +143,122 @@ def get_analysis_cache(content_hash, analysis_type):
         if row:
             # Check 7-day expiry
             cached_time = datetime.fromisoformat(row["timestamp"])
-            if datetime.utcnow() - cached_time < timedelta(days=7):
+            if datetime.utcnow() - cached_time < ANALYSIS_CACHE_TTL:
+                _record_sqlite(True)
                 logger.debug(f"Analysis cache hit: {content_hash[:8]}... type={analysis_type}")
-                return json.loads(row["result"])
+                result = json.loads(row["result"])
+                memory.set(
+                    ("analysis", content_hash, analysis_type), result,
+                    cached_time + ANALYSIS_CACHE_TTL, len(row["result"]),
+                )
+                return result
             # Expired, clean up
-            conn.execute(
+            get_db_writer().execute(
                 "DELETE FROM analysis_cache WHERE content_hash = ? AND analysis_type = ?",
                 (content_hash, analysis_type),
             )
+    _record_sqlite(False)
     return None
 
 
 def set_analysis_cache(content_hash, analysis_type, result):
     """Store analysis result in cache."""
     result_json = json.dumps(result, ensure_ascii=False)
-    with get_connection() as conn:
-        conn.execute(
-            "INSERT OR REPLACE INTO analysis_cache (content_hash, analysis_type, result) VALUES (?, ?, ?)",
-            (content_hash, analysis_type, result_json),
-        )
+    get_db_writer().execute(
+        "INSERT OR REPLACE INTO analysis_cache (content_hash, analysis_type, result) VALUES (?, ?, ?)",
+        (content_hash, analysis_type, result_json),
+    )
+    _get_memory_cache().set(
+        ("analysis", content_hash, analysis_type), result,
+        datetime.utcnow() + ANALYSIS_CACHE_TTL, len(result_json),
+    )
     logger.debug(f"Analysis cache set: {content_hash[:8]}... type={analysis_type}")
 
 
+# --- Relevance Scores ---
+
+def get_relevance_scores(query, items):
+    """
+    Look up stored relevance scores for search results.
+
+    A score only matches when the normalized query, URL and content hash are
+    all unchanged, so edited titles or snippets are scored again.
+
+    Returns:
+        dict mapping index in ``items`` to score (0-100) for stored items.
+    """
+    query_norm = normalize_query(query)
+    wanted = {}
+    for idx, item in enumerate(items):
+        url = item.get("url", "")
+        if url:
+            wanted.setdefault((url, make_relevance_content_hash(item)), []).append(idx)
+    if not wanted:
+        return {}
+
+    urls = list({url for url, _ in wanted})
+    cutoff = (datetime.utcnow() - RELEVANCE_CACHE_TTL).isoformat()
+    scores = {}
+    with get_connection() as conn:
+        for i in range(0, len(urls), _RELEVANCE_LOOKUP_CHUNK):
+            chunk = urls[i:i + _RELEVANCE_LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                "SELECT url, content_hash, score FROM relevance_scores "
+                f"WHERE query_norm = ? AND timestamp > ? AND url IN ({placeholders})",
+                (query_norm, cutoff, *chunk),
+            ).fetchall()
+            for row in rows:
+                for idx in wanted.get((row["url"], row["content_hash"]), []):
+                    scores[idx] = row["score"]
+    logger.debug(f"Relevance scores: {len(scores)}/{len(items)} stored for query='{query_norm}'")
+    return scores
+
+
+def set_relevance_scores(query, scored_items):
+    """
+    Store relevance scores.
+
+    Args:
+        query: Query the results were scored against.
+        scored_items: Iterable of (result dict, score) pairs.
+    """
+    query_norm = normalize_query(query)
+    now = datetime.utcnow().isoformat()
+    rows = [
+        (query_norm, item.get("url", ""), make_relevance_content_hash(item), int(score), now)
+        for item, score in scored_items if item.get("url")
+    ]
+    if not rows:
+        return
+    get_db_writer().executemany(
+        "INSERT OR REPLACE INTO relevance_scores "
+        "(query_norm, url, content_hash, score, timestamp) VALUES (?, ?, ?, ?, ?)",
+        rows,
+    )
+    logger.debug(f"Relevance scores set: {len(rows)} for query='{query_norm}'")
+
+
 # --- Cache Cleanup ---
 
 def cleanup_expired_cache():
     """Remove expired entries from all cache tables."""
-    with get_connection() as conn:
-        now = datetime.utcnow().isoformat()
-        deleted_search = conn.execute(
-            "DELETE FROM search_cache WHERE expire_at <= ?", (now,)
-        ).rowcount
-        cutoff = (datetime.utcnow() - timedelta(days=7)).isoformat()
-        deleted_analysis = conn.execute(
-            "DELETE FROM analysis_cache WHERE timestamp <= ?", (cutoff,)
-        ).rowcount
-    if deleted_search or deleted_analysis:
-        logger.info(f"Cache cleanup: search={deleted_search}, analysis={deleted_analysis}")
+    writer = get_db_writer()
+    now = datetime.utcnow().isoformat()
+    deleted_search = writer.execute(
+        "DELETE FROM search_cache WHERE expire_at <= ?", (now,), wait=True
+    ).rowcount
+    cutoff = (datetime.utcnow() - ANALYSIS_CACHE_TTL).isoformat()
+    deleted_analysis = writer.execute(
+        "DELETE FROM analysis_cache WHERE timestamp <= ?", (cutoff,), wait=True
+    ).rowcount
+    relevance_cutoff = (datetime.utcnow() - RELEVANCE_CACHE_TTL).isoformat()
+    deleted_relevance = writer.execute(
+        "DELETE FROM relevance_scores WHERE timestamp <= ?", (relevance_cutoff,), wait=True
+    ).rowcount
+    deleted_memory = _get_memory_cache().purge_expired()
+    if deleted_search or deleted_analysis or deleted_relevance or deleted_memory:
+        logger.info(
+            f"Cache cleanup: search={deleted_search}, analysis={deleted_analysis}, "
+            f"relevance={deleted_relevance}, memory={deleted_memory}"
+        )
@@ -0,0 +1,106 @@
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from backend.utils.logger import get_logger
+
+logger = get_logger("http_pool")
+
+
+class HttpSessionPool:
+    """Keep-alive requests sessions, one per host, with retry and proxy support."""
+
+    DEFAULT_SETTINGS = {
+        "pool_maxsize": 10,
+        "max_retries": 2,
+        "backoff_factor": 1.0,
+        "status_forcelist": [429, 500, 502, 503, 504],
+    }
+
+    def __init__(self, settings=None, proxy=None):
+        """
+        Args:
+            settings: Optional dict overriding DEFAULT_SETTINGS.
+            proxy: Optional proxy URL applied to http and https traffic.
+        """
+        self.settings = dict(self.DEFAULT_SETTINGS, **(settings or {}))
+        self.proxy = proxy
+        self.sessions = {}
+        self.adapters = {}
+        self.lock = threading.Lock()
+
+    def _create_session(self, host):
+        """Create a pooled session for one host. Must be called within lock."""
+        session = requests.Session()
+        retry_strategy = Retry(
+            total=self.settings["max_retries"],
+            backoff_factor=self.settings["backoff_factor"],
+            status_forcelist=self.settings["status_forcelist"],
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.settings["pool_maxsize"],
+            max_retries=retry_strategy,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({"Connection": "keep-alive"})
+        if self.proxy:
+            session.proxies.update({"http": self.proxy, "https": self.proxy})
+        self.adapters[host] = adapter
+        logger.debug(f"Created pooled session for {host}")
+        return session
+
+    def session_for(self, url):
+        """Get or create the shared session for the URL's host."""
+        host = urlparse(url).netloc.lower()
+        session = self.sessions.get(host)
+        if session is None:
+            with self.lock:
+                session = self.sessions.get(host)
+                if session is None:
+                    session = self._create_session(host)
+                    self.sessions[host] = session
+        return session
+
+    def get(self, url, **kwargs):
+        """Issue a GET through the pooled session for the URL's host."""
+        return self.session_for(url).get(url, **kwargs)
+
+    def stats(self):
+        """
+        Per-host connection reuse metrics.
+
+        Returns:
+            {host: {"requests": int, "connections": int, "reused": int}}
+            where connections counts new TCP(+TLS) connections opened.
+        """
+        stats = {}
+        for host, adapter in list(self.adapters.items()):
+            managers = [adapter.poolmanager] + list(adapter.proxy_manager.values())
+            total_requests = 0
+            total_connections = 0
+            for manager in managers:
+                for key in list(manager.pools.keys()):
+                    pool = manager.pools.get(key)
+                    if pool is None:
+                        continue
+                    total_requests += pool.num_requests
+                    total_connections += pool.num_connections
+            stats[host] = {
+                "requests": total_requests,
+                "connections": total_connections,
+                "reused": max(0, total_requests - total_connections),
+            }
+        return stats
+
+    def close(self):
+        with self.lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions.clear()
+            self.adapters.clear()
@@ -0,0 +1,187 @@
+import re
+import threading
+import zlib
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+from backend.utils.logger import get_logger
+
+logger = get_logger("local_relevance")
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_CJK_RUN_RE = re.compile(r"[\u4e00-\u9fff]+")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or "
+    "that the this to was were which with we our using via based".split()
+)
+
+
+def tokenize(text):
+    """
+    Split text into lexical terms.
+
+    Latin text yields lowercase words (stopwords dropped); CJK runs yield
+    character bigrams, or the single character for one-character runs.
+    """
+    text = text.lower()
+    tokens = [w for w in _WORD_RE.findall(text) if len(w) > 1 and w not in _STOPWORDS]
+    for run in _CJK_RUN_RE.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+@lru_cache(maxsize=65536)
+def _bucket(token, dim):
+    return zlib.crc32(token.encode("utf-8")) % dim
+
+
+class LocalRelevanceScorer:
+    """
+    CPU-only lexical relevance pre-filter ahead of the LLM scorer.
+
+    Results and the query are embedded as hashed TF-IDF vectors (IDF taken
+    over the result set being scored) and compared by cosine similarity.
+    Results at or above ``accept_similarity`` are scored ``accept_score``,
+    results at or below ``reject_similarity`` are scored ``reject_score``,
+    and everything in between is left for the LLM.
+    """
+
+    DEFAULT_SETTINGS = {
+        "enabled": True,
+        "accept_similarity": 0.45,
+        "reject_similarity": 0.05,
+        "accept_score": 80,
+        "reject_score": 10,
+        "min_query_coverage": 0.5,
+        "hash_dim": 16384,
+    }
+
+    def __init__(self, settings=None):
+        self.settings = dict(self.DEFAULT_SETTINGS, **(settings or {}))
+        self.accept_similarity = self.settings["accept_similarity"]
+        self.reject_similarity = self.settings["reject_similarity"]
+        self.accept_score = self.settings["accept_score"]
+        self.reject_score = self.settings["reject_score"]
+        self.min_query_coverage = self.settings["min_query_coverage"]
+        self.dim = self.settings["hash_dim"]
+
+        self.lock = threading.Lock()
+        self.counters = {
+            "results": 0,
+            "accepted": 0,
+            "rejected": 0,
+            "uncertain": 0,
+            "llm_calls_saved": 0,
+        }
+
+    def _term_counts(self, token_lists):
+        """
+        Hashed term counts, one row per token list.
+
+        Only the hash buckets that occur get a column, so the matrix is
+        rows x distinct terms rather than rows x hash_dim.
+
+        Returns:
+            (counts, buckets) where counts[row, j] counts bucket buckets[j].
+        """
+        rows, cols, values = [], [], []
+        for row, tokens in enumerate(token_lists):
+            for token, count in Counter(tokens).items():
+                rows.append(row)
+                cols.append(_bucket(token, self.dim))
+                values.append(count)
+        buckets, cols = np.unique(np.array(cols, dtype=np.int64), return_inverse=True)
+        counts = np.zeros((len(token_lists), len(buckets)), dtype=np.float32)
+        np.add.at(counts, (np.array(rows, dtype=np.intp), cols), np.array(values, dtype=np.float32))
+        return counts, buckets
+
+    def similarities(self, query, items):
+        """
+        Cosine similarity between the query and each result's title and snippet.
+
+        Returns:
+            (similarities, query_coverage): a float array aligned with
+            ``items`` and the fraction of query terms found in any result.
+        """
+        query_tokens = tokenize(query)
+        doc_tokens = [
+            tokenize(f"{item.get('title', '')} {item.get('snippet', '')}") for item in items
+        ]
+        if not query_tokens or not items:
+            return np.zeros(len(items), dtype=np.float32), 0.0
+
+        # Query as the last row, so documents and query share columns
+        counts, _ = self._term_counts(doc_tokens + [query_tokens])
+        docs, query_vec = counts[:-1], counts[-1]
+
+        doc_freq = (docs > 0).sum(axis=0)
+        idf = np.log((1 + len(items)) / (1 + doc_freq)) + 1.0
+
+        doc_weights = np.log1p(docs) * idf
+        query_weights = np.log1p(query_vec) * idf
+        doc_norms = np.linalg.norm(doc_weights, axis=1)
+        query_norm = np.linalg.norm(query_weights)
+        doc_norms[doc_norms == 0] = 1.0
+        if query_norm == 0:
+            return np.zeros(len(items), dtype=np.float32), 0.0
+
+        sims = (doc_weights @ query_weights) / (doc_norms * query_norm)
+
+        coverage = float((doc_freq[query_vec > 0] > 0).mean())
+        return sims, coverage
+
+    def score(self, query, items):
+        """
+        Decide the clear-cut results locally.
+
+        When too few query terms occur anywhere in the results (e.g. a
+        Chinese query over English abstracts) lexical similarity says little,
+        so nothing is rejected.
+
+        Returns:
+            dict mapping index in ``items`` to score for results decided locally.
+            Indices not in the dict should go to the LLM.
+        """
+        if not items:
+            return {}
+
+        sims, coverage = self.similarities(query, items)
+        allow_reject = coverage >= self.min_query_coverage
+
+        decided = {}
+        accepted = rejected = 0
+        for idx, sim in enumerate(sims):
+            if sim >= self.accept_similarity:
+                decided[idx] = self.accept_score
+                accepted += 1
+            elif allow_reject and sim <= self.reject_similarity:
+                decided[idx] = self.reject_score
+                rejected += 1
+
+        uncertain = len(items) - accepted - rejected
+        with self.lock:
+            self.counters["results"] += len(items)
+            self.counters["accepted"] += accepted
+            self.counters["rejected"] += rejected
+            self.counters["uncertain"] += uncertain
+
+        logger.info(
+            f"Local relevance: {accepted} accepted, {rejected} rejected, "
+            f"{uncertain} uncertain (query coverage={coverage:.2f})"
+        )
+        return decided
+
+    def record_saved_calls(self, count):
+        """Add LLM calls avoided thanks to local decisions."""
+        with self.lock:
+            self.counters["llm_calls_saved"] += max(0, count)
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters)
@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+
+class MemoryCache:
+    """Thread-safe in-process LRU cache bounded by entry count and total bytes.
+
+    Values are stored as already-decoded objects and must be treated as
+    read-only by callers. Each entry carries an absolute UTC expiry so the
+    memory tier never outlives the persistent tier's TTL.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024):
+        """
+        Args:
+            max_entries: Maximum number of cached entries.
+            max_bytes: Maximum total size (caller-reported bytes) of all entries.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def _remove(self, key):
+        """Remove an entry. Must be called within lock."""
+        _, _, size = self.entries.pop(key)
+        self.total_bytes -= size
+
+    def get(self, key):
+        """Return the cached value, or None if missing or expired."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expire_at, _ = entry
+            if expire_at <= datetime.utcnow():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, expire_at, size):
+        """
+        Store a value until expire_at (naive UTC datetime).
+
+        Entries larger than max_bytes are not cached.
+        """
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (value, expire_at, size)
+            self.total_bytes += size
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                oldest = next(iter(self.entries))
+                self._remove(oldest)
+
+    def delete(self, key):
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+
+    def purge_expired(self):
+        """Drop all expired entries. Returns the number removed."""
+        now = datetime.utcnow()
+        with self.lock:
+            expired = [k for k, (_, expire_at, _) in self.entries.items() if expire_at <= now]
+            for key in expired:
+                self._remove(key)
+        return len(expired)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
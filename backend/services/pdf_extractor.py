@@ -0,0 +1,219 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from backend.config import get_config
+from backend.utils.logger import get_logger
+
+logger = get_logger("pdf_extractor")
+
+
+class ExtractionTimeout(Exception):
+    """Raised when a document takes longer than its extraction timeout."""
+
+
+def _page_count(pdf_path):
+    """Worker process: number of pages in a PDF."""
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+
+def _extract_range(pdf_path, start, stop):
+    """Worker process: text of pages [start, stop)."""
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as doc:
+        return [doc[i].get_text() for i in range(start, min(stop, doc.page_count))]
+
+
+class PdfExtractor:
+    """
+    PyMuPDF text extraction on a pool of worker processes.
+
+    Keeps CPU-bound parsing off the request threads (and out of the GIL).
+    Large PDFs are split into page ranges that run on several processes,
+    and several PDFs can be extracted at once. A document that exceeds its
+    timeout has its worker processes killed; the pool is then recreated and
+    other documents caught in the restart retry their unfinished ranges.
+    """
+
+    DEFAULT_SETTINGS = {
+        "processes": 0,  # 0 = min(4, CPU count)
+        "pages_per_task": 8,
+        "document_timeout_seconds": 60,
+    }
+
+    def __init__(self, settings=None):
+        self.settings = dict(self.DEFAULT_SETTINGS, **(settings or {}))
+        self.processes = self.settings["processes"] or min(4, os.cpu_count() or 1)
+        self.pages_per_task = max(1, self.settings["pages_per_task"])
+        self.timeout = self.settings["document_timeout_seconds"]
+        self.pool = None
+        self.lock = threading.Lock()
+        self.documents = 0
+        self.pages = 0
+        self.timeouts = 0
+        self.restarts = 0
+
+    def _get_pool(self):
+        with self.lock:
+            if self.pool is None:
+                # spawn: the server process runs threads, which fork does not mix well with
+                self.pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self.pool
+
+    def _kill_pool(self, pool):
+        """Terminate a pool's workers (stuck ones included) so the next call starts a fresh pool."""
+        with self.lock:
+            if self.pool is not pool:
+                return
+            self.pool = None
+            self.restarts += 1
+        # ProcessPoolExecutor has no public way to stop a running task
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _ranges(self, page_count):
+        return [
+            (start, min(start + self.pages_per_task, page_count))
+            for start in range(0, page_count, self.pages_per_task)
+        ]
+
+    def _remaining(self, deadline):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError()
+        return remaining
+
+    def iter_pages(self, pdf_path, timeout=None):
+        """
+        Yield (page_no, text) in page order as page ranges finish.
+
+        Args:
+            pdf_path: Path to the PDF file.
+            timeout: Seconds for the whole document; defaults to
+                document_timeout_seconds.
+
+        Raises:
+            ExtractionTimeout: If the document is not done in time.
+            Exception: Whatever PyMuPDF raised for an unreadable file.
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        retried = False
+        pool = self._get_pool()
+        futures = []
+        try:
+            while True:
+                try:
+                    page_count = pool.submit(_page_count, pdf_path).result(self._remaining(deadline))
+                    break
+                except BrokenProcessPool:
+                    if retried:
+                        raise
+                    retried = True
+                    pool = self._get_pool()
+
+            ranges = self._ranges(page_count)
+            futures = [pool.submit(_extract_range, pdf_path, start, stop) for start, stop in ranges]
+            index = 0
+            while index < len(ranges):
+                try:
+                    texts = futures[index].result(self._remaining(deadline))
+                except BrokenProcessPool:
+                    # Another document's timeout restarted the pool under us
+                    if retried:
+                        raise
+                    retried = True
+                    pool = self._get_pool()
+                    futures[index:] = [
+                        pool.submit(_extract_range, pdf_path, start, stop) for start, stop in ranges[index:]
+                    ]
+                    continue
+                start = ranges[index][0]
+                for offset, text in enumerate(texts):
+                    yield start + offset, text
+                index += 1
+
+            with self.lock:
+                self.documents += 1
+                self.pages += page_count
+        except TimeoutError:
+            with self.lock:
+                self.timeouts += 1
+            logger.warning(f"PDF extraction timed out, killing workers: {pdf_path}")
+            self._kill_pool(pool)
+            raise ExtractionTimeout(f"Extraction exceeded {timeout or self.timeout}s: {pdf_path}")
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def extract(self, pdf_path, timeout=None):
+        """
+        Extract every page of a PDF.
+
+        Returns:
+            List of page texts.
+
+        Raises:
+            ExtractionTimeout: If the document is not done in time.
+        """
+        return [text for _, text in self.iter_pages(pdf_path, timeout)]
+
+    def extract_many(self, pdf_paths, timeout=None):
+        """
+        Extract several PDFs at once, each with its own timeout.
+
+        Returns:
+            {pdf_path: [page texts] or None if it failed or timed out}
+        """
+        def run(path):
+            try:
+                return path, self.extract(path, timeout)
+            except Exception as e:
+                logger.error(f"PDF extraction failed: {path}: {e}")
+                return path, None
+
+        if not pdf_paths:
+            return {}
+        # Threads only wait on the process pool; they keep every document's ranges queued
+        with ThreadPoolExecutor(max_workers=min(len(pdf_paths), self.processes * 2)) as waiters:
+            return dict(waiters.map(run, pdf_paths))
+
+    def stats(self):
+        with self.lock:
+            return {
+                "processes": self.processes,
+                "documents": self.documents,
+                "pages": self.pages,
+                "timeouts": self.timeouts,
+                "restarts": self.restarts,
+            }
+
+    def shutdown(self):
+        with self.lock:
+            pool, self.pool = self.pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+
+def get_pdf_extractor():
+    """Get the process-wide PdfExtractor instance."""
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = PdfExtractor(get_config().PDF_EXTRACTION)
+    return _extractor
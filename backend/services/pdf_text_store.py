@@ -0,0 +1,342 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from backend.config import get_config
+from backend.models.database import pooled_connection
+from backend.models.db_writer import get_db_writer
+from backend.services.pdf_extractor import get_pdf_extractor
+from backend.services.single_flight import SingleFlight
+from backend.services.worker_pool import BoundedExecutor, PoolOverloadedError
+from backend.utils.logger import get_logger
+
+logger = get_logger("pdf_text_store")
+
+# Separator between pages in the document text; page offsets account for it
+PAGE_SEPARATOR = "\n"
+
+# Documents waiting for background extraction after downloads
+EXTRACT_QUEUE_SIZE = 64
+
+# Files whose content hash is memoized
+HASH_CACHE_SIZE = 1024
+
+# Heading text (lowercased, numbering stripped) -> canonical section name
+SECTION_HEADINGS = {
+    "abstract": "abstract",
+    "introduction": "introduction",
+    "related work": "related_work",
+    "background": "related_work",
+    "method": "method",
+    "methods": "method",
+    "methodology": "method",
+    "approach": "method",
+    "our approach": "method",
+    "proposed method": "method",
+    "proposed approach": "method",
+    "experiments": "results",
+    "experiment": "results",
+    "experimental results": "results",
+    "experiments and results": "results",
+    "results": "results",
+    "evaluation": "results",
+    "discussion": "conclusion",
+    "conclusion": "conclusion",
+    "conclusions": "conclusion",
+    "conclusion and future work": "conclusion",
+    "conclusions and future work": "conclusion",
+    "references": "references",
+    "bibliography": "references",
+}
+
+# Optional "3", "3.", "III." numbering followed by a short heading on its own line
+_HEADING_RE = re.compile(r"^\s*(?:(?:\d{1,2}|[IVX]{1,5})\.?\s+)?([A-Za-z][A-Za-z &]{2,40}?)\s*:?\s*$")
+
+_flights = SingleFlight()
+_executor = None
+_executor_lock = threading.Lock()
+
+# (path, size, mtime_ns) -> sha256 LRU, so repeated lookups skip re-hashing
+_hash_cache = OrderedDict()
+_hash_cache_lock = threading.Lock()
+
+
+def file_hash(pdf_path):
+    """SHA-256 of a file's contents, memoized by path, size and mtime (LRU of HASH_CACHE_SIZE)."""
+    st = os.stat(pdf_path)
+    key = (os.path.abspath(pdf_path), st.st_size, st.st_mtime_ns)
+    with _hash_cache_lock:
+        cached = _hash_cache.get(key)
+        if cached:
+            _hash_cache.move_to_end(key)
+            return cached
+
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    value = digest.hexdigest()
+    with _hash_cache_lock:
+        _hash_cache[key] = value
+        while len(_hash_cache) > HASH_CACHE_SIZE:
+            _hash_cache.popitem(last=False)
+    return value
+
+
+def detect_sections(pages):
+    """
+    Find section headings in page texts.
+
+    Args:
+        pages: List of page texts.
+
+    Returns:
+        List of {"name", "heading", "page", "start", "end"} in document order,
+        with character offsets into the page-joined document text. A section
+        ends where the next detected heading starts.
+    """
+    sections = []
+    offset = 0
+    for page_no, text in enumerate(pages):
+        line_start = 0
+        for line in text.split("\n"):
+            match = _HEADING_RE.match(line)
+            if match:
+                heading = re.sub(r"\s+", " ", match.group(1)).strip()
+                name = SECTION_HEADINGS.get(heading.lower())
+                if name:
+                    sections.append({
+                        "name": name,
+                        "heading": heading,
+                        "page": page_no,
+                        "start": offset + line_start,
+                    })
+            line_start += len(line) + 1
+        offset += len(text) + len(PAGE_SEPARATOR)
+
+    total = max(0, offset - len(PAGE_SEPARATOR))
+    for current, following in zip(sections, sections[1:] + [None]):
+        current["end"] = following["start"] if following else total
+    return sections
+
+
+def _build_document(pdf_hash, pages):
+    offsets = []
+    offset = 0
+    for text in pages:
+        offsets.append(offset)
+        offset += len(text) + len(PAGE_SEPARATOR)
+    return {
+        "pdf_hash": pdf_hash,
+        "page_count": len(pages),
+        "char_count": max(0, offset - len(PAGE_SEPARATOR)),
+        "pages": [
+            {"page": i, "offset": offsets[i], "text": text} for i, text in enumerate(pages)
+        ],
+        "sections": detect_sections(pages),
+    }
+
+
+def _load_document(pdf_hash, db_path=None):
+    with pooled_connection(db_path) as conn:
+        row = conn.execute(
+            "SELECT page_count, char_count, sections FROM pdf_documents WHERE pdf_hash = ?",
+            (pdf_hash,),
+        ).fetchone()
+        if row is None:
+            return None
+        pages = conn.execute(
+            "SELECT page_no, char_offset, text FROM pdf_pages WHERE pdf_hash = ? ORDER BY page_no",
+            (pdf_hash,),
+        ).fetchall()
+    return {
+        "pdf_hash": pdf_hash,
+        "page_count": row["page_count"],
+        "char_count": row["char_count"],
+        "pages": [{"page": p["page_no"], "offset": p["char_offset"], "text": p["text"]} for p in pages],
+        "sections": json.loads(row["sections"]),
+    }
+
+
+def _store_document(document, db_path=None):
+    """Persist a document; the summary row is written last so readers never see partial pages."""
+    writer = get_db_writer(db_path)
+    writer.executemany(
+        "INSERT OR REPLACE INTO pdf_pages (pdf_hash, page_no, char_offset, text) VALUES (?, ?, ?, ?)",
+        [(document["pdf_hash"], p["page"], p["offset"], p["text"]) for p in document["pages"]],
+    )
+    writer.execute(
+        "INSERT OR REPLACE INTO pdf_documents (pdf_hash, page_count, char_count, sections) "
+        "VALUES (?, ?, ?, ?)",
+        (
+            document["pdf_hash"], document["page_count"], document["char_count"],
+            json.dumps(document["sections"]),
+        ),
+        wait=True,
+    )
+
+
+def _extract_and_store(pdf_path, pdf_hash, db_path):
+    """Single-flight leader: extract a PDF unless another caller stored it meanwhile."""
+    document = _load_document(pdf_hash, db_path)
+    if document is not None:
+        return document
+    pages = get_pdf_extractor().extract(pdf_path)
+    document = _build_document(pdf_hash, pages)
+    _store_document(document, db_path)
+    logger.info(
+        f"Extracted {document['page_count']} pages, {document['char_count']} chars, "
+        f"{len(document['sections'])} sections: {os.path.basename(pdf_path)}"
+    )
+    return document
+
+
+def get_document(pdf_path, db_path=None):
+    """
+    Get the extracted text of a PDF, extracting and storing it on first use.
+
+    Documents are keyed by content hash, so a re-downloaded copy of the same
+    file reuses the stored text. Concurrent callers for the same file (for
+    example an analysis request racing the post-download extraction) share
+    a single extraction.
+
+    Args:
+        pdf_path: Path to the PDF file.
+        db_path: Database path; defaults to config.DATABASE_PATH.
+
+    Returns:
+        {"pdf_hash", "page_count", "char_count", "pages": [{"page", "offset", "text"}],
+        "sections": [...]} (see detect_sections), or None if the file is
+        missing or cannot be parsed.
+    """
+    if not os.path.exists(pdf_path):
+        logger.error(f"PDF file not found: {pdf_path}")
+        return None
+    pdf_hash = file_hash(pdf_path)
+    document = _load_document(pdf_hash, db_path)
+    if document is not None:
+        return document
+    try:
+        return _flights.do(pdf_hash, _extract_and_store, pdf_path, pdf_hash, db_path)
+    except Exception as e:
+        logger.error(f"PDF text extraction failed: {pdf_path}: {e}")
+        return None
+
+
+def document_text(document, max_chars=None):
+    """Join a document's pages into one string, optionally truncated."""
+    text = PAGE_SEPARATOR.join(p["text"] for p in document["pages"])
+    return text[:max_chars] if max_chars else text
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # Each thread just waits on the extraction process pool
+                workers = get_config().PDF_EXTRACTION.get("background_workers", 2)
+                _executor = BoundedExecutor(workers, EXTRACT_QUEUE_SIZE, name="pdf-extract")
+    return _executor
+
+
+def schedule_extraction(pdf_path, db_path=None):
+    """
+    Extract and store a PDF's text in the background.
+
+    Called after a download completes so later analyses find the text ready.
+    When the extraction queue is full the PDF is skipped; it is then
+    extracted on first use instead.
+
+    Returns:
+        True if the extraction was queued.
+    """
+    try:
+        _get_executor().submit(get_document, pdf_path, db_path)
+        return True
+    except PoolOverloadedError:
+        logger.warning(f"Extraction queue full, deferring: {os.path.basename(pdf_path)}")
+        return False
+
+
+def _split_span(text, start, end, max_chars):
+    """Cut [start, end) into even pieces of at most max_chars, preferring line breaks."""
+    pieces = []
+    while end - start > max_chars:
+        count = -(-(end - start) // max_chars)
+        target = start + -(-(end - start) // count)
+        cut = text.rfind("\n", start + (target - start) // 2, target)
+        cut = cut + 1 if cut != -1 else target
+        pieces.append((start, cut))
+        start = cut
+    pieces.append((start, end))
+    return pieces
+
+
+def section_chunks(document, max_chars, skip=("references",), max_chunks=None):
+    """
+    Split a document into chunks that follow its section boundaries.
+
+    Each detected section (plus any text before the first heading, named
+    "front", or the whole text as "body" when no headings were found) is cut
+    into pieces of at most max_chars. Adjacent short pieces are merged while
+    they fit, so small sections like the abstract do not cost a call each.
+
+    Args:
+        document: Document from get_document.
+        max_chars: Maximum characters per chunk.
+        skip: Section names to leave out.
+        max_chunks: Optional cap on the number of chunks; beyond it the
+            smallest adjacent pairs are merged, even past max_chars.
+
+    Returns:
+        List of {"sections": [names], "headings": [str], "start", "end", "text"}
+        in document order.
+    """
+    text = document_text(document)
+    sections = document["sections"]
+    first_name = "front" if sections else "body"
+    bounds = [(0, first_name, "")] + [(s["start"], s["name"], s["heading"]) for s in sections]
+
+    pieces = []
+    for (start, name, heading), following in zip(bounds, bounds[1:] + [(len(text), None, None)]):
+        end = following[0]
+        if name in skip or not text[start:end].strip():
+            continue
+        for piece_start, piece_end in _split_span(text, start, end, max_chars):
+            pieces.append((piece_start, piece_end, name, heading))
+
+    chunks = []
+    for start, end, name, heading in pieces:
+        last = chunks[-1] if chunks else None
+        if last and last["end"] == start and end - last["start"] <= max_chars:
+            last["end"] = end
+            if name not in last["sections"]:
+                last["sections"].append(name)
+            if heading:
+                last["headings"].append(heading)
+            continue
+        chunks.append({
+            "sections": [name],
+            "headings": [heading] if heading else [],
+            "start": start,
+            "end": end,
+        })
+    for chunk in chunks:
+        chunk["text"] = text[chunk["start"]:chunk["end"]]
+
+    while max_chunks and len(chunks) > max(1, max_chunks):
+        i = min(range(len(chunks) - 1), key=lambda i: len(chunks[i]["text"]) + len(chunks[i + 1]["text"]))
+        first, second = chunks[i], chunks.pop(i + 1)
+        if first["end"] == second["start"]:
+            first["text"] = text[first["start"]:second["end"]]
+        else:
+            # Pieces either side of a skipped section are not contiguous
+            first["text"] += PAGE_SEPARATOR + second["text"]
+        first["end"] = second["end"]
+        first["sections"] += [name for name in second["sections"] if name not in first["sections"]]
+        first["headings"] += second["headings"]
+    return chunks
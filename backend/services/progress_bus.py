@@ -0,0 +1,116 @@
+import threading
+from collections import OrderedDict
+
+FINAL_STATUSES = ("completed", "failed")
+
+
+class Subscription:
+    """
+    One subscriber's pending updates.
+
+    Only the latest state per download is kept, so a slow client receives
+    the newest progress instead of a backlog of stale ticks.
+    """
+
+    def __init__(self, ids=None):
+        self.ids = set(ids) if ids else None
+        self.pending = OrderedDict()
+        self.cond = threading.Condition()
+
+    def wants(self, record_id):
+        return self.ids is None or record_id in self.ids
+
+    def push(self, state):
+        with self.cond:
+            self.pending.pop(state["id"], None)
+            self.pending[state["id"]] = state
+            self.cond.notify()
+
+    def get(self, timeout=None):
+        """
+        Wait for updates.
+
+        Returns:
+            List of state dicts (oldest first), empty on timeout.
+        """
+        with self.cond:
+            if not self.pending:
+                self.cond.wait(timeout)
+            updates = list(self.pending.values())
+            self.pending.clear()
+            return updates
+
+
+class ProgressBus:
+    """In-process publish/subscribe hub for download progress."""
+
+    def __init__(self, max_retained=1000):
+        """
+        Args:
+            max_retained: Maximum finished downloads whose last state is kept
+                for late subscribers.
+        """
+        self.max_retained = max_retained
+        self.states = OrderedDict()
+        self.subscribers = set()
+        self.lock = threading.Lock()
+
+    def publish(self, record_id, status, **fields):
+        """Record the latest state of a download and fan it out to subscribers."""
+        state = dict(fields, id=record_id, status=status)
+        with self.lock:
+            self.states.pop(record_id, None)
+            self.states[record_id] = state
+            if status in FINAL_STATUSES:
+                self._trim()
+            subscribers = [sub for sub in self.subscribers if sub.wants(record_id)]
+        for sub in subscribers:
+            sub.push(state)
+
+    def _trim(self):
+        """Drop the oldest finished states beyond max_retained. Must be called within lock."""
+        finished = [rid for rid, s in self.states.items() if s["status"] in FINAL_STATUSES]
+        for rid in finished[:max(0, len(finished) - self.max_retained)]:
+            del self.states[rid]
+
+    def get_state(self, record_id):
+        """Latest published state for a download, or None."""
+        with self.lock:
+            return self.states.get(record_id)
+
+    def subscribe(self, ids=None):
+        """
+        Register a subscriber for the given download IDs (all downloads if None).
+
+        Returns:
+            (subscription, snapshot) where snapshot holds the current state of
+            every matching download the bus knows about.
+        """
+        sub = Subscription(ids)
+        with self.lock:
+            self.subscribers.add(sub)
+            snapshot = [s for rid, s in self.states.items() if sub.wants(rid)]
+        return sub, snapshot
+
+    def unsubscribe(self, sub):
+        with self.lock:
+            self.subscribers.discard(sub)
+
+    def stats(self):
+        with self.lock:
+            active = sum(1 for s in self.states.values() if s["status"] not in FINAL_STATUSES)
+            downloading = sum(1 for s in self.states.values() if s["status"] == "downloading")
+            return {
+                "subscribers": len(self.subscribers),
+                "active": active,
+                "downloading": downloading,
+                "retained": len(self.states),
+            }
+
+
+_bus = ProgressBus()
+
+
+def get_progress_bus():
+    """Get the process-wide download progress bus."""
+    return _bus
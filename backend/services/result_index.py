@@ -0,0 +1,137 @@
+import json
+import re
+import threading
+from datetime import datetime
+
+from backend.models.database import get_connection
+from backend.models.db_writer import get_db_writer
+from backend.utils.logger import get_logger
+
+logger = get_logger("result_index")
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+# None until probed; False when SQLite lacks FTS5 (indexing and lookups become no-ops)
+_fts_available = None
+_fts_lock = threading.Lock()
+
+
+def _is_available():
+    """Probe once whether the FTS5 index tables exist."""
+    global _fts_available
+    if _fts_available is None:
+        with _fts_lock:
+            if _fts_available is None:
+                try:
+                    with get_connection() as conn:
+                        conn.execute("SELECT rowid FROM result_fts LIMIT 0")
+                    _fts_available = True
+                except Exception as e:
+                    logger.warning(f"Local result index unavailable: {e}")
+                    _fts_available = False
+    return _fts_available
+
+
+def _fts_query(query):
+    """Build an FTS5 MATCH expression requiring every query term (terms are quoted)."""
+    terms = _TERM_RE.findall(query)
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def index_results(results):
+    """
+    Add or refresh search results in the local full-text index.
+
+    Results are keyed by URL; re-indexing a URL replaces its stored fields.
+    The write is queued on the database writer thread.
+
+    Returns:
+        Number of results queued.
+    """
+    if not _is_available():
+        return 0
+    now = datetime.utcnow().isoformat()
+    rows = [
+        (
+            item["url"],
+            item.get("title", ""),
+            item.get("snippet", ""),
+            item.get("authors", "") or "",
+            item.get("category", "") or "",
+            item.get("source", "") or "",
+            str(item.get("published", "") or ""),
+            json.dumps(item.get("extra") or {}, ensure_ascii=False),
+            now,
+        )
+        for item in results if item.get("url")
+    ]
+    if not rows:
+        return 0
+    get_db_writer().executemany(
+        "INSERT INTO result_index "
+        "(url, title, snippet, authors, category, source, published, extra, fetched_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(url) DO UPDATE SET title = excluded.title, "
+        "snippet = excluded.snippet, authors = excluded.authors, "
+        "category = excluded.category, source = excluded.source, "
+        "published = excluded.published, extra = excluded.extra, "
+        "fetched_at = excluded.fetched_at",
+        rows,
+    )
+    logger.debug(f"Queued {len(rows)} results for indexing")
+    return len(rows)
+
+
+def search_local(query, sources=None, limit=50):
+    """
+    Full-text search over every result fetched so far, ranked by BM25.
+
+    Titles weigh more than authors, which weigh more than snippets.
+
+    Args:
+        query: Search keyword string; all terms must match.
+        sources: Optional list of source names to restrict to.
+        limit: Maximum number of results.
+
+    Returns:
+        List of result dicts (title, url, snippet, authors, published,
+        source, category, extra) best match first.
+    """
+    if not _is_available():
+        return []
+    match = _fts_query(query)
+    if not match:
+        return []
+
+    sql = (
+        "SELECT r.title, r.url, r.snippet, r.authors, r.published, r.source, r.category, r.extra "
+        "FROM result_fts JOIN result_index r ON r.id = result_fts.rowid "
+        "WHERE result_fts MATCH ?"
+    )
+    params = [match]
+    if sources:
+        sql += f" AND r.source IN ({','.join('?' * len(sources))})"
+        params.extend(sources)
+    sql += " ORDER BY bm25(result_fts, 10.0, 1.0, 3.0) LIMIT ?"
+    params.append(limit)
+
+    with get_connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+    results = []
+    for row in rows:
+        item = dict(row)
+        item["extra"] = json.loads(item["extra"] or "{}")
+        results.append(item)
+    return results
+
+
+def get_index_stats():
+    """Number of indexed results per source."""
+    if not _is_available():
+        return {"available": False}
+    with get_connection() as conn:
+        rows = conn.execute(
+            "SELECT source, COUNT(*) AS count FROM result_index GROUP BY source"
+        ).fetchall()
+    by_source = {row["source"]: row["count"] for row in rows}
+    return {"available": True, "total": sum(by_source.values()), "by_source": by_source}
@@ -5,8 +5,11 @@ import json
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
 from backend.models.database import get_connection
-from backend.services import cache_service
+from backend.models.db_writer import get_db_writer
+from backend.services import cache_service, result_index
 from backend.services.classification_service import classify
+from backend.services.arxiv_fetcher import get_arxiv_fetcher
+from backend.services.single_flight import SingleFlight
 from backend.config import get_config
 from backend.utils.logger import get_logger
 
@@ -15,10 +18,14 @@ logger = get_logger("search_service")
 # Lazy-initialized agents
 _search_agent = None
 _analysis_agent = None
+_relevance_prefilter = None
 
 # Default relevance threshold (0-100)
 DEFAULT_RELEVANCE_THRESHOLD = 40
 
+# Coalesces identical concurrent searches, keyed by search cache key
+_search_flights = SingleFlight()
+
 
 def _get_search_agent():
     global _search_agent
@@ -38,17 +45,38 @@ def _get_analysis_agent():
     return _analysis_agent
 
 
-def _apply_semantic_filter(query, results, threshold=DEFAULT_RELEVANCE_THRESHOLD):
+def _get_relevance_prefilter():
+    """Local relevance pre-filter, or None if disabled in config or NumPy is missing."""
+    global _relevance_prefilter
+    if _relevance_prefilter is None:
+        settings = get_config().RELEVANCE_PREFILTER
+        if not settings.get("enabled", True):
+            return None
+        try:
+            from backend.services.local_relevance import LocalRelevanceScorer
+        except ImportError as e:
+            logger.warning(f"Local relevance pre-filter unavailable: {e}")
+            return None
+        _relevance_prefilter = LocalRelevanceScorer(settings)
+    return _relevance_prefilter
+
+
+def _apply_semantic_filter(query, results):
     """
-    Apply AI-driven semantic relevance filtering to search results.
+    Score search results for semantic relevance and sort them by score.
+
+    Scores already stored for (query, URL, content) are reused. The local
+    pre-filter then decides clearly relevant and clearly irrelevant results;
+    only the uncertain rest is sent to the LLM, and those scores are stored.
+    No threshold is applied here, see :func:`_apply_threshold`.
 
     Args:
         query: Original search query.
         results: List of search result dicts.
-        threshold: Minimum relevance score (0-100) to keep a result.
 
     Returns:
-        Filtered list of results sorted by relevance score.
+        Results with 'relevance_score' sorted by relevance score, or the
+        input unchanged if scoring is disabled or fails.
     """
     if not results:
         return results
@@ -59,25 +87,73 @@ def _apply_semantic_filter(query, results, threshold=DEFAULT_RELEVANCE_THRESHOLD
         return results
 
     try:
-        agent = _get_analysis_agent()
-        scored_results = agent.evaluate_relevance_batch(query, results)
+        scores = cache_service.get_relevance_scores(query, results)
+        missing = [idx for idx in range(len(results)) if idx not in scores]
+        stored_count = len(results) - len(missing)
+
+        uncertain = missing
+        prefilter = _get_relevance_prefilter()
+        if missing and prefilter is not None:
+            local_scores = prefilter.score(query, [results[idx] for idx in missing])
+            scores.update({missing[j]: score for j, score in local_scores.items()})
+            uncertain = [idx for idx in missing if idx not in scores]
+
+        if missing:
+            agent = _get_analysis_agent()
+            if len(uncertain) < len(missing) and agent.client:
+                prefilter.record_saved_calls(
+                    agent.estimate_relevance_calls(query, [results[idx] for idx in missing])
+                    - agent.estimate_relevance_calls(query, [results[idx] for idx in uncertain])
+                )
+            new_scores = agent.score_relevance(query, [results[idx] for idx in uncertain])
+            fresh = {uncertain[j]: score for j, score in new_scores.items()}
+            cache_service.set_relevance_scores(
+                query, [(results[idx], score) for idx, score in fresh.items()]
+            )
+            scores.update(fresh)
 
-        # Filter by threshold and sort by relevance
-        filtered = [r for r in scored_results if r.get("relevance_score", 0) >= threshold]
-        filtered.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
+        scored_results = []
+        for idx, item in enumerate(results):
+            scored_item = dict(item)
+            scored_item["relevance_score"] = scores.get(idx, 50)  # Default to 50 if not scored
+            scored_results.append(scored_item)
+        scored_results.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
 
         logger.info(
-            f"Semantic filter: {len(results)} -> {len(filtered)} results "
-            f"(threshold={threshold})"
+            f"Semantic scoring: {len(results)} results, {stored_count} from stored scores, "
+            f"{len(missing) - len(uncertain)} decided locally, {len(uncertain)} sent to LLM"
         )
 
-        return filtered
+        return scored_results
 
     except Exception as e:
         logger.warning(f"Semantic filter failed, returning unfiltered results: {e}")
         return results
 
 
+def _apply_threshold(result, filters):
+    """
+    Apply the relevance threshold to a scored (cached or fresh) search result.
+
+    Returns a new result dict; the input is left untouched since cached
+    values are shared. Results without a score are kept.
+    """
+    if not filters.get("semantic_filter", True):
+        return result
+    threshold = filters.get("relevance_threshold", DEFAULT_RELEVANCE_THRESHOLD)
+    kept = [
+        item for item in result.get("results", [])
+        if item.get("relevance_score", threshold) >= threshold
+    ]
+    return dict(result, results=kept, total=len(kept))
+
+
+def _search_cache_key(query, sources, filters):
+    """Search cache key; the relevance threshold is left out since it is applied on read."""
+    key_filters = {k: v for k, v in filters.items() if k != "relevance_threshold"}
+    return cache_service.make_search_cache_key(query, sources, key_filters)
+
+
 def search(query, sources=None, filters=None):
     """
     Execute multi-source search with caching, classification and semantic filtering.
@@ -95,51 +171,173 @@ def search(query, sources=None, filters=None):
     sources = sources or config.SEARCH_DEFAULTS.get("default_sources", ["duckduckgo", "arxiv"])
     filters = filters or {}
 
-    # Extract semantic filter settings from filters
-    enable_semantic = filters.get("semantic_filter", True)
-    relevance_threshold = filters.get("relevance_threshold", DEFAULT_RELEVANCE_THRESHOLD)
-
-    # Check cache (includes semantic filter in key)
-    cache_key = cache_service.make_search_cache_key(query, sources, filters)
+    # Check cache (includes semantic filter in key, threshold applied on read)
+    cache_key = _search_cache_key(query, sources, filters)
     cached = cache_service.get_search_cache(cache_key)
     if cached:
         logger.info(f"Cache hit for query='{query}'")
+        return _apply_threshold(cached, filters)
+
+    # Only one execution per cache key; concurrent callers share its result
+    result = _search_flights.do(cache_key, _execute_search, query, sources, filters, cache_key)
+    return _apply_threshold(result, filters)
+
+
+def _execute_search(query, sources, filters, cache_key):
+    """Run the upstream search for a cache miss (single-flight leader only)."""
+    # A flight for the same key may have completed since the caller's cache check
+    cached = cache_service.get_search_cache(cache_key)
+    if cached:
         return cached
 
-    # Execute search
     agent = _get_search_agent()
     result = agent.search_all_sources(query, sources, filters)
 
+    return _finalize_search(query, filters, cache_key, result)
+
+
+def _finalize_search(query, filters, cache_key, result):
+    """
+    Classify, score, cache and record a raw agent result.
+
+    Returns the cached form (all scored results, before the threshold).
+    """
+    enable_semantic = filters.get("semantic_filter", True)
+
     # Classify each result
     for item in result.get("results", []):
         item["category"] = classify(item.get("url", ""), item.get("source", ""))
 
-    # Apply semantic filtering if enabled
+    # Score results if semantic filtering is enabled
     if enable_semantic and result.get("results"):
-        result["results"] = _apply_semantic_filter(
-            query, result["results"], threshold=relevance_threshold
-        )
+        result["results"] = _apply_semantic_filter(query, result["results"])
         result["total"] = len(result["results"])
 
+    return _store_search(query, filters, cache_key, result)
+
+
+def _store_search(query, filters, cache_key, result):
+    """Write a finished (unthresholded) search result to the cache and search history."""
+    config = get_config()
+
     # Store in cache
     ttl = config.SEARCH_DEFAULTS.get("cache_expire_hours", 24)
     cache_service.set_search_cache(cache_key, result, ttl_hours=ttl)
 
+    # Keep every fetched result searchable locally after the cache expires
+    try:
+        result_index.index_results(result.get("results", []))
+    except Exception as e:
+        logger.warning(f"Failed to index search results: {e}")
+
     # Save search history
-    _save_history(query, filters, result.get("total", 0))
+    total = _apply_threshold(result, filters)["total"]
+    _save_history(query, filters, total)
 
-    logger.info(f"Search completed: query='{query}', total={result.get('total', 0)}")
+    logger.info(f"Search completed: query='{query}', total={total}")
     return result
 
 
-def search_multiple(queries, sources=None, filters=None):
+def _search_local(query, sources, filters):
+    """
+    Answer a query from the local result index.
+
+    Applies the time range filter, attaches stored relevance scores and the
+    relevance threshold; results keep their BM25 order.
+
+    Returns:
+        {"results": [...], "total": int, "sources_status": {src: "local"}}
+    """
+    config = get_config()
+    limit = config.SEARCH_DEFAULTS.get("max_results_per_source", 15) * len(sources)
+    items = result_index.search_local(query, sources, limit=limit)
+    items = _get_search_agent().dedupe_and_filter(items, filters)
+
+    if filters.get("semantic_filter", True) and items:
+        scores = cache_service.get_relevance_scores(query, items)
+        for idx, score in scores.items():
+            items[idx]["relevance_score"] = score
+
+    result = {
+        "results": items,
+        "total": len(items),
+        "sources_status": {src: "local" for src in sources},
+    }
+    return _apply_threshold(result, filters)
+
+
+def _search_concurrent(queries, sources, filters):
+    """
+    Search several queries through a single (query, source) fan-out.
+
+    Cached queries are answered from the cache and queries already being
+    searched by another request wait for that result; the remaining ones
+    share one fan-out and one deadline in the search agent.
+
+    Returns:
+        List of per-query results in the same order as ``queries``.
     """
-    Execute search for multiple keywords independently and merge results.
+    results = {}
+    cache_keys = {}
+    pending = []
+    for query in queries:
+        if query in cache_keys:
+            continue
+        cache_keys[query] = _search_cache_key(query, sources, filters)
+        cached = cache_service.get_search_cache(cache_keys[query])
+        if cached:
+            logger.info(f"Cache hit for query='{query}'")
+            results[query] = cached
+        else:
+            pending.append(query)
+
+    # Join identical searches already running elsewhere; lead the rest
+    leaders = {}
+    followers = {}
+    for query in pending:
+        call, leader = _search_flights.acquire(cache_keys[query])
+        if leader:
+            leaders[query] = call
+        else:
+            followers[query] = call
+
+    if leaders:
+        try:
+            agent = _get_search_agent()
+            raw_results = agent.search_queries(list(leaders), sources, filters)
+            for query, call in leaders.items():
+                results[query] = _finalize_search(
+                    query, filters, cache_keys[query], raw_results[query]
+                )
+                _search_flights.complete(cache_keys[query], call, result=results[query])
+        except BaseException as e:
+            for query, call in leaders.items():
+                if not call.event.is_set():
+                    _search_flights.complete(cache_keys[query], call, error=e)
+            raise
+
+    for query, call in followers.items():
+        results[query] = _search_flights.wait(call)
+
+    return [_apply_threshold(results[query], filters) for query in queries]
+
+
+def search_multiple(queries, sources=None, filters=None, mode=None):
+    """
+    Execute search for multiple keywords and merge results.
+
+    With ``concurrent_queries`` enabled (default), all uncached (query, source)
+    pairs run in one shared fan-out; otherwise queries are searched one by one.
+    The merge keeps query order, then source order, before URL deduplication.
 
     Args:
         queries: List of search keyword strings.
         sources: List of source names. Defaults to config defaults.
         filters: Optional filter dict.
+        mode: "online" (always search upstream), "local_first" (answer from
+              the local index when it has at least ``local_min_results``
+              results, else go upstream) or "offline" (local index only).
+              Defaults to ``search_mode`` in config.
 
     Returns:
         {"results": [...], "total": int, "sources_status": {...}}
@@ -152,21 +350,40 @@ def search_multiple(queries, sources=None, filters=None):
     all_results = []
     merged_status = {}
 
-    for query in queries:
-        result = search(query, sources, filters)
-        
+    mode = mode or config.SEARCH_DEFAULTS.get("search_mode", "online")
+    local_min_results = config.SEARCH_DEFAULTS.get("local_min_results", 10)
+
+    local_results = {}
+    if mode in ("local_first", "offline"):
+        for query in queries:
+            local = _search_local(query, sources, filters)
+            if mode == "offline" or local["total"] >= local_min_results:
+                local_results[query] = local
+            else:
+                logger.info(
+                    f"Local recall too low for query='{query}' "
+                    f"({local['total']} < {local_min_results}), searching upstream"
+                )
+    upstream_queries = [query for query in queries if query not in local_results]
+
+    # Fan out all (query, source) pairs at once unless disabled in config
+    if len(upstream_queries) > 1 and config.SEARCH_DEFAULTS.get("concurrent_queries", True):
+        fetched = _search_concurrent(upstream_queries, sources, filters)
+    else:
+        fetched = [search(query, sources, filters) for query in upstream_queries]
+    fetched = dict(zip(upstream_queries, fetched))
+    query_results = [
+        local_results[query] if query in local_results else fetched[query] for query in queries
+    ]
+
+    for result in query_results:
         # Filter results by selected sources
         for item in result.get("results", []):
             item_source = item.get("source", "")
             if item_source in sources_set:
                 all_results.append(item)
         
-        # Merge sources_status (keep worst status per source)
-        for src, status in result.get("sources_status", {}).items():
-            if src not in merged_status:
-                merged_status[src] = status
-            elif merged_status[src] == "success" and status != "success":
-                merged_status[src] = status
+        _merge_sources_status(merged_status, result.get("sources_status", {}))
 
     # Deduplicate by URL
     seen_urls = set()
@@ -177,7 +394,10 @@ def search_multiple(queries, sources=None, filters=None):
             seen_urls.add(url)
             unique_results.append(item)
 
-    logger.info(f"Multi-query search: queries={queries}, merged_total={len(unique_results)}")
+    logger.info(
+        f"Multi-query search: queries={queries}, mode={mode}, "
+        f"local={len(local_results)}, merged_total={len(unique_results)}"
+    )
     
     return {
         "results": unique_results,
@@ -186,14 +406,174 @@ def search_multiple(queries, sources=None, filters=None):
     }
 
 
+def search_stream(queries, sources=None, filters=None, mode=None):
+    """
+    Streaming variant of :func:`search_multiple`.
+
+    Queries are searched one after another; within a query each source's
+    classified results are emitted as soon as that source finishes, followed
+    by the relevance scores once semantic filtering has run. ``mode`` is
+    handled as in :func:`search_multiple`, and a query already being searched
+    by another request waits for that result instead of searching again;
+    local, cached and shared results are emitted per source in one go.
+
+    Args:
+        queries: List of search keyword strings.
+        sources: List of source names. Defaults to config defaults.
+        filters: Optional filter dict.
+        mode: "online", "local_first" or "offline", see :func:`search_multiple`.
+
+    Yields:
+        (event, data) tuples:
+            ("source", {"query", "source", "status", "results"})
+            ("relevance", {"query", "threshold", "scores": {url: score}, "order": [url]})
+            ("done", {"total": int, "sources_status": {...}})
+    """
+    config = get_config()
+    sources = sources or config.SEARCH_DEFAULTS.get("default_sources", ["duckduckgo", "arxiv"])
+    filters = filters or {}
+    sources_set = set(sources)
+    enable_semantic = filters.get("semantic_filter", True)
+    relevance_threshold = filters.get("relevance_threshold", DEFAULT_RELEVANCE_THRESHOLD)
+    mode = mode or config.SEARCH_DEFAULTS.get("search_mode", "online")
+    local_min_results = config.SEARCH_DEFAULTS.get("local_min_results", 10)
+
+    merged_status = {}
+    kept_urls = []
+    sent_urls = set()
+
+    def _unsent(items):
+        fresh = []
+        for item in items:
+            url = item.get("url", "")
+            if url and url not in sent_urls and item.get("source", "") in sources_set:
+                sent_urls.add(url)
+                fresh.append(item)
+        return fresh
+
+    def _replay(query, result):
+        """Emit a finished (thresholded) result as per-source events."""
+        results = result.get("results", [])
+        for src, status in result.get("sources_status", {}).items():
+            items = [item for item in results if item.get("source") == src]
+            yield "source", {
+                "query": query, "source": src, "status": status,
+                "results": _unsent(items),
+            }
+        yield "relevance", _relevance_event(query, relevance_threshold, results)
+        kept_urls.extend(item.get("url") for item in results)
+        _merge_sources_status(merged_status, result.get("sources_status", {}))
+
+    for query in queries:
+        if mode in ("local_first", "offline"):
+            local = _search_local(query, sources, filters)
+            if mode == "offline" or local["total"] >= local_min_results:
+                yield from _replay(query, local)
+                continue
+            logger.info(
+                f"Local recall too low for query='{query}' "
+                f"({local['total']} < {local_min_results}), searching upstream"
+            )
+
+        cache_key = _search_cache_key(query, sources, filters)
+        cached = cache_service.get_search_cache(cache_key)
+        if cached:
+            logger.info(f"Cache hit for query='{query}' (stream)")
+            yield from _replay(query, _apply_threshold(cached, filters))
+            continue
+
+        # Join an identical search already running elsewhere instead of repeating it
+        call, leader = _search_flights.acquire(cache_key)
+        if not leader:
+            logger.info(f"Joined in-flight search for query='{query}' (stream)")
+            yield from _replay(query, _apply_threshold(_search_flights.wait(call), filters))
+            continue
+
+        try:
+            agent = _get_search_agent()
+            query_results = []
+            query_status = {}
+            for src, status, results in agent.iter_source_results(query, sources, filters):
+                query_status[src] = status
+                results = agent.dedupe_and_filter(results, filters)
+                for item in results:
+                    item["category"] = classify(item.get("url", ""), item.get("source", ""))
+                query_results.extend(results)
+                yield "source", {
+                    "query": query, "source": src, "status": status,
+                    "results": _unsent(results),
+                }
+
+            result = {
+                "results": agent.dedupe_and_filter(query_results, {}),
+                "sources_status": query_status,
+            }
+            if enable_semantic and result["results"]:
+                result["results"] = _apply_semantic_filter(query, result["results"])
+            result["total"] = len(result["results"])
+            _store_search(query, filters, cache_key, result)
+        except BaseException as e:
+            # Includes GeneratorExit when the client disconnects mid-stream
+            _search_flights.complete(cache_key, call, error=e)
+            raise
+        _search_flights.complete(cache_key, call, result=result)
+
+        result = _apply_threshold(result, filters)
+        yield "relevance", _relevance_event(query, relevance_threshold, result["results"])
+        kept_urls.extend(item.get("url") for item in result["results"])
+        _merge_sources_status(merged_status, query_status)
+
+    total = len(set(url for url in kept_urls if url and url in sent_urls))
+    logger.info(f"Streamed search: queries={queries}, mode={mode}, merged_total={total}")
+    yield "done", {"total": total, "sources_status": merged_status}
+
+
+def _relevance_event(query, threshold, results):
+    """Build the relevance event payload for a query's final result list."""
+    return {
+        "query": query,
+        "threshold": threshold,
+        "scores": {
+            item.get("url"): item["relevance_score"]
+            for item in results if "relevance_score" in item
+        },
+        "order": [item.get("url") for item in results],
+    }
+
+
+def _merge_sources_status(merged_status, sources_status):
+    """Merge per-query sources_status into merged_status, keeping the worst status."""
+    for src, status in sources_status.items():
+        if src not in merged_status:
+            merged_status[src] = status
+        elif merged_status[src] == "success" and status != "success":
+            merged_status[src] = status
+
+
+def get_agent_stats():
+    """Return search runtime metrics (worker pools, HTTP reuse, arXiv pages, cache tiers)."""
+    agent = _get_search_agent()
+    prefilter = _get_relevance_prefilter()
+    return {
+        "worker_pools": agent.pools.stats(),
+        "http": agent.http.stats(),
+        "arxiv": get_arxiv_fetcher().stats(),
+        "single_flight": _search_flights.stats(),
+        "relevance_prefilter": prefilter.stats() if prefilter is not None else None,
+        "cache": cache_service.get_cache_stats(),
+        "result_index": result_index.get_index_stats(),
+        "db_writer": get_db_writer().stats(),
+    }
+
+
 def _save_history(query, filters, result_count):
-    """Save search query to history."""
+    """Save search query to history (committed before returning, so the next history read sees it)."""
     try:
-        with get_connection() as conn:
-            conn.execute(
-                "INSERT INTO search_history (query, filters, result_count) VALUES (?, ?, ?)",
-                (query, json.dumps(filters, ensure_ascii=False), result_count),
-            )
+        get_db_writer().execute(
+            "INSERT INTO search_history (query, filters, result_count) VALUES (?, ?, ?)",
+            (query, json.dumps(filters, ensure_ascii=False), result_count),
+            wait=True,
+        )
     except Exception as e:
         logger.warning(f"Failed to save search history: {e}")
 
@@ -211,6 +591,5 @@ def get_search_history(limit=20):
 
 def clear_search_history():
     """Delete all search history."""
-    with get_connection() as conn:
-        conn.execute("DELETE FROM search_history")
+    get_db_writer().execute("DELETE FROM search_history", wait=True)
     logger.info("Search history cleared")
@@ -0,0 +1,82 @@
+import threading
+
+
+class _Call:
+    """An in-flight call that followers can wait on."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Thread-safe duplicate call suppression keyed by an arbitrary hashable key."""
+
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) unless an identical call is already running.
+
+        Concurrent callers with the same key block until the first caller
+        finishes and then receive its return value (or its exception).
+        """
+        call, leader = self.acquire(key)
+        if not leader:
+            return self.wait(call)
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self.complete(key, call, error=e)
+            raise
+        self.complete(key, call, result=result)
+        return result
+
+    def acquire(self, key):
+        """
+        Join the in-flight call for key, or register a new one.
+
+        Returns:
+            (call, leader). The leader must eventually call complete();
+            followers pass the call to wait().
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                return call, False
+            call = _Call()
+            self.calls[key] = call
+            self.executed += 1
+            return call, True
+
+    def wait(self, call):
+        """Block until the leader completes call; return its result or raise its error."""
+        call.event.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def complete(self, key, call, result=None, error=None):
+        """Publish the leader's outcome to all waiting followers."""
+        call.result = result
+        call.error = error
+        with self.lock:
+            if self.calls.get(key) is call:
+                del self.calls[key]
+        call.event.set()
+
+    def stats(self):
+        """Return executed/coalesced call counts."""
+        with self.lock:
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self.calls),
+            }
@@ -0,0 +1,108 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PoolOverloadedError(Exception):
+    """Raised when a bounded executor has no free worker or queue slot."""
+
+
+class BoundedExecutor:
+    """Long-lived thread pool with a hard limit on queued work."""
+
+    def __init__(self, max_workers, queue_size, name="pool"):
+        """
+        Args:
+            max_workers: Number of worker threads.
+            queue_size: Maximum tasks waiting for a free worker.
+            name: Thread name prefix.
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.slots = threading.BoundedSemaphore(max_workers + queue_size)
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def _release(self, _future):
+        with self.lock:
+            self.in_flight -= 1
+        self.slots.release()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Submit a task without blocking.
+
+        Raises:
+            PoolOverloadedError: If all workers are busy and the queue is full.
+        """
+        if not self.slots.acquire(blocking=False):
+            raise PoolOverloadedError(f"Worker pool '{self.name}' is overloaded")
+        try:
+            future = self.executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self.slots.release()
+            raise
+        with self.lock:
+            self.in_flight += 1
+        future.add_done_callback(self._release)
+        return future
+
+    def stats(self):
+        """Return current pool occupancy."""
+        with self.lock:
+            in_flight = self.in_flight
+        return {
+            "max_workers": self.max_workers,
+            "queue_size": self.queue_size,
+            "in_flight": in_flight,
+        }
+
+    def shutdown(self, wait=False):
+        self.executor.shutdown(wait=wait)
+
+
+class WorkerPools:
+    """Manages one bounded executor per source."""
+
+    DEFAULT_POOL = {"max_workers": 4, "queue_size": 16}
+
+    def __init__(self, config=None):
+        config = config or {}
+        self.default = dict(self.DEFAULT_POOL, **config.get("default", {}))
+        self.config = config
+        self.pools = {}
+        self.lock = threading.Lock()
+
+    def get(self, name):
+        """Get or lazily create the executor for the given source."""
+        pool = self.pools.get(name)
+        if pool is None:
+            with self.lock:
+                pool = self.pools.get(name)
+                if pool is None:
+                    params = dict(self.default, **self.config.get(name, {}))
+                    pool = BoundedExecutor(
+                        max_workers=params["max_workers"],
+                        queue_size=params["queue_size"],
+                        name=f"{name}-pool",
+                    )
+                    self.pools[name] = pool
+        return pool
+
+    def submit(self, name, fn, *args, **kwargs):
+        """
+        Submit a task to the named pool.
+
+        Raises:
+            PoolOverloadedError: If that pool is saturated.
+        """
+        return self.get(name).submit(fn, *args, **kwargs)
+
+    def stats(self):
+        """Return occupancy for every pool created so far."""
+        return {name: pool.stats() for name, pool in list(self.pools.items())}
+
+    def shutdown(self, wait=False):
+        for pool in list(self.pools.values()):
+            pool.shutdown(wait=wait)
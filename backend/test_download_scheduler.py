@@ -0,0 +1,98 @@
+"""Download scheduler tests: a bulk leader and an interactive follower of the same paper."""
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".qoder"))
+
+from backend.models.schemas import SCHEMA_SQL
+from skills import pdf_download_skill
+from skills.pdf_download_skill import PRIORITY_BULK, PRIORITY_INTERACTIVE, start_download
+
+PAPER_ID = "2401.00002"
+
+
+class _SlowInsertWriter:
+    """Holds download_records INSERTs until released, so a follower can attach mid-insert."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.inserting = threading.Event()
+        self.release = threading.Event()
+
+    def execute(self, sql, params=(), wait=False):
+        if sql.startswith("INSERT INTO download_records"):
+            self.inserting.set()
+            self.release.wait(5)
+        return self.writer.execute(sql, params, wait=wait)
+
+    def __getattr__(self, name):
+        return getattr(self.writer, name)
+
+
+def test_follower_attaching_during_leader_insert():
+    save_dir = tempfile.mkdtemp()
+    db_path = os.path.join(save_dir, "test.db")
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA_SQL)
+    conn.close()
+
+    # Workers start on first submit; in a running server they are already waiting for jobs
+    with pdf_download_skill._scheduler.cond:
+        pdf_download_skill._scheduler._ensure_workers()
+
+    real_writer = pdf_download_skill.get_db_writer(db_path)
+    slow = _SlowInsertWriter(real_writer)
+    runs = []
+    finished = threading.Event()
+
+    def fake_run_download(record_id, arxiv_id, save_dir, db_path):
+        runs.append(record_id)
+        finished.set()
+        return None
+
+    original_writer, original_run = pdf_download_skill.get_db_writer, pdf_download_skill._run_download
+    pdf_download_skill.get_db_writer = lambda path=None: slow
+    pdf_download_skill._run_download = fake_run_download
+    try:
+        results = {}
+        leader = threading.Thread(target=lambda: results.__setitem__(
+            "leader", start_download(PAPER_ID, "Paper", db_path, save_dir, PRIORITY_BULK)
+        ))
+        leader.start()
+        assert slow.inserting.wait(5), "leader never reached its INSERT"
+
+        follower = threading.Thread(target=lambda: results.__setitem__(
+            "follower", start_download(PAPER_ID, "Paper", db_path, save_dir, PRIORITY_INTERACTIVE)
+        ))
+        follower.start()
+        time.sleep(0.3)  # Let the follower attach while the leader's INSERT is still pending
+        slow.release.set()
+        leader.join(5)
+        follower.join(5)
+        assert finished.wait(5), "download never ran"
+        time.sleep(0.3)  # A stray second run would show up here
+    finally:
+        pdf_download_skill.get_db_writer, pdf_download_skill._run_download = original_writer, original_run
+
+    record_id = results["leader"][0]
+    assert record_id is not None
+    assert results["follower"][0] == record_id, results
+    # One run, for the leader's record (not a None-record run from an early promotion)
+    assert runs == [record_id], runs
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_follower_attaching_during_leader_insert,):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e}")
+    sys.exit(1 if failed else 0)
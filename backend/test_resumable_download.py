@@ -0,0 +1,148 @@
+"""Resumable PDF download tests against a local HTTP stand-in that drops connections."""
+import os
+import re
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".qoder"))
+
+from skills import pdf_download_skill
+from skills.pdf_download_skill import _fetch_pdf
+
+PAPER_ID = "2401.00001"
+BODY = b"%PDF-1.4\n" + os.urandom(2 * 1024 * 1024)
+DROP_AT = 1200 * 1024
+
+
+class _Mirror:
+    """Serves BODY with Range/If-Range support; can drop or refuse requests."""
+
+    def __init__(self, etag, drops=0, fail_after_drop=False):
+        self.etag = etag
+        self.drops = drops
+        self.fail_after_drop = fail_after_drop
+        self.requests = []
+        self.bytes_sent = 0
+        mirror = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                mirror.requests.append(dict(self.headers))
+                if mirror.fail_after_drop and mirror.drops == 0 and len(mirror.requests) > 1:
+                    self.send_error(404)
+                    return
+
+                start = 0
+                range_header = self.headers.get("Range")
+                if_range = self.headers.get("If-Range")
+                if range_header and (if_range is None or if_range == mirror.etag):
+                    start = int(re.match(r"bytes=(\d+)-", range_header).group(1))
+                body = BODY[start:]
+
+                self.send_response(206 if start else 200)
+                if start:
+                    self.send_header("Content-Range", f"bytes {start}-{len(BODY) - 1}/{len(BODY)}")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", mirror.etag)
+                self.send_header("Content-Type", "application/pdf")
+                self.end_headers()
+
+                if mirror.drops > 0:
+                    mirror.drops -= 1
+                    cut = max(0, DROP_AT - start)
+                    self.wfile.write(body[:cut])
+                    mirror.bytes_sent += cut
+                    self.close_connection = True
+                    return
+                self.wfile.write(body)
+                mirror.bytes_sent += len(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/pdf/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_resume_on_same_mirror():
+    mirror = _Mirror('"v1"', drops=1)
+    save_path = os.path.join(tempfile.mkdtemp(), "paper.pdf")
+    try:
+        size = _fetch_pdf(PAPER_ID, save_path, [mirror.url])
+    finally:
+        mirror.close()
+
+    assert size == len(BODY)
+    assert _read(save_path) == BODY
+    assert len(mirror.requests) == 2
+    resumed = mirror.requests[1]
+    assert resumed["Range"].startswith("bytes=") and resumed["Range"] != "bytes=0-"
+    assert resumed["If-Range"] == '"v1"'
+    # Only the missing tail was sent again
+    assert mirror.bytes_sent < len(BODY) + 512 * 1024
+    assert not os.path.exists(save_path + ".tmp")
+    assert not os.path.exists(save_path + ".tmp.json")
+
+
+def test_resume_on_other_mirror():
+    flaky = _Mirror('"a"', drops=1, fail_after_drop=True)
+    backup = _Mirror('"b"')
+    save_path = os.path.join(tempfile.mkdtemp(), "paper.pdf")
+    try:
+        size = _fetch_pdf(PAPER_ID, save_path, [flaky.url, backup.url])
+    finally:
+        flaky.close()
+        backup.close()
+
+    assert size == len(BODY)
+    assert _read(save_path) == BODY
+    request = backup.requests[0]
+    assert request["Range"] != "bytes=0-"
+    # Another mirror's ETag is meaningless here; the length check is used instead
+    assert "If-Range" not in request
+    assert backup.bytes_sent < len(BODY)
+
+
+def test_changed_file_restarts_from_zero():
+    mirror = _Mirror('"v2"')
+    save_path = os.path.join(tempfile.mkdtemp(), "paper.pdf")
+    temp_path = save_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(b"stale partial content" * 1000)
+    pdf_download_skill._save_partial_meta(temp_path, {
+        "url": f"{mirror.url}{PAPER_ID}.pdf", "etag": '"v1"',
+        "last_modified": None, "total_size": len(BODY),
+    })
+    try:
+        size = _fetch_pdf(PAPER_ID, save_path, [mirror.url])
+    finally:
+        mirror.close()
+
+    assert size == len(BODY)
+    assert _read(save_path) == BODY
+    assert mirror.requests[0]["If-Range"] == '"v1"'
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_resume_on_same_mirror, test_resume_on_other_mirror, test_changed_file_restarts_from_zero):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,172 @@
+"""Streaming analysis tests against a local OpenAI-compatible stand-in for the LLM API."""
+import json
+import os
+import sys
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".qoder"))
+
+from backend.app import app
+from backend.config import get_config
+from backend.services import analysis_service, cache_service
+from agents.analysis_agent import AnalysisAgent
+
+SUMMARY_ANSWER = json.dumps(
+    {"summary": "本文提出了一种检索增强的生成方法。", "key_points": ["检索", "生成", "评测"]},
+    ensure_ascii=False,
+)
+TRANSLATION_ANSWER = "我们提出了一种新的检索模型（retrieval model），并在三个基准上进行了评测。"
+
+
+class _FakeLLM:
+    """Serves /chat/completions; streams the answer in small chunks when asked to."""
+
+    def __init__(self, answer, chunk_chars=6, status=200):
+        self.answer = answer
+        self.chunk_chars = chunk_chars
+        self.status = status
+        self.requests = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                fake.requests.append(body)
+                if fake.status != 200:
+                    self._send_json(fake.status, {"error": {"message": "bad request", "type": "invalid_request_error"}})
+                    return
+                if not body.get("stream"):
+                    self._send_json(200, {
+                        "id": "cmpl-test", "object": "chat.completion", "created": 0, "model": body["model"],
+                        "choices": [{
+                            "index": 0, "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": fake.answer},
+                        }],
+                    })
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                pieces = [fake.answer[i:i + fake.chunk_chars] for i in range(0, len(fake.answer), fake.chunk_chars)]
+                for piece in pieces:
+                    self._send_chunk(body["model"], {"content": piece}, None)
+                self._send_chunk(body["model"], {}, "stop")
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def _send_chunk(self, model, delta, finish_reason):
+                chunk = {
+                    "id": "cmpl-test", "object": "chat.completion.chunk", "created": 0, "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+
+            def _send_json(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def __enter__(self):
+        # Point a fresh agent at this server through the regular config path
+        config = get_config()
+        self._saved = (config.ANALYSIS_SETTINGS, config.DEEPSEEK_API_KEY, analysis_service._analysis_agent)
+        config.ANALYSIS_SETTINGS = dict(config.ANALYSIS_SETTINGS, api_base_url=self.url)
+        config.DEEPSEEK_API_KEY = "test-key"
+        analysis_service._analysis_agent = AnalysisAgent(provider="deepseek")
+        return self
+
+    def __exit__(self, *exc):
+        config = get_config()
+        config.ANALYSIS_SETTINGS, config.DEEPSEEK_API_KEY, analysis_service._analysis_agent = self._saved
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _unique(text):
+    """Content no earlier run has cached."""
+    return f"{text} [{uuid.uuid4().hex}]"
+
+
+def _parse_sse(body):
+    events = []
+    for block in body.decode("utf-8").split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        if "event" in lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_summary_then_cache():
+    content = _unique("Retrieval-augmented generation for question answering.")
+    with _FakeLLM(SUMMARY_ANSWER) as llm:
+        events = list(analysis_service.stream_summarize(content))
+        deltas = [data["text"] for event, data in events if event == "delta"]
+        assert len(deltas) > 1, f"expected several deltas, got {len(deltas)}"
+        assert "".join(deltas) == SUMMARY_ANSWER
+        assert llm.requests[0]["stream"] is True
+
+        event, result = events[-1]
+        assert event == "result"
+        assert result["summary"] == "本文提出了一种检索增强的生成方法。"
+        assert result["key_points"] == ["检索", "生成", "评测"]
+
+        # The assembled answer was cached: the second stream is the result alone
+        again = list(analysis_service.stream_summarize(content))
+        assert again == [("result", result)], again
+        assert analysis_service.summarize(content) == result
+        assert len(llm.requests) == 1
+
+
+def test_translate_stream_endpoint():
+    content = _unique("We propose a new retrieval model and evaluate it on three benchmarks.")
+    with _FakeLLM(TRANSLATION_ANSWER) as llm, app.test_client() as c:
+        r = c.post("/api/analysis/translate/stream", json={"content": content, "target_lang": "zh"})
+        assert r.status_code == 200
+        assert r.mimetype == "text/event-stream"
+        events = _parse_sse(r.data)
+        assert "".join(data["text"] for event, data in events if event == "delta") == TRANSLATION_ANSWER
+        assert events[-1] == ("result", {"translated_text": TRANSLATION_ANSWER, "source_lang": "en", "error": None})
+        assert len(llm.requests) == 1
+
+        r = c.post("/api/analysis/translate/stream", json={"content": "  "})
+        assert r.status_code == 400
+
+
+def test_stream_error_is_not_cached():
+    content = _unique("A paper the LLM API refuses to summarize.")
+    with _FakeLLM(SUMMARY_ANSWER, status=400):
+        events = list(analysis_service.stream_summarize(content))
+        event, result = events[-1]
+        assert event == "result"
+        assert result["error"], result
+        assert not [e for e, _ in events if e == "delta"]
+
+    cache_key = cache_service.make_analysis_cache_key(content, "summary")
+    assert cache_service.get_analysis_cache(cache_key, "summary") is None
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_stream_summary_then_cache, test_translate_stream_endpoint, test_stream_error_is_not_cached):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"[FAIL] {test.__name__}: {e}")
+    sys.exit(1 if failed else 0)
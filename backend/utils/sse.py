@@ -0,0 +1,33 @@
+import json
+
+from flask import Response, stream_with_context
+
+
+def format_sse(event, data):
+    """Format a single Server-Sent Events message with a JSON payload."""
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def sse_response(events):
+    """
+    Build a streaming SSE response.
+
+    Args:
+        events: Iterable of (event_name, data) tuples.
+
+    Returns:
+        Flask Response streaming text/event-stream.
+    """
+    def generate():
+        for event, data in events:
+            yield format_sse(event, data)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -44,6 +44,8 @@ export default function App() {
     selectedItem,
     activeTab,
     setActiveTab,
+    fullPaperStage,
+    streamingText,
     summarize,
     analyzePaper,
     analyzeFullPaper,
@@ -149,6 +151,8 @@ export default function App() {
         selectedItem={selectedItem}
         analysisResult={analysisResult}
         loading={analysisLoading}
+        fullPaperStage={fullPaperStage}
+        streamingText={streamingText}
         activeTab={activeTab}
         onTabChange={setActiveTab}
         onSummarize={summarize}
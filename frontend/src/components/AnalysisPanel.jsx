@@ -7,12 +7,21 @@ import {
 
 const { Text, Paragraph, Title } = Typography
 
+const FULL_PAPER_STAGE_TIPS = {
+  queued: '排队中，请稍候...',
+  downloading: '正在下载论文 PDF...',
+  extracting: '正在提取论文文本...',
+  analyzing: '正在分析论文全文，请稍候...',
+}
+
 export default function AnalysisPanel({
   visible,
   onClose,
   selectedItem,
   analysisResult,
   loading,
+  fullPaperStage,
+  streamingText,
   activeTab,
   onTabChange,
   onSummarize,
@@ -26,9 +35,19 @@ export default function AnalysisPanel({
     }
   }, [visible, selectedItem])
 
+  // Show the answer as it streams in; a spinner until the first piece arrives
+  const renderStreaming = (tip) => {
+    if (!streamingText) return <Spin tip={tip} />
+    return (
+      <Paragraph type="secondary" style={{ whiteSpace: 'pre-wrap' }}>
+        {streamingText}
+      </Paragraph>
+    )
+  }
+
   const renderSummary = () => {
     const data = analysisResult?.summary
-    if (loading && !data) return <Spin tip="正在生成摘要..." />
+    if (loading && !data) return renderStreaming('正在生成摘要...')
     if (!data) return <Empty description="点击按钮生成摘要" />
     if (data.error) return <Text type="danger">错误: {data.error}</Text>
 
@@ -57,7 +76,10 @@ export default function AnalysisPanel({
     const isArxiv = selectedItem?.source === 'arxiv'
     const arxivId = selectedItem?.extra?.arxiv_id
 
-    if (loading && !data) return <Spin tip="正在分析论文全文，请稍候..." />
+    if (loading && !data) {
+      if (fullPaperStage) return <Spin tip={FULL_PAPER_STAGE_TIPS[fullPaperStage]} />
+      return renderStreaming('正在分析论文，请稍候...')
+    }
     if (!data) {
       return (
         <div style={{ textAlign: 'center', padding: 40 }}>
@@ -9,7 +9,7 @@ import {
   RobotOutlined,
   GlobalOutlined,
 } from '@ant-design/icons'
-import api from '../services/api'
+import { translateSnippet } from '../services/translate'
 
 const { Text } = Typography
 
@@ -65,10 +65,10 @@ export default function ResultItem({ item, onAnalyze, onDownload, selected, onTo
 
     let cancelled = false
     setTranslating(true)
-    api.post('/analysis/translate', { content: snippet, target_lang: 'zh' })
-      .then((data) => {
-        if (!cancelled && data.translated_text) {
-          setTranslatedSnippet(data.translated_text)
+    translateSnippet(snippet)
+      .then((translated) => {
+        if (!cancelled && translated && translated !== snippet) {
+          setTranslatedSnippet(translated)
         }
       })
       .catch(() => {})
@@ -10,7 +10,7 @@ import {
   DatabaseOutlined,
 } from '@ant-design/icons'
 import ResultItem from './ResultItem'
-import api from '../services/api'
+import { translateAll } from '../services/translate'
 
 const { Text } = Typography
 
@@ -43,33 +43,22 @@ export default function ResultList({
     setExportProgress(0)
 
     try {
-      // Translate snippets to Chinese via backend API
-      const translatedResults = []
-      for (let i = 0; i < selected.length; i++) {
-        const item = selected[i]
-        let translatedSnippet = item.snippet || ''
-
-        // Only translate if snippet contains non-Chinese characters
-        if (translatedSnippet && !/^[\u4e00-\u9fa5\s\d，。！？、：；""''（）【】《》]+$/.test(translatedSnippet)) {
-          try {
-            const response = await api.post('/translate', {
-              text: translatedSnippet,
-              target_lang: 'zh',
-            })
-            translatedSnippet = response.translated || translatedSnippet
-          } catch (err) {
-            console.warn('Translation failed for item:', item.title, err)
-          }
-        }
-
-        translatedResults.push({
-          title: item.title || '',
-          snippet: translatedSnippet,
-          url: item.url || '',
-        })
-
-        setExportProgress(Math.round(((i + 1) / selected.length) * 100))
-      }
+      // Translate non-Chinese snippets to Chinese via the batch API
+      const needsTranslation = (snippet) =>
+        snippet && !/^[\u4e00-\u9fa5\s\d，。！？、：；""''（）【】《》]+$/.test(snippet)
+      const toTranslate = selected.filter((item) => needsTranslation(item.snippet || ''))
+      const translations = await translateAll(
+        toTranslate.map((item) => item.snippet),
+        (done, totalCount) => setExportProgress(Math.round((done / totalCount) * 100)),
+      )
+      const translatedByItem = new Map(toTranslate.map((item, i) => [item, translations[i]]))
+
+      const translatedResults = selected.map((item) => ({
+        title: item.title || '',
+        snippet: translatedByItem.get(item) ?? (item.snippet || ''),
+        url: item.url || '',
+      }))
+      setExportProgress(100)
 
       // Generate CSV content
       const csvHeader = '\uFEFF标题,内容摘要,原始链接\n'
@@ -152,7 +141,7 @@ export default function ResultList({
               {Object.entries(sourcesStatus).map(([src, status]) => (
                 <Badge
                   key={src}
-                  status={status === 'success' ? 'success' : status === 'timeout' ? 'warning' : 'error'}
+                  status={(status === 'success' || status === 'local') ? 'success' : (status === 'timeout' || status === 'overloaded') ? 'warning' : 'error'}
                   text={
                     <Text type="secondary" style={{ fontSize: 11 }}>
                       {src}
@@ -1,5 +1,35 @@
 import { useState, useCallback } from 'react'
-import api from '../services/api'
+import api, { streamPost } from '../services/api'
+
+const FINAL_JOB_STATUSES = ['completed', 'failed']
+
+// Follow a full-paper analysis job over SSE until it completes or fails
+function waitForJob(job, onStage) {
+  if (FINAL_JOB_STATUSES.includes(job.status)) return Promise.resolve(job)
+
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`/api/analysis/paper-full/jobs/${job.id}/events`)
+    source.addEventListener('progress', (event) => {
+      let state
+      try {
+        state = JSON.parse(event.data)
+      } catch {
+        return
+      }
+      onStage(state.status)
+      if (FINAL_JOB_STATUSES.includes(state.status)) {
+        source.close()
+        resolve(state)
+      }
+    })
+    source.onerror = () => {
+      // EventSource retries on its own; CLOSED means the job is gone
+      if (source.readyState === EventSource.CLOSED) {
+        reject(new Error('Lost track of the analysis job'))
+      }
+    }
+  })
+}
 
 export default function useAnalysis() {
   const [analysisResult, setAnalysisResult] = useState(null)
@@ -7,11 +37,18 @@ export default function useAnalysis() {
   const [visible, setVisible] = useState(false)
   const [selectedItem, setSelectedItem] = useState(null)
   const [activeTab, setActiveTab] = useState('summary')
+  const [fullPaperStage, setFullPaperStage] = useState(null)
+  // Raw answer text received so far while a summary or paper analysis streams
+  const [streamingText, setStreamingText] = useState(null)
+
+  const appendDelta = useCallback((event, data) => {
+    if (event === 'delta') setStreamingText((prev) => (prev || '') + data.text)
+  }, [])
 
   const summarize = useCallback(async (content) => {
     setLoading(true)
     try {
-      const data = await api.post('/analysis/summarize', { content })
+      const data = await streamPost('/analysis/summarize/stream', { content }, appendDelta)
       setAnalysisResult((prev) => ({ ...prev, summary: data }))
     } catch (err) {
       setAnalysisResult((prev) => ({
@@ -20,13 +57,14 @@ export default function useAnalysis() {
       }))
     } finally {
       setLoading(false)
+      setStreamingText(null)
     }
-  }, [])
+  }, [appendDelta])
 
   const analyzePaper = useCallback(async (paperData) => {
     setLoading(true)
     try {
-      const data = await api.post('/analysis/paper', paperData)
+      const data = await streamPost('/analysis/paper/stream', paperData, appendDelta)
       setAnalysisResult((prev) => ({ ...prev, paper: data }))
     } catch (err) {
       setAnalysisResult((prev) => ({
@@ -35,17 +73,23 @@ export default function useAnalysis() {
       }))
     } finally {
       setLoading(false)
+      setStreamingText(null)
     }
-  }, [])
+  }, [appendDelta])
 
   const analyzeFullPaper = useCallback(async (arxivId, title) => {
     setLoading(true)
+    setFullPaperStage('queued')
     try {
-      const data = await api.post('/analysis/paper-full', {
+      const job = await api.post('/analysis/paper-full/jobs', {
         arxiv_id: arxivId,
         title,
-      }, { timeout: 180000 })
-      setAnalysisResult((prev) => ({ ...prev, paper: data }))
+      })
+      const state = await waitForJob(job, setFullPaperStage)
+      setAnalysisResult((prev) => ({
+        ...prev,
+        paper: state.result || { error: state.error || 'Full paper analysis failed' },
+      }))
     } catch (err) {
       setAnalysisResult((prev) => ({
         ...prev,
@@ -53,6 +97,7 @@ export default function useAnalysis() {
       }))
     } finally {
       setLoading(false)
+      setFullPaperStage(null)
     }
   }, [])
 
@@ -76,6 +121,8 @@ export default function useAnalysis() {
     selectedItem,
     activeTab,
     setActiveTab,
+    fullPaperStage,
+    streamingText,
     summarize,
     analyzePaper,
     analyzeFullPaper,
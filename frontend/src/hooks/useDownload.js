@@ -14,7 +14,6 @@ function triggerBrowserDownload(downloadId) {
 export default function useDownload() {
   const [downloads, setDownloads] = useState([])
   const [visible, setVisible] = useState(false)
-  const pollingRef = useRef(null)
   const pendingAutoDownloadIds = useRef(new Set())
 
   const startDownload = useCallback(async (arxivId, title) => {
@@ -44,68 +43,42 @@ export default function useDownload() {
     }
   }, [])
 
-  const refreshStatus = useCallback(async () => {
-    const pending = downloads.filter(
-      (d) => d.status === 'pending' || d.status === 'downloading'
-    )
-    if (pending.length === 0) return
+  const applyUpdate = useCallback((update) => {
+    setDownloads((curr) => {
+      const idx = curr.findIndex((item) => item.id === update.id)
+      if (idx === -1) return curr
+      const next = [...curr]
+      next[idx] = { ...next[idx], ...update }
+      return next
+    })
 
-    // Batch update all pending downloads
-    const updates = await Promise.allSettled(
-      pending.map(async (d) => {
-        try {
-          const status = await api.get(`/download/status/${d.id}`)
-          return { id: d.id, ...status }
-        } catch {
-          return null
-        }
-      })
-    )
+    // Auto-trigger browser download for session-initiated downloads (once per id)
+    if (update.status === 'completed' && pendingAutoDownloadIds.current.has(update.id)) {
+      triggerBrowserDownload(update.id)
+      pendingAutoDownloadIds.current.delete(update.id)
+    }
+  }, [])
 
-    const newlyCompleted = []
+  // Subscribe to pushed progress for active downloads (Server-Sent Events)
+  const activeIds = downloads
+    .filter((d) => d.status === 'pending' || d.status === 'downloading')
+    .map((d) => d.id)
+    .join(',')
 
-    setDownloads((curr) => {
-      const newDownloads = [...curr]
-      updates.forEach((result) => {
-        if (result.status === 'fulfilled' && result.value) {
-          const idx = newDownloads.findIndex((item) => item.id === result.value.id)
-          if (idx !== -1) {
-            const wasNotCompleted = newDownloads[idx].status !== 'completed'
-            newDownloads[idx] = { ...newDownloads[idx], ...result.value }
-            if (wasNotCompleted && result.value.status === 'completed') {
-              newlyCompleted.push(result.value.id)
-            }
-          }
-        }
-      })
-      return newDownloads
-    })
+  useEffect(() => {
+    if (!activeIds) return undefined
 
-    // Auto-trigger browser download for session-initiated downloads
-    newlyCompleted.forEach((id) => {
-      if (pendingAutoDownloadIds.current.has(id)) {
-        triggerBrowserDownload(id)
-        pendingAutoDownloadIds.current.delete(id)
+    const source = new EventSource(`/api/download/events?ids=${activeIds}`)
+    source.addEventListener('progress', (event) => {
+      try {
+        applyUpdate(JSON.parse(event.data))
+      } catch {
+        // Ignore malformed events
       }
     })
-  }, [downloads])
 
-  // Poll for active downloads
-  useEffect(() => {
-    const hasActive = downloads.some(
-      (d) => d.status === 'pending' || d.status === 'downloading'
-    )
-    if (hasActive && !pollingRef.current) {
-      // Poll every 1.5 seconds for better progress updates
-      pollingRef.current = setInterval(refreshStatus, 1500)
-    } else if (!hasActive && pollingRef.current) {
-      clearInterval(pollingRef.current)
-      pollingRef.current = null
-    }
-    return () => {
-      if (pollingRef.current) clearInterval(pollingRef.current)
-    }
-  }, [downloads, refreshStatus])
+    return () => source.close()
+  }, [activeIds, applyUpdate])
 
   const removeDownload = useCallback((id) => {
     setDownloads((prev) => prev.filter((d) => d.id !== id))
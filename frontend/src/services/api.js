@@ -29,3 +29,43 @@ api.interceptors.response.use(
 )
 
 export default api
+
+// POST a JSON body to an SSE endpoint and feed each event to onEvent(event, data).
+// Resolves with the data of the final "result" event.
+export async function streamPost(path, body, onEvent) {
+  const response = await fetch(`/api${path}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body),
+  })
+  if (!response.ok) {
+    const data = await response.json().catch(() => ({}))
+    throw new Error(data.error || `Request failed (${response.status})`)
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  let result = null
+  for (;;) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    const blocks = buffer.split('\n\n')
+    buffer = blocks.pop()
+    for (const block of blocks) {
+      let event = 'message'
+      let data = ''
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7)
+        else if (line.startsWith('data: ')) data += line.slice(6)
+      }
+      if (!data) continue
+      const payload = JSON.parse(data)
+      if (event === 'result') result = payload
+      else onEvent(event, payload)
+    }
+  }
+  if (!result) throw new Error('Stream ended without a result')
+  return result
+}
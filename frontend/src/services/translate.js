@@ -0,0 +1,66 @@
+import api from './api'
+
+// Max texts per /translate/batch request (backend limit is 100)
+const MAX_BATCH = 50
+// How long to wait for more snippets before sending a batch
+const BATCH_DELAY_MS = 50
+
+let queue = []
+let timer = null
+
+function flush() {
+  const batch = queue.splice(0, MAX_BATCH)
+  timer = queue.length > 0 ? setTimeout(flush, 0) : null
+
+  api.post('/translate/batch', {
+    texts: batch.map((entry) => entry.text),
+    target_lang: 'zh',
+  }, { timeout: 120000 })
+    .then((data) => {
+      batch.forEach((entry, i) => {
+        entry.resolve(data.translations?.[i]?.translated || entry.text)
+      })
+    })
+    .catch((err) => {
+      batch.forEach((entry) => entry.reject(err))
+    })
+}
+
+/**
+ * Translate a single snippet to Chinese. Calls made within a short window
+ * are grouped into one /translate/batch request.
+ */
+export function translateSnippet(text) {
+  return new Promise((resolve, reject) => {
+    queue.push({ text, resolve, reject })
+    if (!timer) {
+      timer = setTimeout(flush, BATCH_DELAY_MS)
+    }
+  })
+}
+
+/**
+ * Translate a list of texts in batches, reporting progress after each batch.
+ * Returns translations aligned with the input; failed batches keep the original text.
+ */
+export async function translateAll(texts, onProgress) {
+  const translated = [...texts]
+  for (let start = 0; start < texts.length; start += MAX_BATCH) {
+    const chunk = texts.slice(start, start + MAX_BATCH)
+    try {
+      const data = await api.post('/translate/batch', {
+        texts: chunk,
+        target_lang: 'zh',
+      }, { timeout: 120000 })
+      chunk.forEach((text, i) => {
+        translated[start + i] = data.translations?.[i]?.translated || text
+      })
+    } catch (err) {
+      console.warn('Batch translation failed:', err)
+    }
+    if (onProgress) {
+      onProgress(Math.min(start + chunk.length, texts.length), texts.length)
+    }
+  }
+  return translated
+}